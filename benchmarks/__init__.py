@@ -0,0 +1,2 @@
+# coding=utf-8
+"""Benchmarks for the WLTS QGIS Plugin query-to-plot pipeline."""
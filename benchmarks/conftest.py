@@ -0,0 +1,51 @@
+# coding=utf-8
+"""Fixtures for the benchmark suite.
+
+The benchmarks run against the local stub WLTS/LCCS server serving the
+recorded fixtures of ``wlts_plugin/test/fixtures``.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import pytest
+
+from wlts_plugin.config import Config
+from wlts_plugin.test.stub_server import StubData, StubServer
+
+
+@pytest.fixture(scope='session')
+def stub_data():
+    """Recorded metadata and synthetic trajectories."""
+    return StubData()
+
+
+@pytest.fixture(scope='session')
+def stub_server(stub_data):
+    """Run the stub server and point the plugin configuration to it.
+
+    The client rate limit is raised so the benchmarks measure the pipeline
+    instead of the waits of the limiter.
+    """
+    with StubServer(data=stub_data) as server:
+        settings = Config.WLTS_HOST, Config.LCCS_HOST, Config.WLTS_MAX_RPS, Config.WLTS_MAX_IN_FLIGHT
+        Config.WLTS_HOST = server.wlts_url
+        Config.LCCS_HOST = server.lccs_url
+        Config.WLTS_MAX_RPS = 1e6
+        Config.WLTS_MAX_IN_FLIGHT = 64
+        yield server
+        Config.WLTS_HOST, Config.LCCS_HOST, Config.WLTS_MAX_RPS, Config.WLTS_MAX_IN_FLIGHT = settings
+
+
+@pytest.fixture(scope='session')
+def wlts_controls(stub_server):
+    """WLTS controls connected to the stub server."""
+    from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+    return WLTS_Controls()
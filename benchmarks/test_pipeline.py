@@ -0,0 +1,122 @@
+# coding=utf-8
+"""Benchmarks for the query-to-plot pipeline.
+
+Run with ``pytest benchmarks --benchmark-save=baseline`` to record a
+baseline and ``pytest benchmarks --benchmark-compare`` to compare with it.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import pytest
+
+from wlts_plugin.controller.trajectory_result import TrajectoryResult
+from wlts_plugin.helpers.files_export_helper import FilesExport
+
+from .utilities import SIZES, make_trajectory, sample_points
+
+pytest.importorskip('pytest_benchmark')
+
+COLLECTION = ['prodes_amazonia_legal']
+
+COLLECTIONS = [
+    'prodes_amazonia_legal', 'deter_amazonia_legal', 'mapbiomas-v9',
+    'ibge_cobertura_uso_terra', 'terraclass_amazonia'
+]
+
+
+def run(benchmark, size, function, *args, **kwargs):
+    """Run a benchmark, large sizes are measured only once."""
+    if size > 100:
+        return benchmark.pedantic(function, args=args, kwargs=kwargs, rounds=1, iterations=1)
+    return benchmark(function, *args, **kwargs)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_get_trajectory(benchmark, wlts_controls, size):
+    """Measure the trajectory request latency."""
+    points = sample_points(size)
+    lon = [p[0] for p in points] if size > 1 else points[0][0]
+    lat = [p[1] for p in points] if size > 1 else points[0][1]
+    run(
+        benchmark, size, wlts_controls.getTrajectory,
+        lon=lon, lat=lat, collections=COLLECTIONS,
+        start_date='2000-01-01', end_date='2020-12-31'
+    )
+
+
+def test_plot_scatter(benchmark, wlts_controls, stub_data):
+    """Measure the scatter plot render time, only valid for one point."""
+    result = TrajectoryResult(make_trajectory(stub_data, 1, COLLECTIONS))
+    benchmark(wlts_controls.plotTrajectory, result, type='scatter')
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_plot_bar_single_collection(benchmark, wlts_controls, stub_data, size):
+    """Measure the bar plot render time for a single collection."""
+    result = TrajectoryResult(make_trajectory(stub_data, size, COLLECTION))
+    run(benchmark, size, wlts_controls.plotTrajectory, result, type='bar', style='seaborn')
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_plot_bar_multi_collection(benchmark, wlts_controls, stub_data, size):
+    """Measure the faceted bar plot render time for many collections."""
+    result = TrajectoryResult(make_trajectory(stub_data, size, COLLECTIONS))
+    run(benchmark, size, wlts_controls.plotTrajectory, result, type='bar', style='seaborn', processes=False)
+
+
+@pytest.mark.parametrize('style', ['stacked', 'heatmap'])
+@pytest.mark.parametrize('size', SIZES)
+def test_plot_bar_aggregated(benchmark, wlts_controls, stub_data, size, style):
+    """Measure the faceted bar plot drawn from the dates x classes matrix."""
+    result = TrajectoryResult(make_trajectory(stub_data, size, COLLECTIONS))
+    run(benchmark, size, wlts_controls.plotTrajectory, result, type='bar', style=style, processes=False)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_plot_bar_multi_collection_processes(benchmark, wlts_controls, stub_data, size):
+    """Measure the faceted bar plot rendered in worker processes as tiles."""
+    result = TrajectoryResult(make_trajectory(stub_data, size, COLLECTIONS))
+    wlts_controls.plotTrajectory(result, type='bar', processes=True)
+    run(benchmark, size, wlts_controls.plotTrajectory, result, type='bar', processes=True)
+    wlts_controls.renderer.shutdown()
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_generate_csv(benchmark, stub_data, tmp_path, size):
+    """Measure the CSV export throughput."""
+    trajectory = make_trajectory(stub_data, size, COLLECTIONS)
+    run(benchmark, size, FilesExport().generateCSV, str(tmp_path / 'trajectory.csv'), trajectory)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_generate_json(benchmark, stub_data, tmp_path, size):
+    """Measure the JSON export throughput."""
+    trajectory = make_trajectory(stub_data, size, COLLECTIONS)
+    run(benchmark, size, FilesExport().generateJSON, str(tmp_path / 'trajectory.json'), trajectory)
+
+
+def test_init_checkbox(benchmark, wlts_controls):
+    """Measure the start up time to list the collections in the dialog."""
+    pytest.importorskip('qgis')
+    from qgis.PyQt.QtCore import QSettings
+
+    from wlts_plugin.helpers.selection_model import SelectionModel
+    from wlts_plugin.test.utilities import get_qgis_app
+    from wlts_plugin.wlts_qgis import WLTSQgis
+    from wlts_plugin.wlts_qgis_dialog import WltsQgisDialog
+
+    _, _, iface, _ = get_qgis_app()
+    QSettings().setValue('locale/userLocale', 'en_US')
+    plugin = WLTSQgis(iface)
+    plugin.dlg = WltsQgisDialog()
+    plugin.selection = SelectionModel(parent=plugin.dlg)
+    plugin.wlts_controls = wlts_controls
+    benchmark(plugin.initCheckBox)
@@ -0,0 +1,31 @@
+# coding=utf-8
+"""Common functionality used by the benchmarks."""
+
+import random
+
+from wlts.trajectory import Trajectory
+
+#: Number of points used on each benchmark size
+SIZES = [1, 100, 10000]
+
+
+def sample_points(size, seed=42):
+    """Return ``size`` reproducible (longitude, latitude) pairs in the Amazon."""
+    rand = random.Random(seed)
+    return [
+        (rand.uniform(-62.0, -52.0), rand.uniform(-10.0, -3.0))
+        for _ in range(size)
+    ]
+
+
+def make_trajectory(data, size, collections, start_date='2000-01-01', end_date='2020-12-31'):
+    """Build a trajectory with ``size`` points without going through HTTP."""
+    rows = []
+    points = sample_points(size)
+    for point_id, (lon, lat) in enumerate(points, start=1):
+        response = data.trajectory(lon, lat, ','.join(collections), start_date, end_date)
+        for row in response['result']['trajectory']:
+            row['point_id'] = point_id
+            rows.append(row)
+    query = data.trajectory(points[0][0], points[0][1], ','.join(collections), start_date, end_date)['query']
+    return Trajectory({'query': query, 'result': {'trajectory': rows}})
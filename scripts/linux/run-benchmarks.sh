@@ -0,0 +1,32 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+#!/bin/bash
+#
+# Run the benchmarks against the local stub WLTS/LCCS server.
+#
+#   ./scripts/linux/run-benchmarks.sh baseline  # record a new baseline
+#   ./scripts/linux/run-benchmarks.sh           # compare with the last baseline
+#
+
+BENCHMARK_OPTIONS="--no-cov --benchmark-sort=name --benchmark-columns=min,mean,max,rounds"
+
+if [ "$1" == "baseline" ]; then
+    pytest benchmarks ${BENCHMARK_OPTIONS} --benchmark-save=baseline
+else
+    pytest benchmarks ${BENCHMARK_OPTIONS} --benchmark-compare --benchmark-compare-fail=mean:25%
+fi
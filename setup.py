@@ -41,9 +41,20 @@ tests_require = [
     'check-manifest>=0.40'
 ]
 
+benchmarks_require = [
+    'pytest-benchmark>=4.0',
+]
+
+batch_require = [
+    'pyarrow>=10.0',
+    'geopandas>=0.12',
+]
+
 extras_require = {
     'docs': docs_require,
     'tests': tests_require,
+    'benchmarks': benchmarks_require,
+    'batch': batch_require,
 }
 
 extras_require['all'] = [req for _, reqs in extras_require.items() for req in reqs]
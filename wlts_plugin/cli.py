@@ -0,0 +1,247 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+r"""Command line to fetch the trajectories of a points file without QGIS GUI.
+
+Example::
+
+    $ python3 -m wlts_plugin.cli points.csv trajectories.gpkg \
+        --collections prodes_amazonia_legal,mapbiomas-v9 \
+        --start-date 2000-01-01 --end-date 2020-12-31 --concurrency 8
+
+An interrupted run prints its job id, pass it with ``--resume`` to fetch
+only the points that are still missing.
+
+An offline area package, answering the points of an area without
+requests, is built with ``--area``. Running it again builds only the
+missing tiles, ``--refresh`` builds every tile again::
+
+    $ python3 -m wlts_plugin.cli ~/.wlts_plugin/areas/altamira.sqlite \
+        --area=-52.5,-3.5,-52.0,-3.0 --step 0.00025 \
+        --collections prodes_amazonia_legal --start-date 2000-01-01 --end-date 2020-12-31
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .config import Config
+from .controller.area_package import AreaPackage
+from .controller.batch_jobs import JobManager
+from .controller.metadata_cache import MetadataCache
+from .controller.trajectory_cache import TrajectoryCache
+from .controller.wlts_qgis_controller import WLTS_Controls
+from .helpers.files_export_helper import FilesExport
+
+#: Column names accepted as longitude and latitude in CSV files
+COORDINATE_COLUMNS = [('longitude', 'latitude'), ('lon', 'lat'), ('long', 'lat'), ('x', 'y')]
+
+
+def read_points(file_name):
+    """Read the (longitude, latitude) pairs of a CSV or vector file.
+
+    Vector files (GeoPackage, Shapefile, GeoJSON) are reprojected to
+    EPSG:4326, CSV files must be in EPSG:4326.
+
+    :param file_name<str>: the points file.
+    :raises ValueError: when the coordinates are not found.
+    """
+    if Path(file_name).suffix.lower() in ('.csv', '.txt'):
+        df = pd.read_csv(file_name, sep=None, engine='python')
+        columns = {column.lower(): column for column in df.columns}
+        for lon, lat in COORDINATE_COLUMNS:
+            if lon in columns and lat in columns:
+                return list(zip(df[columns[lon]].astype(float), df[columns[lat]].astype(float)))
+        raise ValueError(f"No longitude and latitude columns found in {file_name}!")
+    import geopandas as gpd
+    gdf = gpd.read_file(file_name).to_crs('EPSG:4326')
+    points = gdf.geometry.representative_point()
+    return list(zip(points.x, points.y))
+
+
+def make_controls(cache=True):
+    """Build the controls with the metadata cache, revalidated with the server.
+
+    :param cache<bool>: read and save the trajectories in ``Config.CACHE_FILE``.
+    """
+    return WLTS_Controls(
+        cache=TrajectoryCache(Config.CACHE_FILE, max_age=Config.CACHE_MAX_AGE) if cache else None,
+        metadata=MetadataCache(Config.METADATA_FILE, max_age=Config.METADATA_MAX_AGE)
+    )
+
+
+def job_workers(concurrency):
+    """Return the worker threads of a job, at most ``Config.WLTS_MAX_IN_FLIGHT``.
+
+    The requests limits are shared by every job and the plugin dialog, so
+    the concurrency of a job only limits its own workers.
+
+    :param concurrency<int>: the requested concurrency, the ceiling when ``None``.
+    """
+    if not concurrency:
+        return Config.WLTS_MAX_IN_FLIGHT
+    return max(1, min(int(concurrency), Config.WLTS_MAX_IN_FLIGHT))
+
+
+def run_batch(points, collections, start_date, end_date, output,
+              concurrency=None, cache=True, job_id=None, progress=None, cancel=None):
+    """Fetch the trajectories of many points and write them to a file.
+
+    :param points<list>: the (longitude, latitude) pairs, unused on resume.
+    :param collections<list>: the collection names, unused on resume.
+    :param start_date<str>: the begin of the time interval, unused on resume.
+    :param end_date<str>: the end of the time interval, unused on resume.
+    :param output<str>: the ``.csv``, ``.parquet`` or ``.gpkg`` output file.
+    :param concurrency<int>: the maximum concurrent requests of the job.
+    :param cache<bool>: read and save the trajectories in ``Config.CACHE_FILE``.
+    :param job_id<str>: the id of an interrupted job to resume.
+    :param progress<callable>: called with (finished, total) after each point.
+    :param cancel<threading.Event>: stops the job when set.
+    :returns: the :class:`BatchJob`.
+    """
+    manager = JobManager()
+    if job_id:
+        job = manager.load(job_id)
+    else:
+        job = manager.create(points, collections, start_date, end_date)
+    controls = make_controls(cache)
+    # The descriptions move the points to the collections pixels, so points
+    # in the same pixel are requested once
+    for collection in job.spec['collections']:
+        if collection not in controls.local:
+            controls.description(collection)
+    trajectories = manager.run(job, controls, workers=job_workers(concurrency),
+                               progress=progress, cancel=cancel)
+    FilesExport().generateBatch(output, trajectories)
+    return job
+
+
+def build_area(output, bbox=None, step=None, collections=None, start_date=None, end_date=None,
+               tile_size=16, refresh=False, concurrency=None, cache=True, progress=None, cancel=None):
+    """Create or complete an offline area package.
+
+    :param output<str>: the package file, completed when it exists.
+    :param bbox<tuple>: the (xmin, ymin, xmax, ymax) area, unused when completing.
+    :param step<float>: the cell size in degrees, unused when completing.
+    :param collections<list>: the collection names, unused when completing.
+    :param start_date<str>: the begin of the time interval, unused when completing.
+    :param end_date<str>: the end of the time interval, unused when completing.
+    :param tile_size<int>: the cells of a tile side, unused when completing.
+    :param refresh<bool>: build every tile again.
+    :param concurrency<int>: the maximum concurrent requests of the package.
+    :param cache<bool>: read and save the trajectories in ``Config.CACHE_FILE``.
+    :param progress<callable>: called with (finished, total) after each tile.
+    :param cancel<threading.Event>: stops before the next tile when set.
+    :returns: the :class:`AreaPackage`.
+    """
+    if Path(output).exists():
+        area = AreaPackage(output)
+    else:
+        area = AreaPackage.create(output, bbox, step, collections, start_date, end_date, tile_size)
+    controls = make_controls(cache)
+    # The package must not answer its own tiles when they are built again
+    controls.areas = [other for other in controls.areas if not os.path.samefile(other.path, area.path)]
+    area.build(controls, tiles=area.tiles() if refresh else None, workers=job_workers(concurrency),
+               progress=progress, cancel=cancel)
+    return area
+
+
+def main_area(parser, args):
+    """Run the command line building an area package."""
+    if not Path(args.output).exists():
+        if not (args.area and args.collections):
+            parser.error('--area and --collections are required to create an area package')
+        try:
+            bbox = [float(value) for value in args.area.split(',')]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4:
+            parser.error('--area must be XMIN,YMIN,XMAX,YMAX')
+    else:
+        bbox = None
+
+    def progress(finished, total):
+        print(f'\r{finished}/{total} tiles', end='', file=sys.stderr, flush=True)
+
+    area = build_area(
+        args.output, bbox, args.step, (args.collections or '').split(','),
+        args.start_date, args.end_date, tile_size=args.tile_size, refresh=args.refresh,
+        concurrency=args.concurrency, cache=not args.no_cache, progress=progress
+    )
+    missing = len(area.missingTiles())
+    print(f'\nArea {args.output}: {len(area.tiles()) - missing}/{len(area.tiles())} tiles', file=sys.stderr)
+    return 1 if missing else 0
+
+
+def main(argv=None):
+    """Run the command line."""
+    parser = argparse.ArgumentParser(
+        prog='python3 -m wlts_plugin.cli',
+        description='Fetch the land use and cover trajectories of a points file.'
+    )
+    parser.add_argument('input', nargs='?', help='CSV (longitude/latitude columns) or vector points file')
+    parser.add_argument('output', help='output file: .csv, .parquet or .gpkg, or the area package')
+    parser.add_argument('--collections', help='collection names separated by commas')
+    parser.add_argument('--start-date', default='2000-01-01')
+    parser.add_argument('--end-date', default=datetime.today().strftime('%Y-%m-%d'))
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help=f'concurrent requests of the job (at most {Config.WLTS_MAX_IN_FLIGHT})')
+    parser.add_argument('--no-cache', action='store_true', help=f'do not use {Config.CACHE_FILE}')
+    parser.add_argument('--resume', metavar='JOB_ID', help='resume an interrupted job')
+    parser.add_argument('--area', metavar='XMIN,YMIN,XMAX,YMAX',
+                        help='build the offline area package OUTPUT, no input file is read')
+    parser.add_argument('--step', type=float, default=0.00025, help='the area cell size in degrees')
+    parser.add_argument('--tile-size', type=int, default=16, help='the cells of an area tile side')
+    parser.add_argument('--refresh', action='store_true', help='build every tile of the area again')
+    args = parser.parse_args(argv)
+
+    # An existing area package is completed without --area
+    if args.area or args.refresh or not (args.input or args.resume) and Path(args.output).exists():
+        return main_area(parser, args)
+
+    if not args.resume and not (args.input and args.collections):
+        parser.error('input and --collections are required to start a new job')
+
+    try:
+        points = read_points(args.input) if not args.resume else []
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    def progress(finished, total):
+        print(f'\r{finished}/{total} points', end='', file=sys.stderr, flush=True)
+
+    job = run_batch(
+        points, (args.collections or '').split(','), args.start_date, args.end_date,
+        args.output, concurrency=args.concurrency, cache=not args.no_cache,
+        job_id=args.resume, progress=progress
+    )
+    finished, total = job.progress()
+    print(f'\nJob {job.id}: {finished}/{total} points written to {args.output}', file=sys.stderr)
+    failed = job.failed()
+    if failed:
+        print(f'{len(failed)} points failed, run again with --resume {job.id}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
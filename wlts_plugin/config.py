@@ -39,6 +39,68 @@ class Config:
 
     PYTHONPATH_WLTS_PLUGIN = os.getenv("PYTHONPATH_WLTS_PLUGIN", None)
 
+    TRACE_CAPACITY = int(os.getenv("WLTS_TRACE_CAPACITY", 200))
+
+    WLTS_MAX_RPS = float(os.getenv("WLTS_MAX_RPS", 10))
+
+    WLTS_MAX_IN_FLIGHT = int(os.getenv("WLTS_MAX_IN_FLIGHT", 4))
+
+    WLTS_MAX_RETRIES = int(os.getenv("WLTS_MAX_RETRIES", 3))
+
+    WLTS_REQUEST_TIMEOUT = float(os.getenv("WLTS_REQUEST_TIMEOUT", 60))
+
+    WLTS_HEDGE = os.getenv("WLTS_HEDGE", "1") == "1"
+
+    WLTS_BREAKER_FAILURES = int(os.getenv("WLTS_BREAKER_FAILURES", 5))
+
+    WLTS_BREAKER_COOLDOWN = float(os.getenv("WLTS_BREAKER_COOLDOWN", 30))
+
+    DATA_DIR = os.getenv("WLTS_DATA_DIR", str(Path.home() / '.wlts_plugin'))
+
+    JOBS_DIR = os.getenv("WLTS_JOBS_DIR", str(Path(DATA_DIR) / 'jobs'))
+
+    CACHE_FILE = os.getenv("WLTS_CACHE_FILE", str(Path(DATA_DIR) / 'trajectories.sqlite'))
+
+    CACHE_MAX_AGE = float(os.getenv("WLTS_CACHE_MAX_AGE", 86400))
+
+    METADATA_FILE = os.getenv("WLTS_METADATA_FILE", str(Path(DATA_DIR) / 'metadata.sqlite'))
+
+    METADATA_MAX_AGE = float(os.getenv("WLTS_METADATA_MAX_AGE", 300))
+
+    RENDER_WORKERS = int(os.getenv("WLTS_RENDER_WORKERS", os.cpu_count() or 1))
+
+    RENDER_PROCESSES_MIN_FACETS = int(os.getenv("WLTS_RENDER_PROCESSES_MIN_FACETS", 6))
+
+    PYTHON_EXECUTABLE = os.getenv("WLTS_PYTHON", None)
+
+    PLOT_LOD_ROWS = int(os.getenv("WLTS_PLOT_LOD_ROWS", 5000))
+
+    PLOT_LOD_DATES = int(os.getenv("WLTS_PLOT_LOD_DATES", 60))
+
+    HISTORY_TOLERANCE = float(os.getenv("WLTS_HISTORY_TOLERANCE", 0.0001))
+
+    HISTORY_FILE = os.getenv("WLTS_HISTORY_FILE", str(Path(DATA_DIR) / 'history.sqlite'))
+
+    HISTORY_PAGE_SIZE = int(os.getenv("WLTS_HISTORY_PAGE_SIZE", 100))
+
+    SELECTION_DEBOUNCE_MS = int(os.getenv("WLTS_SELECTION_DEBOUNCE_MS", 150))
+
+    PREFETCH_WAIT_MS = int(os.getenv("WLTS_PREFETCH_WAIT_MS", 500))
+
+    COVERAGE_CHECKS = os.getenv("WLTS_COVERAGE_CHECKS", "1") == "1"
+
+    LOCAL_RASTERS = os.getenv("WLTS_LOCAL_RASTERS", str(Path(DATA_DIR) / 'local_rasters.json'))
+
+    LOCAL_BLOCK_CACHE = int(os.getenv("WLTS_LOCAL_BLOCK_CACHE", 256))
+
+    AREAS_DIR = os.getenv("WLTS_AREAS_DIR", str(Path(DATA_DIR) / 'areas'))
+
+    SNAP_TO_PIXEL = os.getenv("WLTS_SNAP_TO_PIXEL", "0") == "1"
+
+    WARM_SESSION = os.getenv("WLTS_WARM_SESSION", "1") == "1"
+
+    SESSION_MEMORY_MB = float(os.getenv("WLTS_SESSION_MEMORY_MB", 512))
+
 
 class InstallDependencies:
     """Easy install for python packages dependencies."""
@@ -16,4 +16,8 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
 #
 
+from .area_package import AreaPackage
+from .batch_jobs import BatchJob, JobManager
+from .location_history import LocationHistory
+from .raster_engine import LocalTrajectoryEngine
 from .wlts_qgis_controller import Controls, WLTS_Controls
@@ -0,0 +1,330 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import json
+import math
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from .rate_limiter import priority
+from .trajectory_cache import inWindow
+
+#: Number of decoded tiles kept in memory
+MAX_TILES = 64
+
+
+def encodeRuns(values):
+    """Run-length encode a sequence as a flat ``[value, count, ...]`` list."""
+    runs = []
+    for value in values:
+        if runs and runs[-2] == value:
+            runs[-1] += 1
+        else:
+            runs.extend([value, 1])
+    return runs
+
+
+def decodeRuns(runs):
+    """Expand a flat ``[value, count, ...]`` list of ``encodeRuns``."""
+    values = []
+    for position in range(0, len(runs), 2):
+        values.extend([runs[position]] * runs[position + 1])
+    return values
+
+
+class AreaPackage:
+    """Trajectories of every cell of an area, stored offline by tiles.
+
+    The area is a grid of ``step`` degrees over a bounding box, grouped in
+    tiles of ``tile_size`` x ``tile_size`` cells. Each tile keeps, for each
+    collection, its dates, its classes and the run-length encoded class
+    sequence of each cell, compressed in a SQLite file. A point inside the
+    area is answered with the trajectory of its cell, from the decoded tiles
+    kept in memory.
+
+    The tiles are built with the trajectories of the cell centers and can be
+    built again one by one, so a package is completed or refreshed
+    incrementally.
+
+    :Methods:
+        create
+        cellOf
+        tileOf
+        tiles
+        missingTiles
+        buildTile
+        build
+        covers
+        rows
+        nbytes
+        clearDecoded
+    """
+
+    def __init__(self, path):
+        """Open a package file.
+
+        :param path<str>: the package SQLite file, made by ``create``.
+        :raises ValueError: when the file is not a package.
+        """
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.decoded = OrderedDict()
+        self.sizes = {}
+        self.building = set()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            row = self.connection.execute('SELECT value FROM spec').fetchone()
+        except sqlite3.DatabaseError:
+            row = None
+        if row is None:
+            raise ValueError(f"{self.path} is not an area package!")
+        self.spec = json.loads(row[0])
+        self.xmin, self.ymin, self.xmax, self.ymax = self.spec['bbox']
+        self.step = self.spec['step']
+        self.tile_size = self.spec['tile_size']
+        self.cell_columns = max(1, math.ceil(round((self.xmax - self.xmin) / self.step, 9)))
+        self.cell_rows = max(1, math.ceil(round((self.ymax - self.ymin) / self.step, 9)))
+
+    @classmethod
+    def create(cls, path, bbox, step, collections, start_date, end_date, tile_size=16):
+        """Create an empty package, the tiles are added with ``build``.
+
+        :param path<str>: the package SQLite file.
+        :param bbox<tuple>: the (xmin, ymin, xmax, ymax) area in EPSG:4326.
+        :param step<float>: the cell size in degrees, e.g. the collections
+            pixel size.
+        :param collections<list>: the collection names.
+        :param start_date<str>: the begin of the time interval.
+        :param end_date<str>: the end of the time interval.
+        :param tile_size<int>: the cells of a tile side.
+        """
+        xmin, ymin, xmax, ymax = [float(value) for value in bbox]
+        if xmin >= xmax or ymin >= ymax or step <= 0:
+            raise ValueError("The area must have xmin < xmax, ymin < ymax and a positive step!")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(path))
+        connection.executescript(
+            'DROP TABLE IF EXISTS spec; DROP TABLE IF EXISTS tiles;'
+            'CREATE TABLE spec (value TEXT NOT NULL);'
+            'CREATE TABLE tiles ('
+            'tile_x INTEGER NOT NULL, tile_y INTEGER NOT NULL, data BLOB NOT NULL, '
+            'updated REAL NOT NULL, PRIMARY KEY (tile_x, tile_y));'
+        )
+        connection.execute('INSERT INTO spec (value) VALUES (?)', (json.dumps({
+            'bbox': [xmin, ymin, xmax, ymax],
+            'step': float(step),
+            'tile_size': int(tile_size),
+            'collections': list(collections),
+            'start_date': start_date,
+            'end_date': end_date
+        }),))
+        connection.commit()
+        connection.close()
+        return cls(path)
+
+    def cellOf(self, lon, lat):
+        """Return the (column, row) of the cell of a point, or ``None`` outside."""
+        if not (self.xmin <= lon <= self.xmax and self.ymin <= lat <= self.ymax):
+            return None
+        column = min(int((lon - self.xmin) / self.step), self.cell_columns - 1)
+        row = min(int((lat - self.ymin) / self.step), self.cell_rows - 1)
+        return column, row
+
+    def tileOf(self, lon, lat):
+        """Return the (tile_x, tile_y) of a point, or ``None`` outside the area."""
+        cell = self.cellOf(lon, lat)
+        if cell is None:
+            return None
+        return cell[0] // self.tile_size, cell[1] // self.tile_size
+
+    def tiles(self):
+        """Return every (tile_x, tile_y) of the area."""
+        return [
+            (tile_x, tile_y)
+            for tile_y in range(math.ceil(self.cell_rows / self.tile_size))
+            for tile_x in range(math.ceil(self.cell_columns / self.tile_size))
+        ]
+
+    def builtTiles(self):
+        """Return the (tile_x, tile_y) of the tiles in the file."""
+        with self.lock:
+            return {
+                (tile_x, tile_y) for tile_x, tile_y in
+                self.connection.execute('SELECT tile_x, tile_y FROM tiles').fetchall()
+            }
+
+    def missingTiles(self):
+        """Return the tiles that were not built yet."""
+        built = self.builtTiles()
+        return [tile for tile in self.tiles() if tile not in built]
+
+    def cells(self, tile):
+        """Return the (column, row) of the cells of a tile inside the area."""
+        tile_x, tile_y = tile
+        return [
+            (column, row)
+            for row in range(tile_y * self.tile_size, min((tile_y + 1) * self.tile_size, self.cell_rows))
+            for column in range(tile_x * self.tile_size, min((tile_x + 1) * self.tile_size, self.cell_columns))
+        ]
+
+    def center(self, column, row):
+        """Return the longitude and latitude of a cell center."""
+        return (
+            min(self.xmin + (column + 0.5) * self.step, self.xmax),
+            min(self.ymin + (row + 0.5) * self.step, self.ymax)
+        )
+
+    def buildTile(self, tile, wlts_controls, workers=None):
+        """Fetch the trajectories of the cells of a tile and save it.
+
+        :param tile<tuple>: the (tile_x, tile_y) to build or build again.
+        :param wlts_controls<WLTS_Controls>: the controls fetching the trajectories.
+        :param workers<int>: the cells fetched together, the limiter maximum by default.
+        """
+        tile = tuple(tile)
+        cells = self.cells(tile)
+        lon, lat = zip(*[self.center(column, row) for column, row in cells])
+        # The tile being built is not used to answer its own cells
+        self.building.add(tile)
+        try:
+            with priority('batch', self.path):
+                trajectories = wlts_controls.getTrajectories(
+                    list(lon), list(lat), self.spec['collections'],
+                    self.spec['start_date'], self.spec['end_date'], workers=workers
+                )
+        finally:
+            self.building.discard(tile)
+        by_collection = {collection: [{} for _ in cells] for collection in self.spec['collections']}
+        for index, trajectory in enumerate(trajectories['trajectories']):
+            for row in trajectory['result']['trajectory']:
+                if row['collection'] in by_collection:
+                    by_collection[row['collection']][index][str(row['date'])] = row['class']
+        data = {}
+        for collection, classes_by_cell in by_collection.items():
+            dates = sorted({date for cell in classes_by_cell for date in cell})
+            classes = sorted({name for cell in classes_by_cell for name in cell.values()})
+            index = {name: position for position, name in enumerate(classes)}
+            data[collection] = {
+                'dates': dates,
+                'classes': classes,
+                'cells': [
+                    encodeRuns([index[cell[date]] if date in cell else -1 for date in dates])
+                    for cell in classes_by_cell
+                ]
+            }
+        blob = zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO tiles (tile_x, tile_y, data, updated) VALUES (?, ?, ?, ?)',
+                (tile[0], tile[1], blob, time.time())
+            )
+            self.connection.commit()
+            self.decoded.pop(tile, None)
+            self.sizes.pop(tile, None)
+
+    def build(self, wlts_controls, tiles=None, workers=None, progress=None, cancel=None):
+        """Build the missing tiles, or build again the given ones.
+
+        :param wlts_controls<WLTS_Controls>: the controls fetching the trajectories.
+        :param tiles<list>: the (tile_x, tile_y) to build, the missing ones by default.
+        :param workers<int>: the cells fetched together, the limiter maximum by default.
+        :param progress<callable>: called with (finished, total) after each tile.
+        :param cancel<threading.Event>: stops before the next tile when set.
+        :returns: the number of built tiles.
+        """
+        tiles = self.missingTiles() if tiles is None else [tuple(tile) for tile in tiles]
+        for finished, tile in enumerate(tiles, start=1):
+            if cancel is not None and cancel.is_set():
+                return finished - 1
+            self.buildTile(tile, wlts_controls, workers=workers)
+            if progress:
+                progress(finished, len(tiles))
+        return len(tiles)
+
+    def tile(self, tile):
+        """Return a decoded tile, or ``None`` when it was not built."""
+        with self.lock:
+            if tile in self.decoded:
+                self.decoded.move_to_end(tile)
+                return self.decoded[tile]
+            row = self.connection.execute(
+                'SELECT data FROM tiles WHERE tile_x = ? AND tile_y = ?', tile
+            ).fetchone()
+            if row is None:
+                return None
+            text = zlib.decompress(row[0])
+            data = json.loads(text)
+            self.decoded[tile] = data
+            self.sizes[tile] = len(text)
+            while len(self.decoded) > MAX_TILES:
+                self.sizes.pop(self.decoded.popitem(last=False)[0], None)
+            return data
+
+    def nbytes(self):
+        """Return an estimate of the memory of the decoded tiles, their JSON size."""
+        with self.lock:
+            return sum(self.sizes.values())
+
+    def clearDecoded(self):
+        """Remove the decoded tiles from memory, they are read again when needed."""
+        with self.lock:
+            self.decoded.clear()
+            self.sizes.clear()
+
+    def covers(self, lon, lat, collections, start_date, end_date):
+        """Return whether the package can answer a query, without reading tiles."""
+        return (
+            self.cellOf(lon, lat) is not None
+            and set(collections) <= set(self.spec['collections'])
+            and str(self.spec['start_date'])[:10] <= str(start_date)[:10]
+            and str(end_date)[:10] <= str(self.spec['end_date'])[:10]
+        )
+
+    def rows(self, lon, lat, collections, start_date, end_date):
+        """Return the trajectory rows of a point from its cell.
+
+        :returns: the rows, or ``None`` when the package does not cover the
+            query or the tile of the point was not built.
+        """
+        if not self.covers(lon, lat, collections, start_date, end_date):
+            return None
+        column, row = self.cellOf(lon, lat)
+        tile_x, tile_y = column // self.tile_size, row // self.tile_size
+        if (tile_x, tile_y) in self.building:
+            return None
+        data = self.tile((tile_x, tile_y))
+        if data is None:
+            return None
+        width = min((tile_x + 1) * self.tile_size, self.cell_columns) - tile_x * self.tile_size
+        position = (row - tile_y * self.tile_size) * width + (column - tile_x * self.tile_size)
+        result = []
+        for collection in collections:
+            entry = data[collection]
+            for date, class_index in zip(entry['dates'], decodeRuns(entry['cells'][position])):
+                if class_index >= 0 and inWindow(date, start_date, end_date):
+                    result.append({
+                        'class': entry['classes'][class_index],
+                        'collection': collection,
+                        'date': date,
+                        'point_id': 1
+                    })
+        return result
@@ -0,0 +1,244 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from wlts.trajectories import Trajectories
+from wlts.trajectory import Trajectory
+
+from ..config import Config
+from .rate_limiter import priority
+
+
+class BatchJob:
+    """A batch of trajectory queries persisted in a local journal.
+
+    The job folder holds ``spec.json`` with the points, collections and
+    dates, and ``journal.jsonl`` where each finished point is appended with
+    its trajectory, so an interrupted job resumes with the pending points.
+
+    :Methods:
+        completed
+        pending
+        progress
+        append
+        trajectories
+    """
+
+    def __init__(self, folder):
+        """Load a job from its folder.
+
+        :param folder<str>: the job folder.
+        """
+        self.folder = Path(folder)
+        self.id = self.folder.name
+        with (self.folder / 'spec.json').open() as f:
+            self.spec = json.load(f)
+        self.journal = self.folder / 'journal.jsonl'
+        self.lock = threading.Lock()
+
+    @property
+    def points(self):
+        """Return the job points as (longitude, latitude) pairs."""
+        return [tuple(point) for point in self.spec['points']]
+
+    def entries(self):
+        """Read the journal entries, ignoring a line torn by a crash."""
+        if not self.journal.exists():
+            return []
+        entries = []
+        with self.journal.open() as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def completed(self):
+        """Return the trajectory rows of the finished points by point id."""
+        return {
+            entry['point_id']: entry['trajectory']
+            for entry in self.entries() if entry['status'] == 'done'
+        }
+
+    def failed(self):
+        """Return the errors of the points that failed on the last run."""
+        errors = {}
+        for entry in self.entries():
+            if entry['status'] == 'failed':
+                errors[entry['point_id']] = entry['error']
+            else:
+                errors.pop(entry['point_id'], None)
+        return errors
+
+    def pending(self):
+        """Return the ids of the points without a trajectory."""
+        completed = self.completed()
+        return [
+            point_id for point_id in range(1, len(self.spec['points']) + 1)
+            if point_id not in completed
+        ]
+
+    def progress(self):
+        """Return the number of finished points and the total."""
+        return len(self.completed()), len(self.spec['points'])
+
+    def append(self, point_id, trajectory=None, error=None):
+        """Write a point result to the journal and flush it to disk.
+
+        :param point_id<int>: the point position in the job, from 1.
+        :param trajectory<list>: the trajectory rows of the point.
+        :param error<str>: the error message when the point failed.
+        """
+        entry = {'point_id': point_id, 'status': 'failed' if error else 'done'}
+        if error:
+            entry['error'] = error
+        else:
+            entry['trajectory'] = trajectory
+        with self.lock:
+            with self.journal.open('a') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def trajectories(self):
+        """Return the finished points as ``Trajectories``."""
+        result = []
+        for point_id, rows in sorted(self.completed().items()):
+            lon, lat = self.spec['points'][point_id - 1]
+            for row in rows:
+                row['point_id'] = point_id
+            result.append(Trajectory({
+                'query': {
+                    'collections': self.spec['collections'],
+                    'end_date': self.spec['end_date'],
+                    'latitude': lat,
+                    'longitude': lon,
+                    'start_date': self.spec['start_date']
+                },
+                'result': {'trajectory': rows}
+            }))
+        return Trajectories({'trajectories': result})
+
+
+class JobManager:
+    """Create, list and run resumable batch jobs.
+
+    :Methods:
+        create
+        jobs
+        load
+        run
+    """
+
+    def __init__(self, folder=None):
+        """Build the manager.
+
+        :param folder<str>: the jobs folder, ``Config.JOBS_DIR`` by default.
+        """
+        self.folder = Path(folder or Config.JOBS_DIR)
+
+    def create(self, points, collections, start_date, end_date):
+        """Persist a new job spec.
+
+        :param points<list>: the (longitude, latitude) pairs.
+        :param collections<list>: the collection names.
+        :param start_date<str>: the begin of the time interval.
+        :param end_date<str>: the end of the time interval.
+        :returns: the new :class:`BatchJob`.
+        """
+        spec = {
+            'points': [[float(lon), float(lat)] for lon, lat in points],
+            'collections': list(collections),
+            'start_date': start_date,
+            'end_date': end_date,
+            'created': datetime.now().isoformat()
+        }
+        digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:8]
+        folder = self.folder / f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{digest}"
+        folder.mkdir(parents=True, exist_ok=True)
+        temporary = folder / 'spec.json.tmp'
+        with temporary.open('w') as f:
+            json.dump(spec, f)
+        os.replace(temporary, folder / 'spec.json')
+        return BatchJob(folder)
+
+    def jobs(self):
+        """Return the saved jobs, oldest first."""
+        if not self.folder.exists():
+            return []
+        return [
+            BatchJob(folder) for folder in sorted(self.folder.iterdir())
+            if (folder / 'spec.json').exists()
+        ]
+
+    def load(self, job_id):
+        """Return a saved job by id."""
+        return BatchJob(self.folder / job_id)
+
+    def run(self, job, wlts_controls, workers=None, progress=None, cancel=None):
+        """Fetch the pending points of a job, appending each to the journal.
+
+        Running a finished or interrupted job again only fetches the points
+        that have no trajectory in the journal. The requests have the batch
+        priority, behind the requests of the plugin dialog.
+
+        :param job<BatchJob>: the job to run.
+        :param wlts_controls<WLTS_Controls>: the controls sending the requests.
+        :param workers<int>: the points fetched together, the limiter maximum by default.
+        :param progress<callable>: called with (finished, total) after each point.
+        :param cancel<threading.Event>: stops scheduling new points when set.
+        :returns: the job ``Trajectories`` fetched so far.
+        """
+        pending = job.pending()
+        finished, total = job.progress()
+        points = job.spec['points']
+
+        def fetch(point_id):
+            if cancel is not None and cancel.is_set():
+                return point_id, None, None
+            lon, lat = points[point_id - 1]
+            try:
+                with priority('batch', job.id):
+                    trajectory = wlts_controls.fetchTrajectory(
+                        lon, lat, job.spec['collections'],
+                        job.spec['start_date'], job.spec['end_date']
+                    )
+                return point_id, trajectory['result']['trajectory'], None
+            except Exception as error:
+                return point_id, None, f'{type(error).__name__}: {error}'
+
+        with ThreadPoolExecutor(max_workers=workers or wlts_controls.limiter.max_in_flight) as executor:
+            futures = [executor.submit(fetch, point_id) for point_id in pending]
+            for future in as_completed(futures):
+                point_id, rows, error = future.result()
+                if rows is None and error is None:
+                    continue
+                job.append(point_id, rows, error)
+                if not error:
+                    finished += 1
+                if progress:
+                    progress(finished, total)
+        return job.trajectories()
@@ -0,0 +1,118 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import threading
+
+import numpy as np
+
+
+class CoverageIndex:
+    """In-memory index of the collections spatial extent and period.
+
+    The index is filled with the collection descriptions, as they are
+    requested, and tells which collections can not have a trajectory for a
+    location and time window, so they are not sent to the server. The
+    collections without description are always kept.
+
+    :Methods:
+        add
+        reasons
+        filter
+    """
+
+    def __init__(self):
+        """Build an empty index."""
+        self.lock = threading.Lock()
+        # Replaced as a whole on add, so readers in other threads need no lock
+        self.index = ({}, np.empty((0, 4)), [])
+
+    def add(self, name, description):
+        """Index the spatial extent and period of a collection description.
+
+        :param name<str>: the collection name.
+        :param description<dict>: the collection description of the service.
+        """
+        extent = description.get('spatial_extent') or {}
+        period = description.get('period') or {}
+        try:
+            bounds = [float(extent[key]) for key in ('xmin', 'ymin', 'xmax', 'ymax')]
+        except (KeyError, TypeError, ValueError):
+            bounds = [-np.inf, -np.inf, np.inf, np.inf]
+        dates = (
+            str(period.get('start_date') or '')[:10],
+            str(period.get('end_date') or '')[:10] or '9999-12-31'
+        )
+        with self.lock:
+            positions, extents, periods = self.index
+            positions, extents, periods = dict(positions), extents.copy(), list(periods)
+            if name in positions:
+                extents[positions[name]] = bounds
+                periods[positions[name]] = dates
+            else:
+                positions[name] = len(periods)
+                extents = np.vstack([extents, bounds])
+                periods.append(dates)
+            self.index = (positions, extents, periods)
+
+    def __contains__(self, name):
+        """Return whether a collection is indexed."""
+        return name in self.index[0]
+
+    def reasons(self, collections, lon, lat, start_date, end_date):
+        """Return why each collection can not cover a query.
+
+        A list of coordinates is covered by a collection when any of the
+        points is inside its spatial extent.
+
+        :param collections<list>: the collection names.
+        :param lon<float|list>: the point longitude, or a list of longitudes.
+        :param lat<float|list>: the point latitude, or a list of latitudes.
+        :param start_date<str>: the begin of the time window.
+        :param end_date<str>: the end of the time window.
+        :returns: the reason by name of the collections that are skipped.
+        """
+        positions, extents, periods = self.index
+        names = [name for name in collections if name in positions]
+        if not names:
+            return {}
+        rows = [positions[name] for name in names]
+        x = np.atleast_1d(np.asarray(lon, dtype=float))
+        y = np.atleast_1d(np.asarray(lat, dtype=float))
+        bounds = extents[rows]
+        inside = (
+            (x >= bounds[:, [0]]) & (x <= bounds[:, [2]]) &
+            (y >= bounds[:, [1]]) & (y <= bounds[:, [3]])
+        ).any(axis=1)
+        start, end = str(start_date or '')[:10], str(end_date or '')[:10] or '9999-12-31'
+        skipped = {}
+        for name, row, covered in zip(names, rows, inside):
+            first, last = periods[row]
+            if not covered:
+                skipped[name] = 'the location is outside its spatial extent'
+            elif first > end or last < start:
+                skipped[name] = f'its period, {first} to {last}, does not overlap the dates'
+        return skipped
+
+    def filter(self, collections, lon, lat, start_date, end_date):
+        """Split the collections that can cover a query from the others.
+
+        :returns: the kept collection names, in the given order, and the
+            reason by name of the skipped collections.
+        """
+        skipped = self.reasons(collections, lon, lat, start_date, end_date)
+        return [name for name in collections if name not in skipped], skipped
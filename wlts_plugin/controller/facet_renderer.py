@@ -0,0 +1,235 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import io
+import multiprocessing
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.image import imread
+from matplotlib.patches import Patch
+
+from ..config import Config
+from .matrix_plot import classColors, countMatrix, drawHeatmap, drawStackedBars
+
+#: Estimate of the memory of a worker process, when psutil is not installed
+WORKER_BYTES = 100 * 2 ** 20
+
+
+def renderFacet(data, title, dates, colors, parameters):
+    """Render the bar plot of one collection as a PNG image.
+
+    It runs in the worker processes, so it only uses the Agg backend and
+    picklable arguments.
+
+    :param data<pandas.DataFrame>: the ``date``, ``class`` and ``size`` columns.
+    :param title<str>: the facet title.
+    :param dates<list>: the dates shown in the x axis, shared by every facet.
+    :param colors<dict>: the color of each class, shared by every facet.
+    :param parameters<dict>: the plot parameters of ``plotTrajectory``.
+    :returns: the PNG image bytes.
+    """
+    sns.set_theme(style="darkgrid")
+    dpi = parameters.get('dpi', 100)
+    figure = Figure(figsize=(parameters['facet_width'] / dpi, parameters['facet_height'] / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    style = parameters.get('style') or 'seaborn'
+    if style == 'seaborn':
+        data = data[data['class'].isin(colors)]
+        sns.barplot(
+            data=data,
+            x='date', y='size',
+            hue='class',
+            order=dates,
+            hue_order=list(colors),
+            palette=colors,
+            alpha=parameters['opacity'],
+            ax=ax
+        )
+    elif style == 'stacked':
+        drawStackedBars(ax, countMatrix(data, dates, list(colors)), colors, parameters['opacity'])
+    else:
+        drawHeatmap(ax, countMatrix(data, dates, list(colors)), parameters.get('vmax'))
+    ax.set_xlabel(parameters['date'])
+    ax.set_ylabel(parameters['legend_title_text'] if style == 'heatmap' else parameters['title_y'])
+    ax.set_title(title)
+    if ax.get_legend():
+        ax.get_legend().remove()
+    figure.tight_layout()
+    image = io.BytesIO()
+    figure.savefig(image, format='png')
+    return image.getvalue()
+
+
+def pythonExecutable():
+    """Return the Python interpreter used to start the worker processes.
+
+    Inside QGIS ``sys.executable`` may be the QGIS application instead of
+    Python, so the interpreter of the QGIS Python prefix is used.
+    """
+    if Config.PYTHON_EXECUTABLE:
+        return Config.PYTHON_EXECUTABLE
+    if Path(sys.executable).name.lower().startswith('python'):
+        return sys.executable
+    for candidate in (Path(sys.exec_prefix) / 'python.exe', Path(sys.exec_prefix) / 'bin' / 'python3'):
+        if candidate.exists():
+            return str(candidate)
+    return shutil.which('python3') or sys.executable
+
+
+class FacetRenderer:
+    """Render the collections facets of a bar plot in parallel processes.
+
+    Each facet is an independent figure rendered by a worker process, so
+    the rendering time scales with the cores instead of the collections.
+    The images are composed as tiles of a figure or saved as files. The
+    facets are rendered in the current process when the pool can not run.
+
+    :Methods:
+        render
+        compose
+        save
+        nbytes
+        shutdown
+    """
+
+    def __init__(self, max_workers=None):
+        """Build the renderer, the worker processes start on the first render.
+
+        :param max_workers<int>: the worker processes, ``Config.RENDER_WORKERS`` by default.
+        """
+        self.max_workers = max_workers or Config.RENDER_WORKERS
+        self.executor = None
+
+    def _executor(self):
+        """Return the process pool, starting it when needed."""
+        if self.executor is None:
+            context = multiprocessing.get_context('spawn')
+            context.set_executable(pythonExecutable())
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self.executor
+
+    @staticmethod
+    def colors(classes):
+        """Return the class colors, the seaborn default for the classes order.
+
+        :param classes<list>: the class names of every facet.
+        """
+        return classColors(classes)
+
+    def render(self, facets, dates, colors, parameters):
+        """Render the facets as PNG images.
+
+        :param facets<list>: the (title, data) pairs of each facet.
+        :param dates<list>: the dates shown in the x axis.
+        :param colors<dict>: the color of each class.
+        :param parameters<dict>: the plot parameters.
+        :returns: the PNG images, in the facets order.
+        """
+        arguments = [(data, title, dates, colors, parameters) for title, data in facets]
+        if len(arguments) > 1 and self.max_workers > 1:
+            try:
+                executor = self._executor()
+                futures = [executor.submit(renderFacet, *args) for args in arguments]
+                return [future.result() for future in futures]
+            except (BrokenProcessPool, OSError):
+                self.shutdown()
+        return [renderFacet(*args) for args in arguments]
+
+    def compose(self, figure, images, colors, parameters):
+        """Draw the facets images as tiles of a figure with a shared legend.
+
+        :param figure<matplotlib.figure.Figure>: the figure to draw on.
+        :param images<list>: the PNG images.
+        :param colors<dict>: the color of each class.
+        :param parameters<dict>: the plot parameters.
+        """
+        ncols = min(3, len(images))
+        nrows = -(-len(images) // ncols)
+        axes = figure.subplots(nrows, ncols, squeeze=False).flatten()
+        for ax, image in zip(axes, images):
+            ax.imshow(imread(io.BytesIO(image), format='png'))
+            ax.set_axis_off()
+        for ax in axes[len(images):]:
+            ax.set_visible(False)
+        heatmap = parameters.get('style') == 'heatmap'
+        figure.subplots_adjust(left=0, bottom=0, top=1, right=1 if heatmap else 0.85, wspace=0, hspace=0)
+        if heatmap:
+            figure.colorbar(
+                ScalarMappable(Normalize(0, parameters.get('vmax')), cmap='viridis'),
+                ax=list(axes), label=parameters['title_y'], shrink=0.8
+            )
+        else:
+            figure.legend(
+                [Patch(facecolor=color, alpha=parameters['opacity']) for color in colors.values()],
+                list(colors),
+                title=parameters['legend_title_text'],
+                bbox_to_anchor=(1.0, 0.5),
+                loc='center right'
+            )
+
+    def save(self, folder, titles, images):
+        """Save each facet image as a PNG file.
+
+        :param folder<str>: the folder to save the files.
+        :param titles<list>: the file names, without extension.
+        :param images<list>: the PNG images.
+        :returns: the saved file paths.
+        """
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        files = []
+        for title, image in zip(titles, images):
+            file_name = Path(folder) / f'{title}.png'
+            file_name.write_bytes(image)
+            files.append(str(file_name))
+        return files
+
+    def nbytes(self):
+        """Return the memory of the running worker processes.
+
+        The resident memory is read with ``psutil`` when it is installed,
+        otherwise each process counts as ``WORKER_BYTES``.
+        """
+        executor = self.executor
+        pids = list(getattr(executor, '_processes', None) or {}) if executor else []
+        try:
+            import psutil
+        except ImportError:
+            return len(pids) * WORKER_BYTES
+        total = 0
+        for pid in pids:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,231 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from ..config import Config
+
+#: Number of pages of locations kept in memory
+MAX_PAGES = 20
+
+
+class LocationHistory:
+    """Selected locations saved in SQLite and indexed in a grid hash.
+
+    The grid cells have the snap tolerance size and are saved as indexed
+    columns, so a click is compared only with the locations of the 3x3
+    cells around it. A click closer than the tolerance to a saved location
+    returns that location, with its trajectory cache key, instead of a new
+    entry. A click with the pixel key of the collections grids, see
+    ``WLTS_Controls.pixelKey``, returns the location with the same key
+    instead. The locations are read in pages only when they are shown.
+
+    :Methods:
+        label
+        nearest
+        add
+        setCacheKey
+        clear
+    """
+
+    def __init__(self, path=':memory:', tolerance=None, page_size=None):
+        """Open or create the history database.
+
+        :param path<str>: the SQLite file, or ``":memory:"``.
+        :param tolerance<float>: the snap distance in degrees,
+            ``Config.HISTORY_TOLERANCE`` by default.
+        :param page_size<int>: the locations read at once,
+            ``Config.HISTORY_PAGE_SIZE`` by default.
+        """
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.tolerance = tolerance or Config.HISTORY_TOLERANCE
+        self.page_size = page_size or Config.HISTORY_PAGE_SIZE
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS locations ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, long REAL NOT NULL, lat REAL NOT NULL, '
+            'layer_name TEXT, crs TEXT, cache_key TEXT, created TEXT, '
+            'cell_x INTEGER NOT NULL, cell_y INTEGER NOT NULL);'
+            'CREATE INDEX IF NOT EXISTS locations_cell ON locations (cell_x, cell_y);'
+            'CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT);'
+        )
+        # Files saved without the pixel keys only match by distance
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(locations)')]
+        if 'pixel_key' not in columns:
+            self.connection.execute('ALTER TABLE locations ADD COLUMN pixel_key TEXT')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS locations_pixel ON locations (pixel_key)')
+        self.connection.commit()
+        self._reindex()
+        self.count = self.connection.execute('SELECT COUNT(*) FROM locations').fetchone()[0]
+
+    def _reindex(self):
+        """Compute the grid cells again when the tolerance has changed."""
+        row = self.connection.execute(
+            "SELECT value FROM settings WHERE name = 'tolerance'"
+        ).fetchone()
+        if row is not None and float(row[0]) == self.tolerance:
+            return
+        cells = [
+            (*self._cell(lon, lat), id_)
+            for id_, lon, lat in self.connection.execute('SELECT id, long, lat FROM locations')
+        ]
+        self.connection.executemany('UPDATE locations SET cell_x = ?, cell_y = ? WHERE id = ?', cells)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO settings (name, value) VALUES ('tolerance', ?)",
+            (repr(self.tolerance),)
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def label(lon, lat):
+        """Return the text of a location in the history list."""
+        return "[{long:,.7f}, {lat:,.7f}]".format(long=lon, lat=lat)
+
+    def _cell(self, lon, lat):
+        """Return the grid cell of a coordinate."""
+        return math.floor(lon / self.tolerance), math.floor(lat / self.tolerance)
+
+    def _location(self, row):
+        """Build a location from a database row."""
+        id_, lon, lat, layer_name, crs, cache_key = row
+        return {
+            'id': id_,
+            'long': lon,
+            'lat': lat,
+            'layer_name': layer_name,
+            'crs': crs,
+            'label': self.label(lon, lat),
+            'cache_key': cache_key
+        }
+
+    def __len__(self):
+        """Return the number of locations."""
+        return self.count
+
+    def __getitem__(self, row):
+        """Return the location at a row, the oldest first."""
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        page = row // self.page_size
+        with self.lock:
+            if page not in self.pages:
+                rows = self.connection.execute(
+                    'SELECT id, long, lat, layer_name, crs, cache_key FROM locations '
+                    'ORDER BY id LIMIT ? OFFSET ?',
+                    (self.page_size, page * self.page_size)
+                ).fetchall()
+                self.pages[page] = [self._location(r) for r in rows]
+                while len(self.pages) > MAX_PAGES:
+                    self.pages.popitem(last=False)
+            self.pages.move_to_end(page)
+            return self.pages[page][row % self.page_size]
+
+    def nearest(self, lon, lat, pixel_key=None):
+        """Return the row of the nearest location within the tolerance.
+
+        :param lon<float>: the longitude.
+        :param lat<float>: the latitude.
+        :param pixel_key<str>: the key of the collections pixels of the
+            location, only the location with the same key is returned.
+        :returns: the row, or ``None`` when there is no location near.
+        """
+        if pixel_key is not None:
+            with self.lock:
+                same = self.connection.execute(
+                    'SELECT MIN(id) FROM locations WHERE pixel_key = ?', (pixel_key,)
+                ).fetchone()[0]
+                if same is None:
+                    return None
+                return self.connection.execute(
+                    'SELECT COUNT(*) FROM locations WHERE id < ?', (same,)
+                ).fetchone()[0]
+        column, line = self._cell(lon, lat)
+        with self.lock:
+            candidates = self.connection.execute(
+                'SELECT id, long, lat FROM locations '
+                'WHERE cell_x BETWEEN ? AND ? AND cell_y BETWEEN ? AND ?',
+                (column - 1, column + 1, line - 1, line + 1)
+            ).fetchall()
+            nearest, distance = None, self.tolerance ** 2
+            for id_, x, y in candidates:
+                d = (x - lon) ** 2 + (y - lat) ** 2
+                if d <= distance:
+                    nearest, distance = id_, d
+            if nearest is None:
+                return None
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM locations WHERE id < ?', (nearest,)
+            ).fetchone()[0]
+
+    def add(self, lon, lat, layer_name='<none>', crs='epsg:4326', pixel_key=None):
+        """Save a location, or snap it to a saved location near it.
+
+        :param lon<float>: the longitude.
+        :param lat<float>: the latitude.
+        :param layer_name<str>: the active layer when the location was selected.
+        :param crs<str>: the coordinates reference system.
+        :param pixel_key<str>: the key of the collections pixels, see ``nearest``.
+        :returns: the location row and whether it is a new location.
+        """
+        row = self.nearest(lon, lat, pixel_key)
+        if row is not None:
+            return row, False
+        with self.lock:
+            self.connection.execute(
+                'INSERT INTO locations (long, lat, layer_name, crs, created, cell_x, cell_y, pixel_key) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (lon, lat, layer_name, crs, datetime.now().isoformat(), *self._cell(lon, lat), pixel_key)
+            )
+            self.connection.commit()
+            row = self.count
+            self.count += 1
+            self.pages.pop(row // self.page_size, None)
+        return row, True
+
+    def setCacheKey(self, location, cache_key):
+        """Save the cache key of the last trajectory fetched for a location.
+
+        Selecting the location again shows that trajectory from the cache,
+        see ``WLTS_Controls.cachedResult``.
+
+        :param location<dict>: the saved location.
+        :param cache_key<str>: the query key of ``WLTS_Controls.queryKey``.
+        """
+        location['cache_key'] = cache_key
+        with self.lock:
+            self.connection.execute(
+                'UPDATE locations SET cache_key = ? WHERE id = ?', (cache_key, location['id'])
+            )
+            self.connection.commit()
+
+    def clear(self):
+        """Remove every location."""
+        with self.lock:
+            self.connection.execute('DELETE FROM locations')
+            self.connection.commit()
+            self.pages.clear()
+            self.count = 0
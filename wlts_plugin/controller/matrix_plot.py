@@ -0,0 +1,130 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+from ..config import Config
+
+#: Plot styles of the bar plot, ``seaborn`` draws one bar per class
+STYLES = ('seaborn', 'stacked', 'heatmap')
+
+#: Maximum number of labeled ticks in the dates axis
+MAX_TICKS = 12
+
+
+def lodStyle(rows, dates):
+    """Return the bar plot style for the size of a trajectory.
+
+    :param rows<int>: the number of trajectory rows.
+    :param dates<int>: the number of dates.
+    """
+    if dates > Config.PLOT_LOD_DATES:
+        return 'heatmap'
+    if rows > Config.PLOT_LOD_ROWS:
+        return 'stacked'
+    return 'seaborn'
+
+
+def classColors(classes):
+    """Return the seaborn default color of each class, in the classes order.
+
+    :param classes<list>: the class names.
+    """
+    return dict(zip(classes, sns.color_palette(n_colors=len(classes)).as_hex()))
+
+
+def classMatrix(df):
+    """Count the rows of each date and class.
+
+    :param df<pandas.DataFrame>: the trajectory with categorical ``date``
+        and ``class`` columns.
+    :returns: a dates x classes DataFrame with every category.
+    """
+    dates = df['date'].cat.categories
+    classes = df['class'].cat.categories
+    date_codes = df['date'].cat.codes.to_numpy()
+    class_codes = df['class'].cat.codes.to_numpy()
+    valid = (date_codes >= 0) & (class_codes >= 0)
+    cells = date_codes[valid].astype(np.int64) * len(classes) + class_codes[valid]
+    counts = np.bincount(cells, minlength=len(dates) * len(classes))
+    return pd.DataFrame(counts.reshape(len(dates), len(classes)), index=dates, columns=classes)
+
+
+def countMatrix(counts, dates, classes):
+    """Reshape the counts of ``facetCounts`` in a dates x classes matrix.
+
+    :param counts<pandas.DataFrame>: the ``date``, ``class`` and ``size`` columns.
+    :param dates<list>: the dates, in the matrix order.
+    :param classes<list>: the classes, in the matrix order.
+    """
+    matrix = counts.pivot_table(
+        index='date', columns='class', values='size',
+        aggfunc='sum', fill_value=0, observed=False
+    )
+    return matrix.reindex(index=dates, columns=classes, fill_value=0)
+
+
+def _date_ticks(ax, dates):
+    """Label the dates axis, skipping labels when there are too many dates."""
+    step = max(1, -(-len(dates) // MAX_TICKS))
+    positions = np.arange(0, len(dates), step)
+    ax.set_xticks(positions)
+    ax.set_xticklabels([str(dates[i]) for i in positions], rotation=90 if len(positions) > 6 else 0)
+
+
+def drawStackedBars(ax, matrix, colors, opacity=0.8):
+    """Draw one bar per date, stacking the classes counts.
+
+    :param ax<matplotlib.axes.Axes>: the axes to draw on.
+    :param matrix<pandas.DataFrame>: the dates x classes counts.
+    :param colors<dict>: the color of each class.
+    :param opacity<float>: the bars alpha.
+    """
+    values = matrix.to_numpy()
+    bottoms = np.zeros(len(matrix.index))
+    positions = np.arange(len(matrix.index))
+    for i, name in enumerate(matrix.columns):
+        if values[:, i].any():
+            ax.bar(
+                positions, values[:, i], bottom=bottoms, width=0.8,
+                color=colors.get(name), alpha=opacity, label=str(name), linewidth=0
+            )
+        bottoms += values[:, i]
+    ax.set_xlim(-0.5, len(positions) - 0.5)
+    _date_ticks(ax, list(matrix.index))
+
+
+def drawHeatmap(ax, matrix, vmax=None):
+    """Draw the classes counts of each date as a heatmap.
+
+    :param ax<matplotlib.axes.Axes>: the axes to draw on.
+    :param matrix<pandas.DataFrame>: the dates x classes counts.
+    :param vmax<float>: the count of the darkest cell, shared by facets.
+    :returns: the image, to draw a colorbar.
+    """
+    image = ax.imshow(
+        matrix.to_numpy().T, aspect='auto', interpolation='nearest',
+        cmap='viridis', vmin=0, vmax=vmax, origin='lower'
+    )
+    ax.set_yticks(np.arange(len(matrix.columns)))
+    ax.set_yticklabels([str(name) for name in matrix.columns])
+    ax.grid(False)
+    _date_ticks(ax, list(matrix.index))
+    return image
@@ -0,0 +1,150 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+
+
+class MetadataCache:
+    """Persistent cache of service documents revalidated with HTTP validators.
+
+    The collections list, the collection descriptions and the classification
+    systems rarely change. Each document is saved with its ``ETag`` and
+    ``Last-Modified`` headers and, after ``max_age`` seconds, requested
+    again with ``If-None-Match`` and ``If-Modified-Since``: a ``304`` answer
+    keeps the saved document, so a warm start transfers almost nothing,
+    and a changed document is downloaded and replaces it.
+
+    A value built from the document, e.g. the colors of a classification
+    system, can be saved in place of the document and is built again only
+    when the document changes.
+
+    :Methods:
+        key
+        fetch
+        clear
+    """
+
+    def __init__(self, path=':memory:', max_age=300.0, timeout=30.0):
+        """Open or create the cache database.
+
+        :param path<str>: the SQLite file, or ``":memory:"``.
+        :param max_age<float>: the seconds a document is used without revalidation.
+        :param timeout<float>: the seconds to wait for an answer.
+        """
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_age = max_age
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS documents ('
+            'url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+            'value TEXT NOT NULL, checked REAL NOT NULL)'
+        )
+        self.connection.commit()
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+
+    @staticmethod
+    def key(url, params=None):
+        """Return the cache key of a request, with the parameters in order."""
+        return f'{url}?{urlencode(sorted(params.items()))}' if params else url
+
+    def _saved(self, key):
+        """Return the (etag, last_modified, value, checked) of a document, or ``None``."""
+        with self.lock:
+            return self.connection.execute(
+                'SELECT etag, last_modified, value, checked FROM documents WHERE url = ?', (key,)
+            ).fetchone()
+
+    def _save(self, key, etag, last_modified, value):
+        """Save a document value with its validators."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO documents (url, etag, last_modified, value, checked) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, etag, last_modified, json.dumps(value), time.time())
+            )
+            self.connection.commit()
+
+    def _touch(self, key):
+        """Mark a saved document as revalidated now."""
+        with self.lock:
+            self.connection.execute('UPDATE documents SET checked = ? WHERE url = ?', (time.time(), key))
+            self.connection.commit()
+
+    def _request(self, url, params, headers):
+        """Send a GET request, raising the HTTP errors other than ``304``."""
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    def fetch(self, url, params=None, limiter=None, build=None, headers=None):
+        """Return a JSON document, from the cache when the server did not change it.
+
+        :param url<str>: the document URL.
+        :param params<dict>: the query parameters.
+        :param limiter<RateLimiter>: the limiter of the server, when the
+            request must respect it.
+        :param build<callable>: called with a downloaded document, its
+            result is saved and returned instead of the document.
+        :param headers<dict>: the request headers, e.g. an access token.
+        :returns: the document, or the value built from it.
+        """
+        key = self.key(url, params)
+        saved = self._saved(key)
+        if saved is not None and time.time() - saved[3] < self.max_age:
+            self.hits += 1
+            return json.loads(saved[2])
+        headers = dict(headers or {})
+        if saved is not None and saved[0]:
+            headers['If-None-Match'] = saved[0]
+        if saved is not None and saved[1]:
+            headers['If-Modified-Since'] = saved[1]
+        if limiter is not None:
+            response = limiter.call(self._request, url, params, headers)
+        else:
+            response = self._request(url, params, headers)
+        if response.status_code == 304 and saved is not None:
+            self.revalidated += 1
+            self._touch(key)
+            return json.loads(saved[2])
+        self.downloads += 1
+        value = response.json()
+        if build is not None:
+            value = build(value)
+        self._save(key, response.headers.get('ETag'), response.headers.get('Last-Modified'), value)
+        return value
+
+    def clear(self):
+        """Remove every saved document."""
+        with self.lock:
+            self.connection.execute('DELETE FROM documents')
+            self.connection.commit()
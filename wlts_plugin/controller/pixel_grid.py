@@ -0,0 +1,140 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import json
+import math
+import threading
+from collections import OrderedDict
+
+
+class PixelGrid:
+    """Pixel grids of the Image collections, to query the same point in a pixel.
+
+    A collection description may publish its grid as::
+
+        "grid": {"crs": "EPSG:4326", "origin": [-74.0, 6.0], "pixel_size": [0.00025, 0.00025]}
+
+    with the upper left corner of the grid and the pixel size in its CRS.
+    Points in the same pixel of such a grid are moved to the pixel center,
+    so they share the request, the cache key of the trajectory and the
+    location of the history.
+
+    The pixels of the other collections are not known, a resolution alone
+    does not tell where they start, so their points are kept as clicked.
+
+    :Methods:
+        add
+        snap
+        groups
+        key
+    """
+
+    def __init__(self):
+        """Build the grids without collections."""
+        self.grids = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, description):
+        """Save the pixel grid published in a collection description.
+
+        :param name<str>: the collection name.
+        :param description<dict>: the collection description of the service.
+        """
+        self.grids.pop(name, None)
+        if str(description.get('collection_type', '')).lower() != 'image':
+            return
+        grid = self.published(description.get('grid'))
+        if grid is not None:
+            self.grids[name] = grid
+
+    def published(self, grid):
+        """Return the grid published in a description, ``None`` when it is incomplete.
+
+        :param grid<dict>: the ``crs``, ``origin`` and ``pixel_size`` of the grid.
+        :returns: the origin, pixel size and the transformations to and from
+            EPSG:4326, ``None`` in EPSG:4326.
+        """
+        try:
+            x0, y0 = (float(value) for value in grid['origin'])
+            width, height = (abs(float(value)) for value in grid['pixel_size'])
+            crs = str(grid['crs'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not width or not height:
+            return None
+        try:
+            from osgeo import osr
+            osr.UseExceptions()
+            srs = osr.SpatialReference()
+            srs.SetFromUserInput(crs)
+        except (ImportError, RuntimeError):
+            return None
+        wgs84 = osr.SpatialReference()
+        wgs84.ImportFromEPSG(4326)
+        wgs84.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        if srs.IsSame(wgs84):
+            return x0, y0, width, height, None, None
+        return (x0, y0, width, height,
+                osr.CoordinateTransformation(wgs84, srs), osr.CoordinateTransformation(srs, wgs84))
+
+    def snap(self, name, lon, lat):
+        """Return the center of the collection pixel of a point.
+
+        :param name<str>: the collection name.
+        :param lon<float>: the point longitude.
+        :param lat<float>: the point latitude.
+        :returns: the center, or the point when the collection has no grid.
+        """
+        grid = self.grids.get(name)
+        if grid is None:
+            return float(lon), float(lat)
+        x0, y0, width, height, forward, inverse = grid
+        x, y = float(lon), float(lat)
+        if forward is not None:
+            # OSR transformations are not thread safe
+            with self.lock:
+                x, y = forward.TransformPoint(x, y)[:2]
+        x = x0 + (math.floor((x - x0) / width) + 0.5) * width
+        y = y0 - (math.floor((y0 - y) / height) + 0.5) * height
+        if inverse is not None:
+            with self.lock:
+                x, y = inverse.TransformPoint(x, y)[:2]
+        return round(x, 7), round(y, 7)
+
+    def groups(self, lon, lat, collections):
+        """Group the collections by the pixel center of a point.
+
+        :returns: the collection names by (longitude, latitude), in order.
+        """
+        groups = OrderedDict()
+        for name in collections:
+            groups.setdefault(self.snap(name, lon, lat), []).append(name)
+        return groups
+
+    def key(self, lon, lat, collections):
+        """Return the key of the pixels of a point, shared by the points in them.
+
+        :param collections<list>: the collection names.
+        :returns: the pixel centers of the collections, ``None`` when a
+            collection has no published grid.
+        """
+        if not collections or any(name not in self.grids for name in collections):
+            return None
+        groups = self.groups(lon, lat, collections)
+        return json.dumps(sorted([f'{x:.7f}', f'{y:.7f}', sorted(names)] for (x, y), names in groups.items()))
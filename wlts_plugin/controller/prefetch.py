@@ -0,0 +1,120 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ..config import Config
+from .rate_limiter import Deadline, deadline, priority
+from .tracing import tracer
+from .trajectory_cache import TrajectoryCache
+
+
+class Prefetcher:
+    """Fetch the trajectory of the selected point in background.
+
+    The trajectory is saved in the controls cache, so the search shows it
+    without waiting for the service. Selecting another point cancels the
+    previous prefetch: its requests not sent yet give up their rate
+    limiter slot, see ``Deadline``, a running request is left to finish in
+    the cache.
+
+    :Methods:
+        prefetch
+        wait
+        cancel
+        shutdown
+    """
+
+    def __init__(self, wlts_controls, max_workers=2):
+        """Build the prefetcher.
+
+        :param wlts_controls<WLTS_Controls>: the controls with a trajectory cache.
+        :param max_workers<int>: the concurrent prefetches.
+        """
+        self.wlts_controls = wlts_controls
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wlts-prefetch')
+        self.futures = {}
+        self.deadlines = {}
+        self.lock = threading.Lock()
+
+    def _fetch(self, limit, lon, lat, collections, start_date, end_date):
+        """Fetch a trajectory into the cache, errors are only traced."""
+        with tracer.span('Prefetcher.fetch', collections=len(collections)), \
+                priority('prefetch'), deadline(limit):
+            self.wlts_controls.fetchTrajectory(lon, lat, collections, start_date, end_date)
+
+    def _cancel(self, key):
+        """Cancel a prefetch, the lock must be held."""
+        self.futures.pop(key).cancel()
+        self.deadlines.pop(key).cancel()
+
+    def prefetch(self, lon, lat, collections, start_date, end_date):
+        """Start fetching a trajectory, cancelling the other prefetches.
+
+        A query whose pixels are all in the cache, or with local collections
+        only, is not fetched.
+
+        :param lon<float>: the point longitude.
+        :param lat<float>: the point latitude.
+        :param collections<list>: the collection names.
+        :param start_date<str>: the begin of the time interval.
+        :param end_date<str>: the end of the time interval.
+        :returns: the cache key of the trajectory, see ``WLTS_Controls.queryKey``.
+        """
+        key = self.wlts_controls.queryKey(lon, lat, collections, start_date, end_date)
+        cache = self.wlts_controls.cache
+        with self.lock:
+            for other, future in list(self.futures.items()):
+                if future.done():
+                    self.futures.pop(other)
+                    self.deadlines.pop(other)
+                elif other != key:
+                    self._cancel(other)
+            if key in self.futures or cache is None or \
+                    all(cache.contains(part) for part in TrajectoryCache.parts(key)):
+                return key
+            self.deadlines[key] = Deadline(Config.WLTS_REQUEST_TIMEOUT)
+            self.futures[key] = self.executor.submit(
+                self._fetch, self.deadlines[key], lon, lat, list(collections), start_date, end_date
+            )
+        return key
+
+    def wait(self, key, timeout=None):
+        """Wait for the running prefetch of a trajectory.
+
+        :param key<str>: the trajectory cache key.
+        :param timeout<float>: the maximum seconds to wait.
+        :returns: whether there is no prefetch of the trajectory still running.
+        """
+        with self.lock:
+            future = self.futures.get(key)
+        if future is None or future.cancelled():
+            return True
+        return bool(wait([future], timeout=timeout).done)
+
+    def cancel(self):
+        """Cancel the prefetches, the running requests are left to finish."""
+        with self.lock:
+            for key in list(self.futures):
+                self._cancel(key)
+
+    def shutdown(self):
+        """Cancel the pending prefetches and stop the threads."""
+        self.cancel()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,331 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from ..config import Config
+from .trajectory_cache import inWindow
+
+
+class BlockCache:
+    """Least recently used cache of raster blocks shared by the readers.
+
+    :Methods:
+        get
+        nbytes
+        clear
+    """
+
+    def __init__(self, max_blocks=256):
+        """Build an empty cache.
+
+        :param max_blocks<int>: the maximum number of kept blocks.
+        """
+        self.max_blocks = max_blocks
+        self.blocks = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, read):
+        """Return a cached block, reading it on a miss.
+
+        :param key<tuple>: the block key, e.g. (path, band, column, row).
+        :param read<callable>: returns the block array.
+        """
+        with self.lock:
+            if key in self.blocks:
+                self.hits += 1
+                self.blocks.move_to_end(key)
+                return self.blocks[key]
+            self.misses += 1
+        block = read()
+        with self.lock:
+            self.blocks[key] = block
+            while len(self.blocks) > self.max_blocks:
+                self.blocks.popitem(last=False)
+        return block
+
+    def nbytes(self):
+        """Return the memory of the cached blocks."""
+        with self.lock:
+            return sum(block.nbytes for block in self.blocks.values())
+
+    def clear(self):
+        """Remove every cached block."""
+        with self.lock:
+            self.blocks.clear()
+
+
+class RasterReader:
+    """Read the pixel values of a raster band at many points.
+
+    The points are grouped by raster block, and each block is read once
+    with a windowed read and kept in the :class:`BlockCache`.
+
+    :Methods:
+        values
+    """
+
+    def __init__(self, path, band=1, cache=None):
+        """Open the raster with GDAL.
+
+        :param path<str>: the GeoTIFF, or any raster file GDAL can read.
+        :param band<int>: the band number, from 1.
+        :param cache<BlockCache>: the blocks cache.
+        :raises OSError: when the file can not be opened.
+        """
+        from osgeo import gdal, osr
+        gdal.UseExceptions()
+        self.path = str(path)
+        self.band_number = int(band)
+        self.cache = cache if cache is not None else BlockCache()
+        self.dataset = gdal.Open(self.path)
+        if self.dataset is None:
+            raise OSError(f"Could not open the raster {self.path}!")
+        self.band = self.dataset.GetRasterBand(self.band_number)
+        self.lock = threading.Lock()
+        self.width, self.height = self.dataset.RasterXSize, self.dataset.RasterYSize
+        self.block_width, self.block_height = self.band.GetBlockSize()
+        self.nodata = self.band.GetNoDataValue()
+        self.inverse = gdal.InvGeoTransform(self.dataset.GetGeoTransform())
+        self.transform = None
+        srs = self.dataset.GetSpatialRef()
+        if srs is not None:
+            wgs84 = osr.SpatialReference()
+            wgs84.ImportFromEPSG(4326)
+            wgs84.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+            srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+            if not srs.IsSame(wgs84):
+                self.transform = osr.CoordinateTransformation(wgs84, srs)
+
+    def readBlock(self, column, row):
+        """Read a block of the band, smaller at the right and bottom edges."""
+        x, y = column * self.block_width, row * self.block_height
+        # GDAL datasets can not be read by two threads at once
+        with self.lock:
+            return self.band.ReadAsArray(
+                x, y, min(self.block_width, self.width - x), min(self.block_height, self.height - y)
+            )
+
+    def values(self, lon, lat):
+        """Return the pixel values at the points.
+
+        :param lon<numpy.ndarray>: the points longitude in EPSG:4326.
+        :param lat<numpy.ndarray>: the points latitude in EPSG:4326.
+        :returns: the values as floats, ``nan`` outside the raster or on no data.
+        """
+        x, y = np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+        if self.transform is not None and len(x):
+            # OSR transformations are not thread safe either
+            with self.lock:
+                points = np.array(self.transform.TransformPoints(np.column_stack([x, y]).tolist()))
+            x, y = points[:, 0], points[:, 1]
+        g = self.inverse
+        columns = np.floor(g[0] + g[1] * x + g[2] * y).astype(int)
+        rows = np.floor(g[3] + g[4] * x + g[5] * y).astype(int)
+        result = np.full(len(x), np.nan)
+        inside = (columns >= 0) & (columns < self.width) & (rows >= 0) & (rows < self.height)
+        block_columns = columns // self.block_width
+        block_rows = rows // self.block_height
+        blocks = np.unique(np.column_stack([block_columns[inside], block_rows[inside]]), axis=0)
+        for column, row in blocks:
+            block = self.cache.get(
+                (self.path, self.band_number, int(column), int(row)),
+                lambda: self.readBlock(int(column), int(row))
+            )
+            points = inside & (block_columns == column) & (block_rows == row)
+            result[points] = block[
+                rows[points] - row * self.block_height,
+                columns[points] - column * self.block_width
+            ]
+        if self.nodata is not None:
+            result[result == self.nodata] = np.nan
+        return result
+
+
+class LocalTrajectoryEngine:
+    """Trajectories read from local classification rasters.
+
+    A local collection is a set of rasters, or bands, one for each date,
+    and a lookup table from the pixel values to the class names. The rows
+    have the same columns of the WLTS service trajectories.
+
+    The collections are registered with ``register`` or read from a JSON
+    file like::
+
+        {
+            "mapbiomas_local": {
+                "classes": {"3": "Forest Formation", "15": "Pasture"},
+                "rasters": [
+                    {"path": "mapbiomas_2020.tif", "date": "2020"},
+                    {"path": "mapbiomas_2000_2021.tif", "date": "2021", "band": 22}
+                ]
+            }
+        }
+
+    :Methods:
+        register
+        registerLayer
+        setClasses
+        load
+        save
+        filter
+        rows
+        trajectory
+    """
+
+    def __init__(self, max_blocks=None):
+        """Build an engine without collections.
+
+        :param max_blocks<int>: the raster blocks kept in memory,
+            ``Config.LOCAL_BLOCK_CACHE`` by default.
+        """
+        self.cache = BlockCache(Config.LOCAL_BLOCK_CACHE if max_blocks is None else max_blocks)
+        self.collections = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, collection):
+        """Return whether a collection is local."""
+        return collection in self.collections
+
+    def register(self, collection, path, date, band=1, classes=None):
+        """Add the raster of a date to a local collection.
+
+        :param collection<str>: the collection name.
+        :param path<str>: the raster file.
+        :param date<str>: the raster date, e.g. ``"2020"`` or ``"2020-08-01"``.
+        :param band<int>: the band of the date, from 1.
+        :param classes<dict>: the class name of each pixel value.
+        """
+        reader = RasterReader(path, band, self.cache)
+        with self.lock:
+            entry = self.collections.setdefault(collection, {'classes': {}, 'rasters': []})
+            entry['rasters'] = sorted(
+                [r for r in entry['rasters'] if r[0] != str(date)] + [(str(date), reader)],
+                key=lambda raster: raster[0]
+            )
+        if classes:
+            self.setClasses(collection, classes)
+
+    def registerLayer(self, collection, layer, date, band=1, classes=None):
+        """Add a raster layer of the QGIS project to a local collection.
+
+        :param layer<QgsRasterLayer>: a layer of a raster file.
+        :param classes<dict>: the class name of each pixel value, by default
+            the labels of a paletted layer.
+        """
+        if classes is None:
+            renderer = layer.renderer()
+            palette = renderer.classes() if hasattr(renderer, 'classes') else []
+            classes = {item.value: item.label for item in palette if item.label}
+        self.register(collection, layer.source(), date, band, classes)
+
+    def setClasses(self, collection, classes):
+        """Set the lookup table of a local collection.
+
+        :param classes<dict>: the class name of each pixel value, values
+            without class are shown as numbers.
+        """
+        with self.lock:
+            entry = self.collections.setdefault(collection, {'classes': {}, 'rasters': []})
+            entry['classes'] = {int(value): str(name) for value, name in classes.items()}
+
+    def load(self, file_name):
+        """Register the local collections of a JSON file.
+
+        :param file_name<str>: the JSON file, raster paths are relative to it.
+        """
+        folder = Path(file_name).parent
+        with open(file_name) as f:
+            collections = json.load(f)
+        for collection, spec in collections.items():
+            for raster in spec.get('rasters', []):
+                self.register(collection, folder / raster['path'], raster['date'], raster.get('band', 1))
+            self.setClasses(collection, spec.get('classes', {}))
+
+    def save(self, file_name):
+        """Write the local collections to a JSON file read by ``load``.
+
+        :param file_name<str>: the JSON file, raster paths are saved absolute.
+        """
+        with self.lock:
+            collections = {
+                collection: {
+                    'classes': {str(value): name for value, name in entry['classes'].items()},
+                    'rasters': [
+                        {'path': str(Path(reader.path).resolve()), 'date': date, 'band': reader.band_number}
+                        for date, reader in entry['rasters']
+                    ]
+                }
+                for collection, entry in self.collections.items()
+            }
+        Path(file_name).parent.mkdir(parents=True, exist_ok=True)
+        with open(file_name, 'w') as f:
+            json.dump(collections, f, indent=4)
+
+    def filter(self, collections):
+        """Return the local collections of a list, in the same order."""
+        return [collection for collection in collections if collection in self.collections]
+
+    def rows(self, lon, lat, collections, start_date, end_date):
+        """Return the trajectory rows of many points.
+
+        :param lon<list>: the points longitude in EPSG:4326.
+        :param lat<list>: the points latitude in EPSG:4326.
+        :param collections<list>: the local collection names.
+        :param start_date<str>: the begin of the time interval.
+        :param end_date<str>: the end of the time interval.
+        :returns: the rows of each point, ``point_id`` from 1.
+        """
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        result = [[] for _ in range(len(lon))]
+        for collection in collections:
+            entry = self.collections[collection]
+            for date, reader in entry['rasters']:
+                if not inWindow(date, start_date, end_date):
+                    continue
+                values = reader.values(lon, lat)
+                for index in np.flatnonzero(~np.isnan(values)):
+                    value = int(values[index])
+                    result[index].append({
+                        'class': entry['classes'].get(value, str(value)),
+                        'collection': collection,
+                        'date': date,
+                        'point_id': int(index) + 1
+                    })
+        return result
+
+    def trajectory(self, lon, lat, collections, start_date, end_date):
+        """Return the trajectory of a single point as the WLTS service does."""
+        return {
+            'query': {
+                'collections': list(collections),
+                'end_date': end_date,
+                'latitude': lat,
+                'longitude': lon,
+                'start_date': start_date
+            },
+            'result': {'trajectory': self.rows([lon], [lat], collections, start_date, end_date)[0]}
+        }
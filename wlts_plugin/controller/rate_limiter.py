@@ -0,0 +1,348 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from ..config import Config
+
+#: HTTP status codes answered by a server that is throttling the client
+THROTTLE_STATUS = (429, 503)
+
+#: Request priority classes, the lower value is served first
+PRIORITIES = {'interactive': 0, 'prefetch': 1, 'batch': 2}
+
+_context = threading.local()
+
+
+@contextmanager
+def priority(name, flow=None):
+    """Send the requests of the current thread with a priority class.
+
+    Requests without a priority are interactive.
+
+    :param name<str>: ``interactive``, ``prefetch`` or ``batch``, or the
+        priority value of ``currentPriority``.
+    :param flow<str>: the job sending the requests, jobs of the same class
+        share the requests in turns.
+    """
+    previous = getattr(_context, 'value', None)
+    _context.value = (PRIORITIES.get(name, name), flow)
+    try:
+        yield
+    finally:
+        _context.value = previous
+
+
+def currentPriority():
+    """Return the (priority, flow) of the requests of the current thread."""
+    return getattr(_context, 'value', None) or (PRIORITIES['interactive'], None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """A request not sent before the deadline of its caller."""
+
+
+class Deadline:
+    """The time before which a request must be sent, and its attempts waiting for a slot.
+
+    A deadline is cancelled when its caller gives up before it passes, e.g.
+    a prefetch of a point no longer selected. The deadlines of the attempts
+    sent for a caller share its cancellation.
+
+    :Methods:
+        remaining
+        cancel
+        cancelled
+    """
+
+    def __init__(self, seconds, parent=None):
+        """Build a deadline.
+
+        :param seconds<float>: the seconds from now.
+        :param parent<Deadline>: the deadline of the caller, whose
+            cancellation also cancels this one.
+        """
+        self.at = time.monotonic() + seconds
+        self.waiting = 0
+        self.event = parent.event if parent is not None else threading.Event()
+
+    def remaining(self):
+        """Return the seconds left, negative once passed."""
+        return self.at - time.monotonic()
+
+    def cancel(self):
+        """Give up the requests not sent yet, a running request is left to finish."""
+        self.event.set()
+
+    def cancelled(self):
+        """Return whether the caller gave up the requests."""
+        return self.event.is_set()
+
+
+@contextmanager
+def deadline(value):
+    """Give up the requests of the current thread not sent before a deadline.
+
+    The wait for a request slot and the retries of throttled requests stop
+    at the deadline, so a request whose caller gave up does not take a slot.
+
+    :param value<Deadline>: the deadline, counting the requests waiting
+        for a slot.
+    """
+    previous = getattr(_context, 'deadline', None)
+    _context.deadline = value
+    try:
+        yield
+    finally:
+        _context.deadline = previous
+
+
+def currentDeadline():
+    """Return the deadline of the requests of the current thread, or ``None``."""
+    return getattr(_context, 'deadline', None)
+
+
+def throttleStatus(error):
+    """Return the throttling HTTP status of an error raised by a request.
+
+    :param error<Exception>: the error raised by the HTTP client.
+    :returns: the status code, or ``None`` when it is not a throttling error.
+    """
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    return status if status in THROTTLE_STATUS else None
+
+
+def retryAfter(error):
+    """Return the seconds to wait from the ``Retry-After`` header of an error.
+
+    :param error<Exception>: the error raised by the HTTP client.
+    :returns: the seconds to wait, or ``None`` without a valid header.
+    """
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Client side token bucket and max in-flight governor for a server.
+
+    The request rate and the concurrency back off by half when the server
+    answers 429 or 503, honoring ``Retry-After``, and grow back slowly on
+    each success, so large jobs run as fast as the server allows.
+
+    Waiting requests are served by priority class, see ``priority``, so an
+    interactive request only waits for a running request to finish, even
+    behind a large batch. In a class, the jobs are served in turns.
+
+    :Methods:
+        forHost
+        setMaxInFlight
+        slot
+        call
+        throttled
+        succeeded
+    """
+
+    _hosts = {}
+    _hosts_lock = threading.Lock()
+
+    def __init__(self, max_rps=10.0, max_in_flight=4, max_retries=3):
+        """Build the limiter.
+
+        :param max_rps<float>: the maximum requests per second.
+        :param max_in_flight<int>: the maximum concurrent requests.
+        :param max_retries<int>: the retries of a throttled request.
+        """
+        self.max_rps = float(max_rps)
+        self.max_in_flight = int(max_in_flight)
+        self.max_retries = int(max_retries)
+        self.rate = self.max_rps
+        self.limit = self.max_in_flight
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.waiting = []
+        self.issued = {}
+        self.virtual = {}
+        self.sequence = 0
+
+    @classmethod
+    def forHost(cls, url):
+        """Return the limiter shared by every client of a server.
+
+        :param url<str>: any URL of the server.
+        """
+        host = urlparse(url).netloc or url
+        with cls._hosts_lock:
+            if host not in cls._hosts:
+                cls._hosts[host] = cls(
+                    max_rps=Config.WLTS_MAX_RPS,
+                    max_in_flight=Config.WLTS_MAX_IN_FLIGHT,
+                    max_retries=Config.WLTS_MAX_RETRIES
+                )
+            return cls._hosts[host]
+
+    def setMaxInFlight(self, max_in_flight):
+        """Change the maximum concurrent requests.
+
+        :param max_in_flight<int>: the maximum concurrent requests.
+        """
+        with self.condition:
+            self.max_in_flight = max(1, int(max_in_flight))
+            self.limit = self.max_in_flight
+            self.condition.notify_all()
+
+    def _ticket(self):
+        """Queue a ticket of the current thread, the condition must be held.
+
+        Tickets are ordered by priority, then by the turn of their job: a
+        job takes the turn after its last ticket, and a new job the turn
+        being served, so it does not wait for the older jobs queue.
+        """
+        priority_, flow = currentPriority()
+        turn = max(self.issued.get((priority_, flow), 0), self.virtual.get(priority_, 0)) + 1
+        self.issued[(priority_, flow)] = turn
+        self.sequence += 1
+        ticket = (priority_, turn, self.sequence)
+        heapq.heappush(self.waiting, ticket)
+        return ticket
+
+    def _wait_turn(self, ticket):
+        """Block until the ticket is the first with a free slot and a token.
+
+        :raises DeadlineExceeded: when the deadline of the thread passes first,
+            or it is cancelled.
+        """
+        limit = getattr(_context, 'deadline', None)
+
+        def wait(seconds=None):
+            if limit is not None:
+                remaining = limit.remaining()
+                if remaining <= 0:
+                    raise DeadlineExceeded("no request slot before the deadline")
+                seconds = remaining if seconds is None else min(seconds, remaining)
+            self.condition.wait(seconds)
+
+        while True:
+            if limit is not None and limit.cancelled():
+                raise DeadlineExceeded("the request was cancelled by its caller")
+            now = time.monotonic()
+            if self.waiting[0] != ticket or self.in_flight >= self.limit:
+                wait()
+                continue
+            if now < self.paused_until:
+                wait(self.paused_until - now)
+                continue
+            self.tokens = min(1.0, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            wait((1.0 - self.tokens) / self.rate)
+
+    @contextmanager
+    def slot(self):
+        """Hold a request slot, waiting for the turn, a token and the concurrency limit."""
+        limit = getattr(_context, 'deadline', None)
+        with self.condition:
+            ticket = self._ticket()
+            if limit is not None:
+                limit.waiting += 1
+            try:
+                self._wait_turn(ticket)
+            finally:
+                if limit is not None:
+                    limit.waiting -= 1
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.condition.notify_all()
+            self.virtual[ticket[0]] = ticket[1]
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def throttled(self, retry_after=None):
+        """Back off after a throttling answer of the server.
+
+        :param retry_after<float>: seconds requested by the server.
+        """
+        with self.condition:
+            self.rate = max(self.max_rps / 32, self.rate / 2)
+            self.limit = max(1, self.limit // 2)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.condition.notify_all()
+
+    def succeeded(self):
+        """Grow the rate and the concurrency back after a success."""
+        with self.condition:
+            self.rate = min(self.max_rps, self.rate + self.max_rps / 20)
+            if self.rate >= self.max_rps and self.limit < self.max_in_flight:
+                self.limit += 1
+                self.condition.notify_all()
+
+    def call(self, function, *args, **kwargs):
+        """Call a function that sends a request under the limiter.
+
+        Throttled requests are retried up to ``max_retries`` times, and
+        before the deadline of the thread, see ``deadline``.
+
+        :param function<callable>: the function sending the request.
+        :returns: the function result.
+        :raises: the last error when the retries are exhausted.
+        :raises DeadlineExceeded: when no slot is free before the deadline.
+        """
+        limit = getattr(_context, 'deadline', None)
+        attempt = 0
+        while True:
+            try:
+                with self.slot():
+                    result = function(*args, **kwargs)
+            except Exception as error:
+                if throttleStatus(error) is None or attempt >= self.max_retries:
+                    raise
+                if limit is not None and limit.remaining() <= (retryAfter(error) or 0.0):
+                    raise
+                attempt += 1
+                self.throttled(retryAfter(error))
+                continue
+            self.succeeded()
+            return result
@@ -0,0 +1,135 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import threading
+from collections import OrderedDict
+
+#: Estimate of the memory of a feature of the temporary map layers
+FEATURE_BYTES = 1024
+
+
+def formatBytes(size):
+    """Return a size in bytes as a short text, e.g. ``1.5 MB``.
+
+    :param size<int>: the size in bytes.
+    """
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:,.0f} {unit}" if unit == 'B' else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+class SessionResources:
+    """Memory held by the plugin during a QGIS session, under a budget.
+
+    Each resource is registered with a function returning its current size
+    in bytes and a function releasing it, e.g. the trajectory drawn on the
+    chart, the chart worker processes, the raster blocks or the map layers.
+    Using a resource marks it as the most recent, and when the total is
+    above the budget the least recently used resources are released first.
+
+    :Methods:
+        add
+        remove
+        touch
+        usage
+        total
+        enforce
+        release
+        releaseAll
+    """
+
+    def __init__(self, budget):
+        """Build an empty registry.
+
+        :param budget<int>: the memory budget in bytes.
+        """
+        self.budget = int(budget)
+        self.lock = threading.Lock()
+        self.resources = OrderedDict()
+
+    def add(self, name, size, release):
+        """Track a resource, as the most recently used.
+
+        :param name<str>: the resource name shown to the user.
+        :param size<callable>: returns the resource size in bytes.
+        :param release<callable>: frees the resource.
+        """
+        with self.lock:
+            self.resources[name] = (size, release)
+
+    def remove(self, name):
+        """Stop tracking a resource, without releasing it."""
+        with self.lock:
+            self.resources.pop(name, None)
+
+    def touch(self, *names):
+        """Mark resources as used now and release others when above the budget.
+
+        :param names<str>: the used resource names.
+        :returns: the released resource names.
+        """
+        with self.lock:
+            for name in names:
+                if name in self.resources:
+                    self.resources.move_to_end(name)
+        return self.enforce(keep=names)
+
+    def usage(self):
+        """Return the (name, bytes) of each resource, the most recently used first."""
+        with self.lock:
+            resources = list(self.resources.items())
+        return [(name, int(size())) for name, (size, _) in reversed(resources)]
+
+    def total(self):
+        """Return the bytes held by every resource."""
+        return sum(size for _, size in self.usage())
+
+    def enforce(self, keep=()):
+        """Release the least recently used resources until the total is in the budget.
+
+        :param keep<tuple>: the resource names that must not be released.
+        :returns: the released resource names.
+        """
+        usage = self.usage()
+        total = sum(size for _, size in usage)
+        released = []
+        for name, size in reversed(usage):
+            if total <= self.budget:
+                break
+            if name in keep or not size:
+                continue
+            self.release(name)
+            released.append(name)
+            total -= size
+        return released
+
+    def release(self, name):
+        """Release a resource, it stays tracked and may grow again."""
+        with self.lock:
+            resource = self.resources.get(name)
+        if resource is not None:
+            resource[1]()
+
+    def releaseAll(self):
+        """Release every resource, e.g. when the dialog is closed."""
+        with self.lock:
+            names = list(self.resources)
+        for name in names:
+            self.release(name)
@@ -0,0 +1,380 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from ..config import Config
+from .rate_limiter import (Deadline, DeadlineExceeded, currentDeadline,
+                           currentPriority, deadline, priority, throttleStatus)
+from .tracing import tracer
+
+#: Fraction of the requests that may be sent twice
+HEDGE_RATIO = 0.1
+
+
+def serviceFailure(error):
+    """Return whether an error tells that the server failed to answer.
+
+    Timeouts, connection errors, throttling and 5xx answers are failures of
+    the server. Other HTTP errors (e.g. an unknown collection), errors of
+    the client (e.g. a ``ValueError`` of a bad query) and requests never
+    sent are not.
+
+    :param error<Exception>: the error raised by a request.
+    """
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None:
+        return status >= 500 or throttleStatus(error) is not None
+    # The transport errors of the HTTP clients are OSError, as TimeoutError
+    return isinstance(error, OSError) and not isinstance(error, DeadlineExceeded)
+
+
+class CircuitOpenError(Exception):
+    """Collections that failed repeatedly and are not requested for a while."""
+
+    def __init__(self, collections, retry_in):
+        """Build the error.
+
+        :param collections<list>: the collection names.
+        :param retry_in<float>: seconds until the next request is sent.
+        """
+        super().__init__(
+            f"{', '.join(collections)} not answering, retried in {math.ceil(retry_in)} s"
+        )
+        self.collections = list(collections)
+        self.retry_in = retry_in
+
+
+class LatencyHistogram:
+    """Histogram of request latencies in logarithmic buckets.
+
+    Buckets grow by 2^(1/4) from one millisecond, so a quantile is read
+    with less than 20% error at any scale. The counts are halved when they
+    reach the window, so old measures fade out.
+
+    :Methods:
+        record
+        quantile
+    """
+
+    START = 0.001
+    GROWTH = 2 ** 0.25
+    BUCKETS = 100
+
+    def __init__(self, window=500):
+        """Build an empty histogram.
+
+        :param window<int>: the measures after which the counts are halved.
+        """
+        self.window = window
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+
+    def record(self, seconds):
+        """Count a latency.
+
+        :param seconds<float>: the request duration.
+        """
+        index = 0
+        if seconds > self.START:
+            index = min(self.BUCKETS - 1, int(math.log(seconds / self.START, self.GROWTH)) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        if self.count >= self.window:
+            self.counts = [count // 2 for count in self.counts]
+            self.count = sum(self.counts)
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket of a quantile.
+
+        :param q<float>: the quantile, between 0 and 1.
+        :returns: the latency in seconds, or ``None`` without measures.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.START * self.GROWTH ** index
+        return self.START * self.GROWTH ** (self.BUCKETS - 1)
+
+
+class CircuitBreaker:
+    """Stop requesting a collection after consecutive failures.
+
+    The circuit opens after ``failures`` failures in a row and, after the
+    cooldown, lets a single trial request through: it is closed again when
+    the trial succeeds and reopened when it fails.
+
+    :Methods:
+        isOpen
+        allow
+        success
+        failure
+    """
+
+    def __init__(self, failures=5, cooldown=30.0):
+        """Build a closed circuit.
+
+        :param failures<int>: the failures in a row that open the circuit.
+        :param cooldown<float>: the seconds before a trial request.
+        """
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive = 0
+        self.opened = False
+        self.open_until = 0.0
+
+    def isOpen(self, now=None):
+        """Return whether requests are refused now."""
+        return self.opened and (now or time.monotonic()) < self.open_until
+
+    def allow(self, now=None):
+        """Return whether a request can be sent, taking the trial of an open circuit."""
+        now = now or time.monotonic()
+        if not self.opened:
+            return True
+        if now < self.open_until:
+            return False
+        # Only one trial per cooldown, the others wait for its answer
+        self.open_until = now + self.cooldown
+        return True
+
+    def success(self):
+        """Close the circuit after a successful request."""
+        self.consecutive = 0
+        self.opened = False
+
+    def failure(self, now=None):
+        """Count a failed request, opening the circuit after too many."""
+        self.consecutive += 1
+        if self.opened or self.consecutive >= self.failures:
+            self.opened = True
+            self.open_until = (now or time.monotonic()) + self.cooldown
+
+
+class TailLatency:
+    """Hedged requests and circuit breakers driven by per-collection latencies.
+
+    A request slower than the 95th percentile latency of its slowest
+    collection is sent again, and the first answer is used; at most
+    ``HEDGE_RATIO`` of the requests are hedged, so a slow server is not
+    flooded. A request without answer after ``timeout`` fails. Collections
+    that keep failing open their circuit and are refused at once.
+
+    The requests run in a bounded pool of threads, and each one is sent
+    with the remaining time as its ``deadline``, so an attempt given up by
+    its caller does not wait for a slot of the rate limiter.
+
+    :Methods:
+        forHost
+        histogram
+        breaker
+        threshold
+        reasons
+        call
+        stats
+    """
+
+    _hosts = {}
+    _hosts_lock = threading.Lock()
+
+    def __init__(self, timeout=60.0, hedge=True, failures=5, cooldown=30.0, min_samples=20, workers=8):
+        """Build the controls.
+
+        :param timeout<float>: the seconds to wait for an answer.
+        :param hedge<bool>: whether slow requests are sent again.
+        :param failures<int>: the failures in a row that open a circuit.
+        :param cooldown<float>: the seconds an open circuit refuses requests.
+        :param min_samples<int>: the measures of a collection before hedging.
+        :param workers<int>: the threads sending the requests and their hedges.
+        """
+        self.timeout = float(timeout)
+        self.hedge = hedge
+        self.failures = failures
+        self.cooldown = float(cooldown)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.breakers = {}
+        self.requests = 0
+        self.hedges = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wlts-request')
+
+    @classmethod
+    def forHost(cls, url):
+        """Return the controls shared by every client of a server.
+
+        :param url<str>: any URL of the server.
+        """
+        host = urlparse(url).netloc or url
+        with cls._hosts_lock:
+            if host not in cls._hosts:
+                cls._hosts[host] = cls(
+                    timeout=Config.WLTS_REQUEST_TIMEOUT,
+                    hedge=Config.WLTS_HEDGE,
+                    failures=Config.WLTS_BREAKER_FAILURES,
+                    cooldown=Config.WLTS_BREAKER_COOLDOWN,
+                    # The batch workers, the prefetches and their hedges
+                    workers=2 * Config.WLTS_MAX_IN_FLIGHT + 4
+                )
+            return cls._hosts[host]
+
+    def histogram(self, collection):
+        """Return the latency histogram of a collection, the lock must be held."""
+        if collection not in self.histograms:
+            self.histograms[collection] = LatencyHistogram()
+        return self.histograms[collection]
+
+    def breaker(self, collection):
+        """Return the circuit breaker of a collection, the lock must be held."""
+        if collection not in self.breakers:
+            self.breakers[collection] = CircuitBreaker(self.failures, self.cooldown)
+        return self.breakers[collection]
+
+    def threshold(self, collections):
+        """Return the latency after which a request of the collections is hedged.
+
+        :param collections<list>: the collection names of the request.
+        :returns: the seconds, or ``None`` while a collection has few measures.
+        """
+        with self.lock:
+            latencies = [
+                self.histograms[name].quantile(0.95) if name in self.histograms and
+                self.histograms[name].count >= self.min_samples else None
+                for name in collections
+            ]
+        if not latencies or None in latencies:
+            return None
+        return max(latencies)
+
+    def reasons(self, collections):
+        """Return why each collection with an open circuit is not requested.
+
+        :param collections<list>: the collection names.
+        """
+        now = time.monotonic()
+        with self.lock:
+            return {
+                name: f"not answering, retried in {math.ceil(self.breakers[name].open_until - now)} s"
+                for name in collections if name in self.breakers and self.breakers[name].isOpen(now)
+            }
+
+    def _admit(self, collections):
+        """Take the request slot of the collections circuits or raise ``CircuitOpenError``."""
+        now = time.monotonic()
+        with self.lock:
+            refused = [name for name in collections if self.breaker(name).isOpen(now)]
+            if refused:
+                retry_in = min(self.breakers[name].open_until for name in refused) - now
+                raise CircuitOpenError(refused, retry_in)
+            for name in collections:
+                self.breaker(name).allow(now)
+            self.requests += 1
+
+    def _allowHedge(self):
+        """Count a hedged request when the budget allows it."""
+        with self.lock:
+            if self.hedges + 1 > HEDGE_RATIO * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def _start(self, function, args, kwargs, limit):
+        """Run a request in the pool with the priority of the caller and a deadline."""
+        level, flow = currentPriority()
+
+        def run():
+            with priority(level, flow), deadline(limit):
+                return function(*args, **kwargs)
+
+        return self.executor.submit(run)
+
+    def _record(self, collections, seconds, error=None):
+        """Count the latency of a successful request or the failure of the collections."""
+        with self.lock:
+            for name in collections:
+                if error is None:
+                    self.histogram(name).record(seconds)
+                    self.breaker(name).success()
+                elif serviceFailure(error):
+                    self.breaker(name).failure()
+
+    def call(self, names, function, *args, **kwargs):
+        """Send a request of some collections, hedging it when it is slow.
+
+        :param names<list>: the collection names of the request.
+        :param function<callable>: the function sending the request.
+        :returns: the first answer.
+        :raises CircuitOpenError: when a collection circuit is open.
+        :raises TimeoutError: without answer after ``timeout`` seconds.
+        """
+        self._admit(names)
+        threshold = self.threshold(names) if self.hedge else None
+        begin = time.monotonic()
+        # A request cancelled by the caller is not sent by its attempts either
+        limit = Deadline(self.timeout, parent=currentDeadline())
+        pending = {self._start(function, args, kwargs, limit)}
+        if threshold is not None and threshold < self.timeout:
+            done, _ = wait(pending, timeout=threshold)
+            if not done and self._allowHedge():
+                with tracer.span('TailLatency.hedge', collections=len(names), after=threshold):
+                    pending.add(self._start(function, args, kwargs, limit))
+        error = None
+        try:
+            while pending:
+                done, pending = wait(
+                    pending, timeout=max(0.0, limit.remaining()), return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    error = TimeoutError(f"no answer after {self.timeout:g} s")
+                    # Waiting for a thread or a slot of the client is not a failure of the server
+                    if sum(future.running() for future in pending) <= limit.waiting:
+                        error = DeadlineExceeded(f"not sent after {self.timeout:g} s")
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        self._record(names, time.monotonic() - begin)
+                        return future.result()
+                    error = future.exception()
+        finally:
+            # The attempts still queued are not sent
+            for future in pending:
+                future.cancel()
+        self._record(names, time.monotonic() - begin, error)
+        raise error
+
+    def stats(self):
+        """Return the latency quantiles and circuit state of each collection."""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                name: {
+                    'requests': self.histogram(name).count,
+                    'p50': self.histogram(name).quantile(0.5),
+                    'p95': self.histogram(name).quantile(0.95),
+                    'open': self.breaker(name).isOpen(now)
+                }
+                for name in set(self.histograms) | set(self.breakers)
+            }
@@ -0,0 +1,159 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from ..config import Config
+
+
+class Tracer:
+    """Record timing spans of the plugin hot paths.
+
+    The last spans are kept in memory to be shown in the dialog, sent to
+    the subscribed listeners and exported as a Chrome trace file.
+
+    :Methods:
+        span
+        traced
+        subscribe
+        recent
+        clear
+        exportChromeTrace
+    """
+
+    def __init__(self, capacity=200):
+        """Build an empty tracer.
+
+        :param capacity<int>: the number of spans kept in memory.
+        """
+        self.spans = deque(maxlen=capacity)
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **args):
+        """Measure the block of code as a span.
+
+        :param name<str>: the operation name.
+        :param args: details saved with the span, e.g. the collection name.
+        """
+        start = time.time()
+        begin = time.perf_counter()
+        error = None
+        try:
+            yield args
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            self.record({
+                'name': name,
+                'start': start,
+                'duration': time.perf_counter() - begin,
+                'thread': threading.get_ident(),
+                'args': {key: str(value) for key, value in args.items()},
+                'error': error
+            })
+
+    def traced(self, name=None):
+        """Decorate a function to measure each call as a span.
+
+        :param name<str>: the operation name, defaults to the function name.
+        """
+        def decorator(function):
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, span):
+        """Store a finished span and notify the listeners."""
+        with self.lock:
+            self.spans.append(span)
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(span)
+
+    def subscribe(self, listener):
+        """Call ``listener(span)`` for each finished span.
+
+        :param listener<callable>: the function to call, added only once.
+        """
+        with self.lock:
+            if listener not in self.listeners:
+                self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Stop calling the listener."""
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def recent(self, size=None):
+        """Return the last spans, most recent first.
+
+        :param size<int>: the number of spans, all kept spans by default.
+        """
+        with self.lock:
+            spans = list(self.spans)
+        spans.reverse()
+        return spans[:size] if size else spans
+
+    def clear(self):
+        """Remove the kept spans."""
+        with self.lock:
+            self.spans.clear()
+
+    def exportChromeTrace(self, file_name):
+        """Save the kept spans in the Chrome trace event format.
+
+        The file can be opened in ``chrome://tracing`` or Perfetto.
+
+        :param file_name<str>: file to save path.
+        """
+        pid = os.getpid()
+        events = []
+        for span in reversed(self.recent()):
+            args = dict(span['args'])
+            if span['error']:
+                args['error'] = span['error']
+            events.append({
+                'name': span['name'],
+                'cat': 'wlts',
+                'ph': 'X',
+                'ts': span['start'] * 1e6,
+                'dur': span['duration'] * 1e6,
+                'pid': pid,
+                'tid': span['thread'],
+                'args': args
+            })
+        with open(file_name, 'w') as outfile:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, outfile)
+
+
+tracer = Tracer(Config.TRACE_CAPACITY)
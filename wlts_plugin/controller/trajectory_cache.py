@@ -0,0 +1,311 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+
+def _day(value):
+    """Return the date of a ``yyyy-mm-dd`` string, or raise ``ValueError``."""
+    return date.fromisoformat(str(value)[:10])
+
+
+def missingIntervals(start_date, end_date, covered):
+    """Return the sub-intervals of a time window that are not covered.
+
+    :param start_date<str>: the begin of the time window, ``yyyy-mm-dd``.
+    :param end_date<str>: the end of the time window, ``yyyy-mm-dd``.
+    :param covered<list>: the (start_date, end_date) intervals already known.
+    :returns: the missing (start_date, end_date) intervals, in order.
+    :raises ValueError: when a date is not in the ISO format.
+    """
+    cursor, end = _day(start_date), _day(end_date)
+    missing = []
+    for first, last in sorted((_day(first), _day(last)) for first, last in covered):
+        if last < cursor:
+            continue
+        if first > end:
+            break
+        if first > cursor:
+            missing.append((cursor.isoformat(), (first - timedelta(days=1)).isoformat()))
+        cursor = max(cursor, last + timedelta(days=1))
+        if cursor > end:
+            return missing
+    if cursor <= end:
+        missing.append((cursor.isoformat(), end.isoformat()))
+    return missing
+
+
+def inWindow(row_date, start_date, end_date):
+    """Return whether a trajectory date is inside a time window.
+
+    Dates are compared with the precision of the trajectory date, so the
+    year ``"2015"`` is inside a window starting on ``"2015-06-01"``.
+
+    :param row_date<str>: the trajectory date, e.g. ``"2015"`` or ``"2015-08-01"``.
+    :param start_date<str>: the begin of the time window.
+    :param end_date<str>: the end of the time window.
+    """
+    row_date = str(row_date)
+    size = len(row_date)
+    return start_date[:size] <= row_date <= end_date[:size]
+
+
+def isOpen(end_date, rows):
+    """Return whether a segment may get rows published after it was fetched.
+
+    A segment is open when it has no rows, or when its last row is before
+    the end of its window, e.g. the year of a collection not published yet.
+
+    :param end_date<str>: the end of the segment window.
+    :param rows<list>: the segment trajectory rows.
+    """
+    if not rows:
+        return True
+    last = max(str(row['date']) for row in rows)
+    return last < end_date[:len(last)]
+
+
+class TrajectoryCache:
+    """Cache of trajectory responses stored in SQLite.
+
+    Use ``":memory:"`` to keep the cache only for the session, or a file
+    path to share it between sessions and batch runs. The least recently
+    used entries are removed above ``max_entries``.
+
+    With ``max_age``, the responses older than it are requested again, and
+    so are the open segments, see ``isOpen``: an interval cached as empty,
+    or ending after the last published date of its collection, gets the
+    data published later. The other segments are kept, their dates do not
+    change.
+
+    :Methods:
+        key
+        get
+        contains
+        put
+        clear
+    """
+
+    def __init__(self, path=':memory:', max_entries=10000, max_age=None):
+        """Open or create the cache database.
+
+        :param path<str>: the SQLite file, or ``":memory:"``.
+        :param max_entries<int>: the maximum number of kept trajectories.
+        :param max_age<float>: the seconds a response and an open segment
+            are used before requesting them again, forever by default.
+        """
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS trajectories ('
+            'key TEXT PRIMARY KEY, response TEXT NOT NULL, accessed REAL NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS segments ('
+            'id INTEGER PRIMARY KEY, point TEXT NOT NULL, collection TEXT NOT NULL, '
+            'start_date TEXT NOT NULL, end_date TEXT NOT NULL, rows TEXT NOT NULL, '
+            'accessed REAL NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS segments_point ON segments (point, collection)'
+        )
+        # Entries of files saved without the fetch time are expired
+        for table in ('trajectories', 'segments'):
+            columns = [row[1] for row in self.connection.execute(f'PRAGMA table_info({table})')]
+            if 'fetched' not in columns:
+                self.connection.execute(f'ALTER TABLE {table} ADD COLUMN fetched REAL NOT NULL DEFAULT 0')
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(lon, lat, collections, start_date, end_date):
+        """Return the cache key of a trajectory query.
+
+        :param lon<float>: the point longitude.
+        :param lat<float>: the point latitude.
+        :param collections<list>: the collection names, in any order.
+        :param start_date<str>: the begin of the time interval.
+        :param end_date<str>: the end of the time interval.
+        """
+        return json.dumps([
+            f'{float(lon):.7f}', f'{float(lat):.7f}',
+            sorted(collections), start_date, end_date
+        ])
+
+    @staticmethod
+    def parts(key):
+        """Return the cache keys of a query key, see ``WLTS_Controls.queryKey``.
+
+        :param key<str>: a cache key, or the key made of the keys of the
+            collections pixels.
+        :returns: the key itself, or the keys it is made of, none for a
+            query of local collections only.
+        """
+        parts = json.loads(key)
+        return [key] if len(parts) == 5 and isinstance(parts[2], list) else parts
+
+    @staticmethod
+    def point(lon, lat):
+        """Return the key of a point, with the precision of the query key."""
+        return f'{float(lon):.7f},{float(lat):.7f}'
+
+    def expired(self, fetched):
+        """Return whether an entry fetched at a time must be requested again."""
+        return self.max_age is not None and fetched < time.time() - self.max_age
+
+    def get(self, key):
+        """Return a copy of the cached response, or ``None`` when missing or expired."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT response, fetched FROM trajectories WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or self.expired(row[1]):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.connection.execute(
+                'UPDATE trajectories SET accessed = ? WHERE key = ?', (time.time(), key)
+            )
+            self.connection.commit()
+        return json.loads(row[0])
+
+    def contains(self, key):
+        """Return whether a response is cached and not expired, without counting a hit."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT fetched FROM trajectories WHERE key = ?', (key,)
+            ).fetchone()
+        return row is not None and not self.expired(row[0])
+
+    def put(self, key, response):
+        """Store a response and evict the least recently used entries."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO trajectories (key, response, accessed, fetched) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(response), time.time(), time.time())
+            )
+            self.connection.execute(
+                'DELETE FROM trajectories WHERE key NOT IN ('
+                'SELECT key FROM trajectories ORDER BY accessed DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+            self.connection.commit()
+
+    def segments(self, lon, lat, collection):
+        """Return the cached segments of a point collection.
+
+        :param lon<float>: the point longitude.
+        :param lat<float>: the point latitude.
+        :param collection<str>: the collection name.
+        :returns: the (start_date, end_date, rows) segments, without the
+            expired open segments.
+        """
+        with self.lock:
+            rows = []
+            expired = []
+            for id_, start, end, data, fetched in self.connection.execute(
+                'SELECT id, start_date, end_date, rows, fetched FROM segments '
+                'WHERE point = ? AND collection = ? ORDER BY start_date',
+                (self.point(lon, lat), collection)
+            ).fetchall():
+                if self.expired(fetched) and isOpen(end, json.loads(data)):
+                    expired.append((id_,))
+                else:
+                    rows.append((id_, start, end, data))
+            if expired:
+                self.connection.executemany('DELETE FROM segments WHERE id = ?', expired)
+                self.connection.commit()
+            if rows:
+                self.connection.executemany(
+                    'UPDATE segments SET accessed = ? WHERE id = ?',
+                    [(time.time(), row[0]) for row in rows]
+                )
+                self.connection.commit()
+        return [(start, end, json.loads(data)) for _, start, end, data in rows]
+
+    def putSegment(self, lon, lat, collection, start_date, end_date, rows):
+        """Store the rows of a point collection in a time window.
+
+        The segment is merged with the cached segments it overlaps or
+        touches, so the known window of a collection stays a few intervals.
+        The merged segment keeps the fetch time of its oldest open part.
+
+        :param lon<float>: the point longitude.
+        :param lat<float>: the point latitude.
+        :param collection<str>: the collection name.
+        :param start_date<str>: the begin of the time window, ``yyyy-mm-dd``.
+        :param end_date<str>: the end of the time window, ``yyyy-mm-dd``.
+        :param rows<list>: the trajectory rows of the collection in the window.
+        """
+        point = self.point(lon, lat)
+        first, last = _day(start_date), _day(end_date)
+        merged = {row['date']: row for row in rows}
+        fetched = time.time()
+        with self.lock:
+            joined = []
+            for id_, start, end, data, segment_fetched in self.connection.execute(
+                'SELECT id, start_date, end_date, rows, fetched FROM segments '
+                'WHERE point = ? AND collection = ?', (point, collection)
+            ).fetchall():
+                start, end = _day(start), _day(end)
+                if start > last + timedelta(days=1) or end < first - timedelta(days=1):
+                    continue
+                joined.append(id_)
+                first, last = min(first, start), max(last, end)
+                segment_rows = json.loads(data)
+                if isOpen(end.isoformat(), segment_rows):
+                    fetched = min(fetched, segment_fetched)
+                for row in segment_rows:
+                    merged.setdefault(row['date'], row)
+            self.connection.executemany('DELETE FROM segments WHERE id = ?', [(id_,) for id_ in joined])
+            self.connection.execute(
+                'INSERT INTO segments (point, collection, start_date, end_date, rows, accessed, fetched) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (point, collection, first.isoformat(), last.isoformat(),
+                 json.dumps([merged[key] for key in sorted(merged)]), time.time(), fetched)
+            )
+            self.connection.execute(
+                'DELETE FROM segments WHERE id NOT IN ('
+                'SELECT id FROM segments ORDER BY accessed DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+            self.connection.commit()
+
+    def __len__(self):
+        """Return the number of cached trajectories."""
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM trajectories').fetchone()[0]
+
+    def clear(self):
+        """Remove every cached trajectory."""
+        with self.lock:
+            self.connection.execute('DELETE FROM trajectories')
+            self.connection.execute('DELETE FROM segments')
+            self.connection.commit()
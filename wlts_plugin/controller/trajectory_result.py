@@ -0,0 +1,85 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import threading
+from types import MappingProxyType
+
+
+class TrajectoryResult:
+    """The immutable result of a trajectory query.
+
+    Each query of ``WLTS_Controls.getTrajectory`` returns its own result,
+    which the plot and export functions take explicitly, so a search
+    running in another thread does not change the data being drawn. The
+    dataframe is built once, on first use, and each caller gets a copy.
+
+    :Methods:
+        df
+        nbytes
+    """
+
+    __slots__ = ('trajectory', 'query', 'skipped', '_df', '_lock')
+
+    def __init__(self, trajectory, query=None, skipped=None):
+        """Build the result.
+
+        :param trajectory<Trajectory|Trajectories>: the service response, it
+            must not be changed after the result is built.
+        :param query<dict>: the query parameters.
+        :param skipped<dict>: the collections not requested, with the reason.
+        """
+        set_ = super().__setattr__
+        set_('trajectory', trajectory)
+        set_('query', MappingProxyType(dict(query or {})))
+        set_('skipped', MappingProxyType(dict(skipped or {})))
+        set_('_df', None)
+        set_('_lock', threading.Lock())
+
+    def __setattr__(self, name, value):
+        """Refuse changes, a result is shared by the threads reading it."""
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        """Refuse changes, a result is shared by the threads reading it."""
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    @property
+    def collections(self):
+        """Return the requested collection names, without the skipped ones."""
+        return [
+            collection for collection in self.query.get('collections', [])
+            if collection not in self.skipped
+        ]
+
+    @property
+    def empty(self):
+        """Return whether every collection of the query was skipped."""
+        return not self.collections
+
+    def df(self):
+        """Return a copy of the trajectory rows as a dataframe."""
+        with self._lock:
+            if self._df is None:
+                super().__setattr__('_df', self.trajectory.df())
+        return self._df.copy()
+
+    def nbytes(self):
+        """Return the memory of the dataframe, ``0`` before it is built."""
+        with self._lock:
+            df = self._df
+        return 0 if df is None else int(df.memory_usage(deep=True).sum())
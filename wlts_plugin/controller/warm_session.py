@@ -0,0 +1,91 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+from ..config import Config
+
+
+class WarmSession:
+    """The plugin dialog kept between the runs of a QGIS session.
+
+    With ``Config.WARM_SESSION`` the dialog built on the first run is kept
+    when closed and reopened by the next runs, only its collections are
+    refreshed. Otherwise each run builds a new dialog, and closing it stops
+    the background work.
+
+    :Methods:
+        isWarm
+        reopen
+        opened
+        failed
+        close
+        unload
+        collections
+    """
+
+    def __init__(self, warm=None):
+        """Build a session without dialog.
+
+        :param warm<bool>: whether the dialog is kept, ``Config.WARM_SESSION``
+            by default.
+        """
+        self.warm = warm
+        self.kept = False
+
+    def isWarm(self):
+        """Return whether the dialog is kept between the runs."""
+        return Config.WARM_SESSION if self.warm is None else self.warm
+
+    def reopen(self):
+        """Return whether a run reopens the kept dialog instead of building one."""
+        return self.kept and self.isWarm()
+
+    def opened(self):
+        """Keep the dialog built by a run."""
+        self.kept = True
+
+    def failed(self):
+        """Forget a dialog not fully built, the next run builds it again."""
+        self.kept = False
+
+    def close(self):
+        """Return whether the closed dialog is kept, with its background work paused.
+
+        A dialog not kept is built again by the next run, and its background
+        work must be stopped.
+        """
+        self.kept = self.kept and self.isWarm()
+        return self.kept
+
+    def unload(self):
+        """Forget the dialog released when the plugin is unloaded."""
+        self.kept = False
+
+    @staticmethod
+    def collections(shown, service, local):
+        """Return how the collections checkboxes of a dialog are refreshed.
+
+        :param shown<list>: the collections with a checkbox.
+        :param service<list>: the collections listed by the service.
+        :param local<list>: the local collections.
+        :returns: the collections in order, the ones to remove and the
+            (position, collection) of the ones to add.
+        """
+        names = list(service) + [name for name in local if name not in service]
+        removed = [name for name in shown if name not in names]
+        added = [(position, name) for position, name in enumerate(names) if name not in shown]
+        return names, removed, added
@@ -16,17 +16,36 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
 #
 
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 
 import lccs
-import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
 from pyproj import CRS, Proj, transform
 from PyQt5.QtCore import QDate
 from PyQt5.QtWidgets import QInputDialog, QLineEdit, QMessageBox
 from wlts import WLTS
+from wlts.trajectories import Trajectories
+from wlts.trajectory import Trajectory
 
 from ..config import Config
+from .area_package import AreaPackage
+from .coverage_index import CoverageIndex
+from .facet_renderer import FacetRenderer
+from .matrix_plot import (STYLES, classColors, classMatrix, countMatrix,
+                          drawHeatmap, drawStackedBars, lodStyle)
+from .pixel_grid import PixelGrid
+from .raster_engine import LocalTrajectoryEngine
+from .rate_limiter import RateLimiter, currentPriority, priority
+from .tail_latency import TailLatency
+from .tracing import tracer
+from .trajectory_cache import TrajectoryCache, inWindow, missingIntervals
+from .trajectory_result import TrajectoryResult
 
 
 class Controls:
@@ -139,43 +158,480 @@ class WLTS_Controls:
         productTimeSeries
     """
 
-    def __init__(self):
-        """Build controls for WLTS Servers."""
+    def __init__(self, cache=None, metadata=None):
+        """Build controls for WLTS Servers.
+
+        :param cache<TrajectoryCache>: optional cache of trajectory responses.
+        :param metadata<MetadataCache>: optional cache of the collections
+            list, descriptions and classification system colors.
+        """
         self.wlts = WLTS(
             url = Config.WLTS_HOST,
             lccs_url = Config.LCCS_HOST
         )
         self.lccs_service = lccs.LCCS(Config.LCCS_HOST)
-        self.trajectory = None
+        self.limiter = RateLimiter.forHost(Config.WLTS_HOST)
+        self.lccs_limiter = RateLimiter.forHost(Config.LCCS_HOST)
+        self.tail = TailLatency.forHost(Config.WLTS_HOST)
+        self.cache = cache
+        self.metadata = metadata
+        self.coverage = CoverageIndex()
+        self.grid = PixelGrid()
+        self.local = LocalTrajectoryEngine()
+        if Config.LOCAL_RASTERS and os.path.exists(Config.LOCAL_RASTERS):
+            self.local.load(Config.LOCAL_RASTERS)
+        self.areas = []
+        if Config.AREAS_DIR and os.path.isdir(Config.AREAS_DIR):
+            for path in sorted(Path(Config.AREAS_DIR).glob('*.sqlite')):
+                try:
+                    self.addArea(path)
+                except ValueError:
+                    # Other SQLite files in the folder are not packages
+                    continue
+        self.renderer = FacetRenderer()
+
+    def addArea(self, path):
+        """Answer the points of an offline area package from its tiles.
+
+        :param path<str>: the package file, made by ``AreaPackage.create``.
+        :returns: the :class:`AreaPackage`.
+        """
+        area = AreaPackage(path)
+        self.areas.append(area)
+        return area
+
+    @staticmethod
+    def priority(name, flow=None):
+        """Send the requests of the current thread with a priority class.
+
+        The requests of every controls share the limiter of the server, an
+        ``interactive`` request is served before the ``prefetch`` and
+        ``batch`` ones waiting, see ``rate_limiter.priority``.
+
+        :param name<str>: ``interactive``, ``prefetch`` or ``batch``.
+        :param flow<str>: the job sending the requests.
+        """
+        return priority(name, flow)
 
     def getService(self):
         """Get the service data finding by name."""
         return self.wlts_host
 
+    @tracer.traced()
     def listCollections(self):
-        """Return a dictionary with the list of available products."""
-        return self.wlts.collections
+        """Return a dictionary with the list of available products.
+
+        With a metadata cache, the saved list is used while the server
+        answers it did not change.
+        """
+        if self.metadata is not None:
+            return self.metadata.fetch(
+                f"{Config.WLTS_HOST.rstrip('/')}/list_collections", limiter=self.limiter
+            )["collections"]
+        return self.limiter.call(lambda: self.wlts.collections)
 
     def description(self, collection_name):
         """Return a dictionary with collection description.
 
+        With a metadata cache, the saved description is used while the
+        server answers it did not change.
+
         :param collection_name<string>: the collection name
         """
-        return self.wlts[collection_name]
+        with tracer.span('WLTS_Controls.description', collection=collection_name):
+            if self.metadata is not None:
+                metadata = self.metadata.fetch(
+                    f"{Config.WLTS_HOST.rstrip('/')}/describe_collection",
+                    params={'collection_id': collection_name}, limiter=self.limiter
+                )
+            else:
+                metadata = self.limiter.call(self.wlts.__getitem__, collection_name)
+        self.coverage.add(collection_name, metadata)
+        if Config.SNAP_TO_PIXEL:
+            self.grid.add(collection_name, metadata)
+        return metadata
 
     def getTrajectory(self, lon, lat, collections, start_date, end_date):
-        """Plot trajectory with files controls."""
-        self.trajectory = self.wlts.tj(
+        """Request the trajectory of a query and return it as a result.
+
+        A list of coordinates is requested point by point, in parallel under
+        the server rate limiter, as ``Trajectories``. The collections that
+        can not cover the query, by their described spatial extent or
+        period, are not requested and kept in the result ``skipped`` with
+        the reason, as the collections whose circuit is open after failing
+        repeatedly, see ``TailLatency``. The controls keep no state of the
+        query, so they can be used by many threads at once.
+
+        :returns: the :class:`TrajectoryResult` of the query.
+        """
+        skipped = self.coverage.reasons(collections, lon, lat, start_date, end_date)
+        unavailable = self.tail.reasons(collections)
+        skipped.update(unavailable)
+        requested = [collection for collection in collections if collection not in unavailable]
+        with tracer.span('WLTS_Controls.getTrajectory', collections=len(collections),
+                         points=len(lon) if isinstance(lon, list) else 1,
+                         skipped=len(skipped)):
+            if isinstance(lon, list):
+                trajectory = self.getTrajectories(lon, lat, requested, start_date, end_date)
+            else:
+                trajectory = self.fetchTrajectory(lon, lat, requested, start_date, end_date)
+        query = {
+            'longitude': tuple(lon) if isinstance(lon, list) else lon,
+            'latitude': tuple(lat) if isinstance(lat, list) else lat,
+            'collections': tuple(collections),
+            'start_date': start_date, 'end_date': end_date
+        }
+        return TrajectoryResult(trajectory, query, skipped)
+
+    def fetchTrajectory(self, lon, lat, collections, start_date, end_date):
+        """Request the trajectory of a single point under the rate limiter.
+
+        Unlike ``getTrajectory`` the response is returned as it is, without
+        the skipped collections. The response is read from and saved to the cache when there is one,
+        and a new time window or new collections of a cached point are
+        refreshed incrementally with ``refreshTrajectory``. The collections
+        that can not cover the point are not requested, and the local
+        collections are read from their rasters. Points of an offline area
+        package are answered from its tiles. The other points are moved to
+        the pixel center of the collections publishing their grid, see
+        ``PixelGrid``.
+        """
+        for area in self.areas:
+            rows = area.rows(lon, lat, collections, start_date, end_date)
+            if rows is not None:
+                trajectory = self.emptyTrajectory(lon, lat, collections, start_date, end_date)
+                trajectory['result']['trajectory'] = rows
+                return trajectory
+        local = self.local.filter(collections)
+        remote = [collection for collection in collections if collection not in local]
+        # Points in the same collection pixel share the request and cache key
+        groups = self.grid.groups(lon, lat, remote)
+        if not local and len(groups) == 1:
+            (x, y), names = next(iter(groups.items()))
+            return self.fetchRemote(x, y, names, start_date, end_date)
+        trajectory = self.emptyTrajectory(lon, lat, collections, start_date, end_date)
+        for (x, y), names in groups.items():
+            trajectory['result']['trajectory'].extend(
+                self.fetchRemote(x, y, names, start_date, end_date)['result']['trajectory']
+            )
+        if local:
+            trajectory['result']['trajectory'].extend(
+                self.local.rows([lon], [lat], local, start_date, end_date)[0]
+            )
+        return trajectory
+
+    def fetchRemote(self, lon, lat, collections, start_date, end_date):
+        """Return the trajectory of service collections from the cache or the server.
+
+        :param lon<float>: the pixel center longitude.
+        :param lat<float>: the pixel center latitude.
+        :param collections<list>: the service collection names.
+        """
+        if self.cache is not None:
+            key = TrajectoryCache.key(lon, lat, collections, start_date, end_date)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return Trajectory(cached)
+        collections, _ = self.coverage.filter(collections, lon, lat, start_date, end_date)
+        if not collections:
+            return self.emptyTrajectory(lon, lat, collections, start_date, end_date)
+        if self.cache is None:
+            return self.requestTrajectory(lon, lat, collections, start_date, end_date)
+        try:
+            trajectory = self.refreshTrajectory(lon, lat, collections, start_date, end_date)
+        except ValueError:
+            # Dates out of the yyyy-mm-dd format can not be split in intervals
+            trajectory = self.requestTrajectory(lon, lat, collections, start_date, end_date)
+        self.cache.put(key, trajectory)
+        return trajectory
+
+    def queryKey(self, lon, lat, collections, start_date, end_date):
+        """Return the cache key of a query, with the point in the collections pixels.
+
+        :returns: the ``TrajectoryCache`` key, or a key made of the keys of
+            each pixel center when the collections have different grids.
+        """
+        remote = [collection for collection in collections if collection not in self.local]
+        keys = [
+            TrajectoryCache.key(x, y, names, start_date, end_date)
+            for (x, y), names in self.grid.groups(lon, lat, remote).items()
+        ]
+        return keys[0] if len(keys) == 1 else json.dumps(sorted(keys))
+
+    def pixelKey(self, lon, lat, collections):
+        """Return the key of the collections pixels of a point, e.g. for the history.
+
+        :returns: the key of ``PixelGrid.key`` of the service collections,
+            ``None`` when one has no published grid or they are all local.
+        """
+        remote = [collection for collection in collections if collection not in self.local]
+        return self.grid.key(lon, lat, remote)
+
+    def cachedResult(self, key):
+        """Return the cached result of a query, without requests.
+
+        :param key<str>: the query key of ``queryKey``, e.g. saved in the
+            locations history.
+        :returns: the :class:`TrajectoryResult`, or ``None`` when a part of
+            the query is not in the cache or it has only local collections.
+        """
+        if self.cache is None or not key:
+            return None
+        keys = TrajectoryCache.parts(key)
+        if not keys:
+            # The local collections are not cached, they are read again
+            return None
+        trajectory = None
+        for part in keys:
+            lon, lat, collections, start_date, end_date = json.loads(part)
+            cached = self.cache.get(part)
+            if cached is None:
+                return None
+            if trajectory is None:
+                trajectory = self.emptyTrajectory(float(lon), float(lat), [], start_date, end_date)
+            trajectory['query']['collections'].extend(collections)
+            trajectory['result']['trajectory'].extend(cached['result']['trajectory'])
+        query = {
+            'longitude': trajectory['query']['longitude'],
+            'latitude': trajectory['query']['latitude'],
+            'collections': tuple(trajectory['query']['collections']),
+            'start_date': trajectory['query']['start_date'],
+            'end_date': trajectory['query']['end_date']
+        }
+        return TrajectoryResult(trajectory, query)
+
+    def requestTrajectory(self, lon, lat, collections, start_date, end_date):
+        """Send a trajectory request of a single point to the server.
+
+        A request slower than usual for its collections is sent again and
+        the first answer is used, the collections that keep failing are
+        refused at once, see ``TailLatency``.
+
+        :raises CircuitOpenError: when a collection is not answering.
+        """
+        return self.tail.call(
+            collections,
+            self.limiter.call,
+            self.wlts.tj,
             longitude=lon,
             latitude=lat,
             collections=",".join(collections),
             start_date=start_date,
             end_date=end_date
         )
-        return self.trajectory
 
-    def plotTrajectory(self, **parameters):
-        """Plotting trajectory using seaborn."""
+    def refreshTrajectory(self, lon, lat, collections, start_date, end_date):
+        """Build a trajectory from the cached segments and the missing parts.
+
+        Only the sub-intervals of the time window and the collections that
+        are not in the cache segments are requested, collections missing the
+        same interval in a single request, and merged with the cached rows.
+
+        :raises ValueError: when a date is not in the ``yyyy-mm-dd`` format.
+        """
+        plan = {}
+        for collection in collections:
+            covered = [(start, end) for start, end, _ in self.cache.segments(lon, lat, collection)]
+            for interval in missingIntervals(start_date, end_date, covered):
+                plan.setdefault(interval, []).append(collection)
+
+        with tracer.span('WLTS_Controls.refreshTrajectory', requests=len(plan)):
+            for (start, end), names in plan.items():
+                response = self.requestTrajectory(lon, lat, names, start, end)
+                for name in names:
+                    rows = [
+                        {key: value for key, value in row.items() if key != 'point_id'}
+                        for row in response['result']['trajectory'] if row['collection'] == name
+                    ]
+                    self.cache.putSegment(lon, lat, name, start, end, rows)
+
+        trajectory = self.emptyTrajectory(lon, lat, collections, start_date, end_date)
+        for collection in collections:
+            # Yearly dates may be returned by two segments of the same year
+            rows = {
+                row['date']: row
+                for _, _, segment in self.cache.segments(lon, lat, collection)
+                for row in segment if inWindow(row['date'], start_date, end_date)
+            }
+            trajectory['result']['trajectory'].extend(
+                dict(rows[date], point_id=1) for date in sorted(rows)
+            )
+        return trajectory
+
+    @staticmethod
+    def emptyTrajectory(lon, lat, collections, start_date, end_date):
+        """Return a trajectory without rows for a single point query."""
+        return Trajectory({
+            'query': {
+                'collections': list(collections),
+                'end_date': end_date,
+                'latitude': lat,
+                'longitude': lon,
+                'start_date': start_date
+            },
+            'result': {'trajectory': []}
+        })
+
+    def getTrajectories(self, lon, lat, collections, start_date, end_date, workers=None):
+        """Request the trajectories of many points in parallel.
+
+        The local collections are read for every point at once, without
+        requests.
+
+        :param lon<list>: the points longitude.
+        :param lat<list>: the points latitude.
+        :param workers<int>: the points fetched together, the limiter maximum by default.
+        """
+        if len(lon) != len(lat):
+            raise ValueError("latitude and longitude must have the same length")
+
+        local = self.local.filter(collections)
+        remote = [collection for collection in collections if collection not in local]
+        # The pool threads send the requests with the priority of the caller
+        level, flow = currentPriority()
+
+        def fetch(point):
+            if not remote:
+                return self.emptyTrajectory(point[0], point[1], [], start_date, end_date)
+            with priority(level, flow):
+                return self.fetchTrajectory(point[0], point[1], remote, start_date, end_date)
+
+        with ThreadPoolExecutor(max_workers=workers or self.limiter.max_in_flight) as executor:
+            trajectories = list(executor.map(fetch, zip(lon, lat)))
+        if local:
+            local_rows = self.local.rows(lon, lat, local, start_date, end_date)
+            for trajectory, rows in zip(trajectories, local_rows):
+                trajectory["result"]["trajectory"].extend(rows)
+        for point_id, trajectory in enumerate(trajectories, start=1):
+            for row in trajectory["result"]["trajectory"]:
+                row["point_id"] = point_id
+        return Trajectories({"trajectories": trajectories})
+
+    @tracer.traced()
+    def palette(self, collections):
+        """Return the class colors of the collections classification systems.
+
+        The local collections have no classification system in the service,
+        their classes are left out. With a metadata cache, the classification
+        system and its styled classes are read again only when the server
+        answers that their documents changed.
+
+        :param collections<list>: the collection names.
+        """
+        palette_ = {}
+        for collection in collections:
+            if collection in self.local:
+                continue
+            system_id = self.description(collection)["classification_system"].get("id")
+            if self.metadata is None:
+                palette_.update(self.systemColors(system_id))
+                continue
+            # The documents the LCCS client reads, with its language and token
+            params = {"language": getattr(self.lccs_service, "_language", None) or "pt-br"}
+            token = getattr(self.lccs_service, "_access_token", None)
+            headers = {"x-api-key": token} if token else {}
+            system_url = f"{Config.LCCS_HOST.rstrip('/')}/classification_systems/{system_id}"
+            system = self.metadata.fetch(
+                system_url, params=params, headers=headers, limiter=self.lccs_limiter
+            )
+            classes_url = next(
+                (link["href"] for link in system.get("links", []) if link.get("rel") == "classes"),
+                f"{system_url}/classes"
+            )
+            palette_.update(self.metadata.fetch(
+                classes_url, params=dict(params, style_format_id="SLD-Feature-Point"),
+                headers=headers, limiter=self.lccs_limiter,
+                build=lambda classes: {cv["title"]: cv.get("color") for cv in classes}
+            ))
+        return palette_
+
+    def systemColors(self, system_id):
+        """Return the color of each class of a classification system.
+
+        :param system_id<str>: the LCCS classification system id.
+        """
+        classification_system = self.lccs_limiter.call(
+            self.lccs_service.classification_system, system = system_id
+        )
+        classes = self.lccs_limiter.call(
+            classification_system.classes, style_format_name_or_id="SLD-Feature-Point"
+        )
+        return {cv.title: cv.color for cv in classes}
+
+    @staticmethod
+    def facetTitle(collection, bar_title=False):
+        """Return the title of a collection facet.
+
+        :param collection<str>: the collection name.
+        :param bar_title<bool>: use the capitalized collection name only.
+        """
+        title_text = f"collection = {collection}"
+        if not bar_title:
+            return title_text
+        new_title = title_text.split("=")[-1].capitalize()
+        if len(new_title.split("_")) > 1:
+            return new_title.split("_")[0] + " " + new_title.split("_")[-1].capitalize()
+        return new_title.split("_")[0]
+
+    @staticmethod
+    def facetCounts(df):
+        """Return the number of points by date, collection and class.
+
+        :param df<pandas.DataFrame>: the trajectory data, e.g. of
+            ``TrajectoryResult.df``.
+        """
+        for column in ('class', 'date', 'collection'):
+            if df[column].dtype.name != 'category':
+                df[column] = df[column].astype('category')
+        return (
+            df.groupby(['date', 'collection', 'class'])
+            .count()['point_id']
+            .reset_index()
+            .rename(columns={'point_id': 'size'})
+        )
+
+    @tracer.traced()
+    def renderFacets(self, counts, parameters):
+        """Render the bar plot of each collection in the worker processes.
+
+        :param counts<pandas.DataFrame>: the counts of ``facetCounts``.
+        :param parameters<dict>: the plot parameters of ``plotTrajectory``.
+        :returns: the collections, their PNG images and the class colors.
+        """
+        collections = list(counts['collection'].cat.categories)
+        ncols = min(3, len(collections))
+        nrows = -(-len(collections) // ncols)
+        parameters = dict(parameters)
+        parameters.setdefault('facet_width', (parameters['width'] + 200) * 0.85 / ncols)
+        parameters.setdefault('facet_height', max(160, parameters['height'] / nrows))
+        dates = list(counts['date'].cat.categories)
+        colors = self.renderer.colors(list(counts['class'].cat.categories))
+        facets = [
+            (
+                self.facetTitle(collection, parameters['bar_title']),
+                counts[counts['collection'] == collection][['date', 'class', 'size']]
+            )
+            for collection in collections
+        ]
+        return collections, self.renderer.render(facets, dates, colors, parameters), colors
+
+    @tracer.traced()
+    def plotTrajectory(self, result, figure=None, **parameters):
+        """Plotting trajectory using seaborn.
+
+        :param result<TrajectoryResult>: the trajectory to draw.
+        :param figure<matplotlib.figure.Figure>: the figure to draw on, it is
+            cleared before drawing. A new standalone figure is created when
+            not given.
+        :param processes<bool>: render the collections of a bar plot in
+            worker processes and compose them as tiles, by default when there
+            are ``Config.RENDER_PROCESSES_MIN_FACETS`` collections or more.
+        :param style<str>: the bar plot style, ``seaborn``, ``stacked`` or
+            ``heatmap``. By default large results are drawn as stacked bars,
+            above ``Config.PLOT_LOD_ROWS`` rows, or as a heatmap, above
+            ``Config.PLOT_LOD_DATES`` dates.
+        :returns: the figure with the trajectory plot.
+        """
 
         # Apply Seaborn grid style globally
         sns.set_theme(style="darkgrid")
@@ -194,112 +650,152 @@ class WLTS_Controls:
         parameters.setdefault('opacity', 0.8)
         parameters.setdefault('marker_line_width', 1.5)
         parameters.setdefault('bar_title', False)
+        parameters.setdefault('processes', None)
+        parameters.setdefault('style', None)
+
+        if figure is None:
+            figure = Figure(figsize=((parameters['width'] + 200) / 100, parameters['height'] / 100))
+        figure.clear()
 
         # Copy and preprocess
-        df = self.trajectory.df().copy()
+        df = result.df()
         df['class'] = df['class'].astype('category')
         df['date'] = df['date'].astype('category')
         df['collection'] = df['collection'].astype('category')
 
-        def update_column_title(title_text):
-            new_title = title_text.split("=")[-1].capitalize()
-            if len(new_title.split("_")) > 1:
-                return new_title.split("_")[0] + " " + new_title.split("_")[-1].capitalize()
-            return new_title.split("_")[0]
-
         # SCATTER PLOT: One point only
         if parameters['type'] == 'scatter':
             if len(df.point_id.unique()) == 1:
-                plt.figure(figsize=((parameters['width'] + 200) / 100, parameters['height'] / 100))
-                palette_ = {}
-                for collection in list(df['collection']):
-                    system_id = self.description(collection)["classification_system"].get("id")
-                    classification_system = self.lccs_service.classification_system(system = system_id)
-                    palette_.update({
-                        cv.title: cv.color
-                        for cv in classification_system.classes(style_format_name_or_id="SLD-Feature-Point")
-                    })
+                ax = figure.add_subplot(111)
+                palette_ = self.palette(list(df['collection'].unique()))
+                missing = [c for c in df['class'].cat.categories if c not in palette_]
+                palette_.update(classColors(missing))
                 sns.scatterplot(
                     data=df,
                     x='date', y='collection',
                     hue='class', palette=palette_, marker="o",
                     s=parameters['marker_size']**2,
                     alpha=parameters['opacity'],
-                    linewidth=parameters['marker_line_width']
+                    linewidth=parameters['marker_line_width'],
+                    ax=ax
                 )
-                plt.title(parameters['title'], fontsize=parameters['font_size'])
-                plt.xlabel(parameters['date'])
-                plt.ylabel(parameters['value'])
-                plt.legend(
+                ax.set_title(parameters['title'], fontsize=parameters['font_size'])
+                ax.set_xlabel(parameters['date'])
+                ax.set_ylabel(parameters['value'])
+                ax.legend(
                     title=parameters['legend_title_text'],
                     bbox_to_anchor=(1.01, 1),
                     loc='upper left',
                     borderaxespad=0
                 )
-                plt.tight_layout()
-                plt.show()
+                figure.tight_layout()
             else:
                 raise ValueError("The scatter plot is for one point only! Please try another type: bar plot.")
 
         # BAR PLOT: Single or multiple collections
         elif parameters['type'] == 'bar':
+            # Level of detail: large results skip the seaborn estimators
+            style = parameters['style'] or lodStyle(len(df), len(df['date'].cat.categories))
+            if style not in STYLES:
+                raise ValueError(f"No bar plot style {style}! Please try one of {', '.join(STYLES)}.")
+            parameters['style'] = style
+
             if len(df.collection.unique()) == 1 and len(df.point_id.unique()) >= 1:
-                df_group = df.groupby(['date', 'class']).count()['point_id'].reset_index()
-                df_group.rename(columns={'point_id': 'count'}, inplace=True)
-
-                plt.figure(figsize=((parameters['width'] + 200) / 100, parameters['height'] / 100))
-                sns.barplot(
-                    data=df_group,
-                    x='date', y='count',
-                    hue='class',
-                    alpha=parameters['opacity']
-                )
-                plt.title(parameters['title'], fontsize=parameters['font_size'])
-                plt.xlabel(parameters['date'])
-                plt.ylabel(parameters['title_y'])
-                plt.legend(
-                    title=parameters['legend_title_text'],
-                    bbox_to_anchor=(1.01, 1),
-                    loc='upper left',
-                    borderaxespad=0
-                )
-                plt.tight_layout()
-                plt.show()
+                ax = figure.add_subplot(111)
+                if style == 'seaborn':
+                    df_group = df.groupby(['date', 'class']).count()['point_id'].reset_index()
+                    df_group.rename(columns={'point_id': 'count'}, inplace=True)
+
+                    sns.barplot(
+                        data=df_group,
+                        x='date', y='count',
+                        hue='class',
+                        alpha=parameters['opacity'],
+                        ax=ax
+                    )
+                elif style == 'stacked':
+                    matrix = classMatrix(df)
+                    drawStackedBars(ax, matrix, classColors(list(matrix.columns)), parameters['opacity'])
+                else:
+                    image = drawHeatmap(ax, classMatrix(df))
+                    figure.colorbar(image, ax=ax, label=parameters['title_y'])
+                ax.set_title(parameters['title'], fontsize=parameters['font_size'])
+                ax.set_xlabel(parameters['date'])
+                if style == 'heatmap':
+                    ax.set_ylabel(parameters['legend_title_text'])
+                else:
+                    ax.set_ylabel(parameters['title_y'])
+                    ax.legend(
+                        title=parameters['legend_title_text'],
+                        bbox_to_anchor=(1.01, 1),
+                        loc='upper left',
+                        borderaxespad=0
+                    )
+                figure.tight_layout()
 
             elif len(df.collection.unique()) >= 1 and len(df.point_id.unique()) >= 1:
-                mydf = (
-                    df.groupby(['date', 'collection', 'class'])
-                    .count()['point_id']
-                    .reset_index()
-                    .rename(columns={'point_id': 'size'})
-                )
-
-                g = sns.catplot(
-                    data=mydf,
-                    x='date', y='size',
-                    hue='class',
-                    col='collection',
-                    kind='bar',
-                    col_wrap=3,
-                    height=parameters['height'] / 100,
-                    aspect=parameters['width'] / (parameters['height'] * 3),
-                    alpha=parameters['opacity']
-                )
-                g.set_axis_labels(parameters['date'], parameters['title_y'])
-
-                g.add_legend(title=parameters['legend_title_text'])
-
-                # Move legend outside
-                g._legend.set_bbox_to_anchor((1.05, 0.5))
-                g._legend.set_loc('center left')
-
-                if parameters['bar_title']:
-                    for ax in g.axes.flatten():
-                        title = ax.get_title()
-                        ax.set_title(update_column_title(title))
-
-                plt.tight_layout()
-                plt.subplots_adjust(right=0.85)
-                plt.show()
+                mydf = self.facetCounts(df)
+
+                # One facet per collection, wrapped in rows of three columns
+                collections = list(mydf['collection'].cat.categories)
+                processes = parameters['processes']
+                if processes is None:
+                    processes = len(collections) >= Config.RENDER_PROCESSES_MIN_FACETS
+                if style == 'heatmap':
+                    parameters['vmax'] = mydf['size'].max()
+                if processes:
+                    _, images, colors = self.renderFacets(mydf, parameters)
+                    self.renderer.compose(figure, images, colors, parameters)
+                    return figure
+                ncols = min(3, len(collections))
+                nrows = -(-len(collections) // ncols)
+                axes = figure.subplots(nrows, ncols, sharey=True, squeeze=False).flatten()
+                dates = list(mydf['date'].cat.categories)
+                classes = list(mydf['class'].cat.categories)
+
+                colors = classColors(classes)
+
+                for ax, collection in zip(axes, collections):
+                    data = mydf[mydf['collection'] == collection]
+                    if style == 'seaborn':
+                        sns.barplot(
+                            data=data,
+                            x='date', y='size',
+                            hue='class',
+                            order=dates,
+                            hue_order=classes,
+                            alpha=parameters['opacity'],
+                            ax=ax
+                        )
+                    elif style == 'stacked':
+                        drawStackedBars(ax, countMatrix(data, dates, classes), colors, parameters['opacity'])
+                    else:
+                        image = drawHeatmap(ax, countMatrix(data, dates, classes), parameters['vmax'])
+                    ax.set_xlabel(parameters['date'])
+                    ax.set_ylabel(parameters['legend_title_text'] if style == 'heatmap' else parameters['title_y'])
+                    ax.set_title(self.facetTitle(collection, parameters['bar_title']))
+                    handles, labels = ax.get_legend_handles_labels()
+                    if ax.get_legend():
+                        ax.get_legend().remove()
+                for ax in axes[len(collections):]:
+                    ax.set_visible(False)
+
+                figure.tight_layout()
+                if style == 'heatmap':
+                    figure.colorbar(image, ax=list(axes), label=parameters['title_y'])
+                else:
+                    if style == 'stacked':
+                        handles = [Patch(facecolor=color, alpha=parameters['opacity']) for color in colors.values()]
+                        labels = classes
+                    # Move legend outside
+                    figure.legend(
+                        handles, labels,
+                        title=parameters['legend_title_text'],
+                        bbox_to_anchor=(1.0, 0.5),
+                        loc='center right'
+                    )
+                    figure.subplots_adjust(right=0.85)
         else:
             raise RuntimeError("No plot support for this trajectory!")
+
+        return figure
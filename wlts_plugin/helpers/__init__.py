@@ -16,4 +16,7 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
 #
 
+from .chart_helper import TrajectoryChart
 from .files_export_helper import FilesExport
+from .history_model import HistoryModel
+from .selection_model import SelectionModel
@@ -0,0 +1,75 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+from matplotlib.backends.backend_qt5agg import (FigureCanvasQTAgg,
+                                                NavigationToolbar2QT)
+from matplotlib.figure import Figure
+
+
+class TrajectoryChart:
+    """Reusable matplotlib canvas embedded in the plugin dialog.
+
+    The figure is created once and is not registered in ``pyplot``,
+    so each new trajectory is drawn in place instead of opening a
+    new window.
+
+    :Methods:
+        attach
+        clear
+        refresh
+        nbytes
+        close
+    """
+
+    def __init__(self, parent=None):
+        """Build the figure, the Qt canvas and the navigation toolbar.
+
+        :param parent<QWidget>: the widget that owns the canvas.
+        """
+        self.figure = Figure()
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.canvas.setParent(parent)
+        self.toolbar = NavigationToolbar2QT(self.canvas, parent)
+
+    def attach(self, layout):
+        """Add the toolbar and canvas to a Qt layout.
+
+        :param layout<QLayout>: the layout that will hold the chart.
+        """
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+
+    def clear(self):
+        """Remove every axes and artist from the figure."""
+        self.figure.clear()
+
+    def refresh(self):
+        """Redraw the canvas with the current figure content."""
+        self.canvas.draw_idle()
+
+    def nbytes(self):
+        """Return an estimate of the memory of the drawn chart, its RGBA buffer."""
+        if not self.figure.axes:
+            return 0
+        width, height = self.figure.get_size_inches() * self.figure.dpi
+        return int(width * height * 4)
+
+    def close(self):
+        """Release the figure content and repaint an empty canvas."""
+        self.clear()
+        self.canvas.draw_idle()
@@ -26,6 +26,7 @@ import pandas as pd
 from wlts import WLTS
 
 from ..config import Config
+from ..controller.tracing import tracer
 from ..controller.wlts_qgis_controller import Controls, WLTS_Controls
 
 
@@ -37,7 +38,10 @@ class FilesExport:
         generateCode
         generateCSV
         generateJSON
-        generatePlotFIG
+        generateBatch
+        generatePlotFig
+        generatePlotlyFig
+        generateFacets
     """
 
     def defaultCode(self):
@@ -56,9 +60,10 @@ class FilesExport:
         """Set options to export result."""
         return [
             "CSV", "JSON",
-            "Python", "Plotly"
+            "Python", "Plotly", "PNG"
         ]
 
+    @tracer.traced()
     def generateCode(self, file_name, attributes):
         """Generate a python code file filling WLTS blank spaces.
 
@@ -96,6 +101,7 @@ class FilesExport:
         except FileNotFoundError:
             pass
 
+    @tracer.traced()
     def generateCSV(self, file_name, trajectory):
         """Generate a CSV file with trajectory data.
 
@@ -126,6 +132,7 @@ class FilesExport:
         except FileNotFoundError:
             pass
 
+    @tracer.traced()
     def generateJSON(self, file_name, trajectory):
         """Generate a JSON file with trajectory data.
 
@@ -138,33 +145,112 @@ class FilesExport:
         except FileNotFoundError:
             pass
 
-    def generatePlotFig(self, wlts_controls: WLTS_Controls):
-        """Generate an image .JPEG with trajectory data in a table.
+    def batchDataFrame(self, trajectories):
+        """Return the trajectories of many points as a single dataframe.
 
-        :param trajectory<dict>: the trajectory service reponse dictionary.
+        :param trajectories<Trajectories>: the trajectories of the points.
+        """
+        frames = []
+        for trajectory in trajectories['trajectories']:
+            df = trajectory.df()
+            df['longitude'] = trajectory['query']['longitude']
+            df['latitude'] = trajectory['query']['latitude']
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=['point_id', 'collection', 'date', 'class', 'longitude', 'latitude'])
+        return pd.concat(frames, ignore_index=True)
+
+    @tracer.traced()
+    def generateBatch(self, file_name, trajectories):
+        """Generate a CSV, Parquet or GeoPackage file with many trajectories.
+
+        The format is chosen by the file extension: ``.csv``, ``.parquet``
+        or ``.gpkg``.
+
+        :param file_name<str>: file to save path.
+        :param trajectories<Trajectories>: the trajectories of the points.
+        :raises ValueError: when the extension is not supported.
+        """
+        df = self.batchDataFrame(trajectories)
+        extension = Path(file_name).suffix.lower()
+        if extension == '.csv':
+            df.to_csv(file_name, sep=';', index=False, header=True)
+        elif extension == '.parquet':
+            df.to_parquet(file_name, index=False)
+        elif extension == '.gpkg':
+            import geopandas as gpd
+            gdf = gpd.GeoDataFrame(
+                df,
+                geometry=gpd.points_from_xy(df['longitude'], df['latitude']),
+                crs='EPSG:4326'
+            )
+            gdf.to_file(file_name, layer='wlts_trajectories', driver='GPKG')
+        else:
+            raise ValueError(f"No support to export trajectories as {extension or file_name}!")
+
+    @tracer.traced()
+    def generatePlotFig(self, wlts_controls: WLTS_Controls, chart, result):
+        """Draw the trajectory data on the chart embedded in the dialog.
+
+        :param wlts_controls<WLTS_Controls>: the controls drawing the trajectory.
+        :param chart<TrajectoryChart>: the reusable chart to draw on.
+        :param result<TrajectoryResult>: the trajectory of ``getTrajectory``.
         """
         try:
             wlts_controls.plotTrajectory(
+                result,
+                figure=chart.figure,
                 marker_size=8, font_size=12,
                 width=1050, height=320
             )
+            chart.refresh()
         except Exception as e:
+            chart.close()
             controls = Controls()
             controls.alert("error", "Error while generate an image!", str(e))
 
-    def generatePlotlyFig(self, wlts_controls: WLTS_Controls):
-        """Generate an SVG based on Plotly with trajectory data in a table.
+    @tracer.traced()
+    def generatePlotlyFig(self, file_name, wlts_controls: WLTS_Controls, result):
+        """Generate an interactive HTML file based on Plotly with trajectory data.
 
-        :param trajectory<dict>: the trajectory service reponse dictionary.
+        :param file_name<str>: file to save path.
+        :param wlts_controls<WLTS_Controls>: the controls with the WLTS client.
+        :param result<TrajectoryResult>: the trajectory of ``getTrajectory``.
         """
         try:
-            dataframe_copy = wlts_controls.trajectory.df().copy()
+            dataframe_copy = result.df()
             fig = wlts_controls.wlts.plot(
                 dataframe_copy,
                 marker_size=8, font_size=12,
                 width=1050, height=320
             )
-            fig.show()
+            fig.write_html(file_name)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            controls = Controls()
+            controls.alert("error", "Error while generate an image!", str(e))
+
+    @tracer.traced()
+    def generateFacets(self, folder, wlts_controls: WLTS_Controls, result):
+        """Save the bar plot of each collection as a PNG file.
+
+        The images are rendered in parallel processes.
+
+        :param folder<str>: the folder to save the files.
+        :param wlts_controls<WLTS_Controls>: the controls drawing the trajectory.
+        :param result<TrajectoryResult>: the trajectory of ``getTrajectory``.
+        :returns: the saved file paths.
+        """
+        try:
+            parameters = {
+                'width': 1050, 'height': 320, 'opacity': 0.8,
+                'date': 'Year', 'title_y': 'Number of Points', 'bar_title': False
+            }
+            collections, images, _ = wlts_controls.renderFacets(
+                wlts_controls.facetCounts(result.df()), parameters
+            )
+            return wlts_controls.renderer.save(folder, collections, images)
         except Exception as e:
             controls = Controls()
             controls.alert("error", "Error while generate an image!", str(e))
@@ -0,0 +1,109 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+from qgis.PyQt.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from ..controller.location_history import LocationHistory
+
+
+class HistoryModel(QAbstractListModel):
+    """List model of the locations history shown in ``history_list``.
+
+    The most recent locations are shown first. The older ones are read
+    from the history a page at a time as the list is scrolled, and new
+    locations are inserted as single rows, so the view is never rebuilt.
+
+    :Methods:
+        addLocation
+        location
+    """
+
+    def __init__(self, history: LocationHistory, parent=None):
+        """Build the model.
+
+        :param history<LocationHistory>: the locations history.
+        """
+        super().__init__(parent)
+        self.history = history
+        self.loaded = 0
+
+    def _historyRow(self, row):
+        """Return the history row of a model row."""
+        return len(self.history) - 1 - row
+
+    def rowCount(self, parent=QModelIndex()):
+        """Return the number of locations read from the history."""
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """Return whether older locations were not read yet."""
+        return not parent.isValid() and self.loaded < len(self.history)
+
+    def fetchMore(self, parent=QModelIndex(), rows=None):
+        """Read the next page of older locations.
+
+        :param rows<int>: the rows to read, a history page by default.
+        """
+        if parent.isValid():
+            return
+        rows = min(rows or self.history.page_size, len(self.history) - self.loaded)
+        if rows <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + rows - 1)
+        self.loaded += rows
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Return the label, the layer name or the location of a row."""
+        if not index.isValid():
+            return None
+        location = self.location(index)
+        if role == Qt.DisplayRole:
+            return location['label']
+        if role == Qt.ToolTipRole:
+            return location['layer_name']
+        if role == Qt.UserRole:
+            return location
+        return None
+
+    def addLocation(self, lon, lat, layer_name='<none>', crs='epsg:4326', pixel_key=None):
+        """Save a location, snapping it to a location near it or in the same pixels.
+
+        :param lon<float>: the longitude.
+        :param lat<float>: the latitude.
+        :param layer_name<str>: the active layer name.
+        :param crs<str>: the coordinates reference system.
+        :param pixel_key<str>: the key of the collections pixels, see
+            ``LocationHistory.nearest``.
+        :returns: the model index of the location.
+        """
+        row = self.history.nearest(lon, lat, pixel_key)
+        if row is None:
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self.history.add(lon, lat, layer_name, crs, pixel_key)
+            self.loaded += 1
+            self.endInsertRows()
+            return self.index(0)
+        row = self._historyRow(row)
+        if row >= self.loaded:
+            self.fetchMore(rows=row + 1 - self.loaded)
+        return self.index(row)
+
+    def location(self, index):
+        """Return the location of a model index."""
+        return self.history[self._historyRow(index.row())]
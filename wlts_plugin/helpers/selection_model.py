@@ -0,0 +1,121 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+from qgis.PyQt.QtCore import QObject, QTimer, pyqtSignal
+
+from ..config import Config
+from ..controller.trajectory_cache import TrajectoryCache
+
+
+class SelectionModel(QObject):
+    """Current query of the dialog: collections, dates and location.
+
+    The state is updated from the widgets change signals, one collection
+    at a time, and ``changed`` is emitted once after a burst of changes,
+    when no change happened for ``Config.SELECTION_DEBOUNCE_MS``.
+
+    :Methods:
+        setCollections
+        setCollection
+        setDates
+        setLocation
+        schedule
+        isComplete
+        key
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, interval=None, parent=None):
+        """Build an empty selection.
+
+        :param interval<int>: the debounce interval in milliseconds.
+        """
+        super().__init__(parent)
+        self.order = {}
+        self.selected = set()
+        self.start_date = None
+        self.end_date = None
+        self.location = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(Config.SELECTION_DEBOUNCE_MS if interval is None else interval)
+        self.timer.timeout.connect(self.changed.emit)
+
+    @property
+    def collections(self):
+        """Return the selected collections in the dialog order."""
+        return sorted(self.selected, key=lambda name: self.order.get(name, len(self.order)))
+
+    def setCollections(self, names):
+        """Set the collections that can be selected, in the dialog order.
+
+        :param names<list>: the collection names.
+        """
+        self.order = {name: position for position, name in enumerate(names)}
+        self.selected &= set(names)
+        self.schedule()
+
+    def setCollection(self, name, checked):
+        """Select or unselect a collection.
+
+        :param name<str>: the collection name.
+        :param checked<bool>: whether the collection is selected.
+        """
+        if checked:
+            self.selected.add(name)
+        else:
+            self.selected.discard(name)
+        self.schedule()
+
+    def setDates(self, start_date, end_date):
+        """Set the time interval.
+
+        :param start_date<str>: the begin of the time interval, as yyyy-MM-dd.
+        :param end_date<str>: the end of the time interval, as yyyy-MM-dd.
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.schedule()
+
+    def setLocation(self, lon, lat):
+        """Set the selected location.
+
+        :param lon<float>: the longitude.
+        :param lat<float>: the latitude.
+        """
+        self.location = (float(lon), float(lat))
+        self.schedule()
+
+    def schedule(self):
+        """Emit ``changed`` after the debounce interval, restarting it."""
+        self.timer.start()
+
+    def isComplete(self):
+        """Return whether collections and a location are selected."""
+        return bool(self.selected) and self.location is not None
+
+    def key(self, key_function=TrajectoryCache.key):
+        """Return the trajectory cache key of the selection, or ``None``.
+
+        :param key_function<callable>: builds the key of a query, e.g.
+            ``WLTS_Controls.queryKey``.
+        """
+        if not self.isComplete():
+            return None
+        return key_function(*self.location, self.collections, self.start_date, self.end_date)
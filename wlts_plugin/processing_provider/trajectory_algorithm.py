@@ -0,0 +1,145 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+import threading
+from datetime import datetime
+
+from qgis.core import (QgsCoordinateReferenceSystem, QgsCoordinateTransform,
+                       QgsProcessing, QgsProcessingAlgorithm,
+                       QgsProcessingException, QgsProcessingOutputString,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterFileDestination,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterString)
+
+from ..cli import run_batch
+from ..config import Config
+
+
+class TrajectoryBatchAlgorithm(QgsProcessingAlgorithm):
+    """Fetch the trajectories of a point layer and save them to a file.
+
+    Run it from the toolbox or without GUI, e.g.::
+
+        $ qgis_process run wlts:batchtrajectories -- INPUT=points.gpkg \\
+            COLLECTIONS=prodes_amazonia_legal OUTPUT=trajectories.parquet
+    """
+
+    INPUT = 'INPUT'
+    COLLECTIONS = 'COLLECTIONS'
+    START_DATE = 'START_DATE'
+    END_DATE = 'END_DATE'
+    CONCURRENCY = 'CONCURRENCY'
+    USE_CACHE = 'USE_CACHE'
+    JOB_ID = 'JOB_ID'
+    OUTPUT = 'OUTPUT'
+
+    def initAlgorithm(self, config=None):
+        """Define the algorithm parameters."""
+        self.addParameter(QgsProcessingParameterFeatureSource(
+            self.INPUT, 'Input points', [QgsProcessing.TypeVectorPoint]
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            self.COLLECTIONS, 'Collections (separated by commas)'
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            self.START_DATE, 'Start date (yyyy-MM-dd)', defaultValue='2000-01-01'
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            self.END_DATE, 'End date (yyyy-MM-dd)',
+            defaultValue=datetime.today().strftime('%Y-%m-%d')
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            self.CONCURRENCY, 'Concurrent requests', QgsProcessingParameterNumber.Integer,
+            defaultValue=Config.WLTS_MAX_IN_FLIGHT, minValue=1
+        ))
+        self.addParameter(QgsProcessingParameterBoolean(
+            self.USE_CACHE, 'Use the trajectory cache', defaultValue=True
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            self.JOB_ID, 'Resume the job (id)', optional=True
+        ))
+        self.addParameter(QgsProcessingParameterFileDestination(
+            self.OUTPUT, 'Trajectories',
+            'CSV files (*.csv);;Parquet files (*.parquet);;GeoPackage files (*.gpkg)'
+        ))
+        self.addOutput(QgsProcessingOutputString(self.JOB_ID, 'Job id'))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        """Fetch the trajectories of the input points."""
+        job_id = self.parameterAsString(parameters, self.JOB_ID, context)
+        points = []
+        if not job_id:
+            source = self.parameterAsSource(parameters, self.INPUT, context)
+            if source is None:
+                raise QgsProcessingException(self.invalidSourceError(parameters, self.INPUT))
+            transform = QgsCoordinateTransform(
+                source.sourceCrs(), QgsCoordinateReferenceSystem('EPSG:4326'),
+                context.transformContext()
+            )
+            for feature in source.getFeatures():
+                point = transform.transform(feature.geometry().centroid().asPoint())
+                points.append((point.x(), point.y()))
+        collections = [
+            name.strip() for name in
+            self.parameterAsString(parameters, self.COLLECTIONS, context).split(',')
+            if name.strip()
+        ]
+        output = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
+        cancel = threading.Event()
+
+        def progress(finished, total):
+            feedback.setProgress(100 * finished / total)
+            if feedback.isCanceled():
+                cancel.set()
+
+        job = run_batch(
+            points, collections,
+            self.parameterAsString(parameters, self.START_DATE, context),
+            self.parameterAsString(parameters, self.END_DATE, context),
+            output,
+            concurrency=self.parameterAsInt(parameters, self.CONCURRENCY, context),
+            cache=self.parameterAsBool(parameters, self.USE_CACHE, context),
+            job_id=job_id or None, progress=progress, cancel=cancel
+        )
+        finished, total = job.progress()
+        feedback.pushInfo(f'Job {job.id}: {finished}/{total} points')
+        for point_id, error in job.failed().items():
+            feedback.reportError(f'Point {point_id}: {error}')
+        return {self.OUTPUT: output, self.JOB_ID: job.id}
+
+    def name(self):
+        """Return the algorithm id."""
+        return 'batchtrajectories'
+
+    def displayName(self):
+        """Return the algorithm name shown in the toolbox."""
+        return 'Batch trajectories'
+
+    def shortHelpString(self):
+        """Return the algorithm help."""
+        return (
+            'Fetch the land use and cover trajectories of every point of a layer '
+            'and save them as CSV, Parquet or GeoPackage. Interrupted jobs are '
+            'resumed by their id, fetching only the missing points.'
+        )
+
+    def createInstance(self):
+        """Return a new instance of the algorithm."""
+        return TrajectoryBatchAlgorithm()
@@ -0,0 +1,45 @@
+#
+# This file is part of Python QGIS Plugin for WLTS.
+# Copyright (C) 2025 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+
+from pathlib import Path
+
+from qgis.core import QgsProcessingProvider
+from qgis.PyQt.QtGui import QIcon
+
+from ..config import Config
+from .trajectory_algorithm import TrajectoryBatchAlgorithm
+
+
+class WltsProcessingProvider(QgsProcessingProvider):
+    """Processing provider with the WLTS algorithms."""
+
+    def loadAlgorithms(self):
+        """Add the provider algorithms."""
+        self.addAlgorithm(TrajectoryBatchAlgorithm())
+
+    def id(self):
+        """Return the provider id used by ``qgis_process``."""
+        return 'wlts'
+
+    def name(self):
+        """Return the provider name shown in the toolbox."""
+        return 'WLTS'
+
+    def icon(self):
+        """Return the plugin icon."""
+        return QIcon(str(Path(Config.BASE_DIR) / 'assets' / 'icon.png'))
@@ -0,0 +1,506 @@
+# coding=utf-8
+"""Local stand-in for the WLTS and LCCS services.
+
+Serves the collection metadata and classification systems recorded in
+``test/fixtures`` (or synthetic ones) and deterministic trajectories, so
+the plugin can be exercised without the remote servers. Latency, error
+rate and throughput caps are configurable to reproduce a loaded server.
+
+Run it standalone and point the plugin to it::
+
+    $ python wlts_plugin/test/stub_server.py --port 8080 --latency 0.2
+    $ export WLTS_HOST=http://127.0.0.1:8080/wlts/
+    $ export LCCS_HOST=http://127.0.0.1:8080/lccs/
+
+A recorded load, one JSON object per line with the request offset in
+seconds and its path (``{"t": 0.5, "path": "/wlts/trajectory?..."}``),
+is replayed against any server with ``--replay <file> --target <url>``.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlparse
+from urllib.request import urlopen
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+class StubData:
+    """Recorded metadata and synthetic trajectories served by the stub."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        """Load the recorded fixtures.
+
+        :param fixtures_dir<Path>: folder with the JSON fixtures.
+        """
+        fixtures_dir = Path(fixtures_dir)
+        with (fixtures_dir / 'collections.json').open() as f:
+            self.collections = {
+                c['name']: c for c in json.load(f)['collections']
+            }
+        with (fixtures_dir / 'classification_systems.json').open() as f:
+            self.systems = {
+                str(s['id']): s for s in json.load(f)['classification_systems']
+            }
+
+    @classmethod
+    def synthetic(cls, collections=50, fixtures_dir=FIXTURES_DIR):
+        """Build data with ``collections`` copies of the recorded collections.
+
+        :param collections<int>: number of collections to serve.
+        :param fixtures_dir<Path>: folder with the JSON fixtures.
+        """
+        data = cls(fixtures_dir)
+        recorded = list(data.collections.values())
+        data.collections = {}
+        for index in range(collections):
+            collection = dict(recorded[index % len(recorded)])
+            collection['name'] = f"{collection['name']}_{index:03d}"
+            collection['title'] = f"{collection['title']} {index:03d}"
+            data.collections[collection['name']] = collection
+        return data
+
+    def list_collections(self):
+        """Return the list of collection names."""
+        return {'collections': list(self.collections.keys())}
+
+    def describe_collection(self, collection_id):
+        """Return the description of a collection.
+
+        :raises KeyError: when the collection does not exist.
+        """
+        return self.collections[collection_id]
+
+    def system(self, system_id):
+        """Return a classification system by id or ``name-version``.
+
+        :raises KeyError: when the classification system does not exist.
+        """
+        if system_id in self.systems:
+            return self.systems[system_id]
+        for system in self.systems.values():
+            if system_id in (system['name'], f"{system['name']}-{system['version']}"):
+                return system
+        raise KeyError(system_id)
+
+    def _class_at(self, collection, longitude, latitude, year):
+        """Choose a stable class for a location and year."""
+        classes = self.system(str(collection['classification_system']['id']))['classes']
+        # Classes change only every few years, producing realistic runs
+        seed = f"{collection['name']}:{longitude:.4f}:{latitude:.4f}:{year // 4}"
+        digest = hashlib.md5(seed.encode()).hexdigest()
+        return classes[int(digest, 16) % len(classes)]['title']
+
+    def trajectory(self, longitude, latitude, collections=None,
+                   start_date=None, end_date=None, **params):
+        """Build the trajectory response for a single location.
+
+        :param longitude<float>: the point longitude.
+        :param latitude<float>: the point latitude.
+        :param collections<str>: collection names separated by commas.
+        :param start_date<str>: the begin of the time interval.
+        :param end_date<str>: the end of the time interval.
+        """
+        names = collections.split(',') if collections else list(self.collections)
+        start_year = int(start_date[:4]) if start_date else 0
+        end_year = int(end_date[:4]) if end_date else 9999
+        trajectory = []
+        for name in names:
+            collection = self.collections[name]
+            first = max(start_year, int(collection['period']['start_date'][:4]))
+            last = min(end_year, int(collection['period']['end_date'][:4]))
+            for year in range(first, last + 1):
+                trajectory.append({
+                    'class': self._class_at(collection, longitude, latitude, year),
+                    'collection': name,
+                    'date': str(year)
+                })
+        return {
+            'query': {
+                'collections': names,
+                'end_date': end_date,
+                'latitude': latitude,
+                'longitude': longitude,
+                'start_date': start_date
+            },
+            'result': {'trajectory': trajectory}
+        }
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Route WLTS and LCCS requests to the :class:`StubData`."""
+
+    def log_message(self, format, *args):
+        """Keep the test output quiet."""
+        pass
+
+    def send_json(self, data, status=200, headers=None):
+        """Write a JSON response.
+
+        Successful responses have an ``ETag``, and a request with the same
+        ``If-None-Match`` is answered with ``304`` without body.
+        """
+        body = json.dumps(data).encode()
+        if status == 200:
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            headers = dict(headers or {}, ETag=etag)
+            if self.headers.get('If-None-Match') == etag:
+                status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(self.path, status)
+
+    def send_error_json(self, status, description, retry_after=None):
+        """Write an error response, optionally with a ``Retry-After`` header."""
+        headers = {'Retry-After': str(retry_after)} if retry_after else None
+        self.send_json({'code': status, 'description': description}, status, headers)
+
+    def do_GET(self):
+        """Answer a GET request applying the configured server behaviour."""
+        server = self.server
+        retry_after = server.acquire_token()
+        if retry_after:
+            return self.send_error_json(429, 'Too Many Requests', retry_after)
+        if not server.enter():
+            return self.send_error_json(503, 'Service Unavailable', 1)
+        try:
+            server.delay()
+            if server.fail():
+                return self.send_error_json(503, 'Service Unavailable')
+            self.route()
+        finally:
+            server.leave()
+
+    def route(self):
+        """Answer the request with the stub data."""
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split('/') if p]
+        try:
+            service, parts = parts[0], parts[1:]
+            if service == 'wlts':
+                self.send_json(self.wlts(parts, params))
+            elif service == 'lccs':
+                self.send_json(self.lccs(parts, params))
+            else:
+                raise KeyError(service)
+        except (IndexError, KeyError, StopIteration) as error:
+            self.send_error_json(404, str(error))
+        except (TypeError, ValueError) as error:
+            self.send_error_json(400, str(error))
+
+    def wlts(self, parts, params):
+        """Answer the WLTS operations."""
+        data = self.server.data
+        operation = parts[0] if parts else ''
+        if operation == '':
+            return {'supported_language': [{'language': 'pt-br'}, {'language': 'en'}]}
+        if operation == 'list_collections':
+            return data.list_collections()
+        if operation == 'describe_collection':
+            return data.describe_collection(params['collection_id'])
+        if operation == 'trajectory':
+            params.pop('access_token', None)
+            return data.trajectory(
+                longitude=float(params.pop('longitude', None)),
+                latitude=float(params.pop('latitude', None)),
+                **params
+            )
+        raise KeyError(operation)
+
+    def lccs(self, parts, params):
+        """Answer the LCCS classification system operations."""
+        data = self.server.data
+        if not parts:
+            return {'application_name': 'LCCS stub', 'version': '0.8.0'}
+        if parts[0] == 'classification_systems':
+            if len(parts) == 1:
+                return [
+                    {k: v for k, v in s.items() if k != 'classes'}
+                    for s in data.systems.values()
+                ]
+            system = data.system(parts[1])
+            if len(parts) == 2:
+                return {k: v for k, v in system.items() if k != 'classes'}
+            if parts[2] == 'classes':
+                if len(parts) == 3:
+                    return system['classes']
+                return next(c for c in system['classes'] if str(c['id']) == parts[3])
+            if parts[2] in ('style_formats', 'styles'):
+                return [{'id': 1, 'name': 'SLD-Feature-Point'}]
+        if parts[0] == 'style_formats':
+            return [{'id': 1, 'name': 'SLD-Feature-Point'}]
+        raise KeyError('/'.join(parts))
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """HTTP server with configurable latency, errors and throughput caps."""
+
+    daemon_threads = True
+
+    def __init__(self, address, data, latency=0.0, jitter=0.0, error_rate=0.0,
+                 max_rps=None, max_in_flight=None, seed=None):
+        """Bind the server.
+
+        :param address<tuple>: the (host, port) to bind.
+        :param data<StubData>: the data to serve.
+        :param latency<float>: seconds added to every response.
+        :param jitter<float>: maximum random seconds added to the latency.
+        :param error_rate<float>: fraction of requests answered with 503.
+        :param max_rps<float>: requests per second allowed, the excess is
+            answered with 429 and a ``Retry-After`` header.
+        :param max_in_flight<int>: concurrent requests allowed, the excess
+            is answered with 503.
+        :param seed<int>: seed for the latency jitter and the errors.
+        """
+        super().__init__(address, StubRequestHandler)
+        self.data = data
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.max_in_flight = max_in_flight
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = max_rps or 0
+        self.last_refill = time.monotonic()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the request counters."""
+        with self.lock:
+            self.in_flight = 0
+            self.stats = {
+                'requests': 0,
+                'peak_in_flight': 0,
+                'operations': Counter(),
+                'status': Counter()
+            }
+
+    def record(self, path, status):
+        """Count an answered request."""
+        operation = urlparse(path).path.strip('/')
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['operations'][operation] += 1
+            self.stats['status'][status] += 1
+
+    def acquire_token(self):
+        """Take a token from the throughput bucket.
+
+        :returns: ``None`` when allowed, or the seconds to wait otherwise.
+        """
+        if not self.max_rps:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.max_rps, self.tokens + (now - self.last_refill) * self.max_rps)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return max(1, math.ceil((1 - self.tokens) / self.max_rps))
+
+    def enter(self):
+        """Register a request in flight, ``False`` when over the cap."""
+        with self.lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                return False
+            self.in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+            return True
+
+    def leave(self):
+        """Unregister a request in flight."""
+        with self.lock:
+            self.in_flight -= 1
+
+    def delay(self):
+        """Sleep for the configured latency."""
+        with self.lock:
+            seconds = self.latency + self.random.uniform(0, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def fail(self):
+        """Draw whether this request must fail."""
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+class StubServer:
+    """Run the stub services in a background thread.
+
+    Use it as a context manager::
+
+        with StubServer(latency=0.1, error_rate=0.05) as server:
+            Config.WLTS_HOST = server.wlts_url
+            Config.LCCS_HOST = server.lccs_url
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, data=None, **options):
+        """Bind the HTTP server, port ``0`` chooses a free port.
+
+        :param options: the server behaviour, see :class:`StubHTTPServer`.
+        """
+        self.httpd = StubHTTPServer((host, port), data or StubData(), **options)
+        self.thread = None
+
+    @property
+    def url(self):
+        """Return the base URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def wlts_url(self):
+        """Return the URL to be used as ``WLTS_HOST``."""
+        return f'{self.url}/wlts/'
+
+    @property
+    def lccs_url(self):
+        """Return the URL to be used as ``LCCS_HOST``."""
+        return f'{self.url}/lccs/'
+
+    @property
+    def stats(self):
+        """Return the request counters."""
+        return self.httpd.stats
+
+    def start(self):
+        """Start serving in a daemon thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop the server."""
+        self.stop()
+
+
+def replay(log_file, target, speed=1.0, workers=16):
+    """Replay a recorded load against a server keeping its pacing.
+
+    :param log_file<str>: JSON lines file with ``t`` (seconds) and ``path``.
+    :param target<str>: base URL of the server, e.g. ``http://127.0.0.1:8080``.
+    :param speed<float>: time scale, ``2.0`` replays twice as fast.
+    :param workers<int>: maximum concurrent requests.
+    :returns: a dict with the status counts and latency percentiles.
+    """
+    with open(log_file) as f:
+        entries = sorted(
+            (json.loads(line) for line in f if line.strip()),
+            key=lambda entry: entry['t']
+        )
+
+    def send(path):
+        begin = time.perf_counter()
+        try:
+            with urlopen(target.rstrip('/') + path) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        return status, time.perf_counter() - begin
+
+    start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for entry in entries:
+            wait = entry['t'] / speed - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+            futures.append(executor.submit(send, entry['path']))
+    results = [future.result() for future in futures]
+    latencies = sorted(latency for _, latency in results)
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+
+    return {
+        'requests': len(results),
+        'elapsed': time.perf_counter() - start,
+        'status': dict(Counter(status for status, _ in results)),
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99)
+    }
+
+
+def main(argv=None):
+    """Run the stub server or replay a recorded load from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to each response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximum random extra latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 503 responses')
+    parser.add_argument('--max-rps', type=float, default=None, help='requests per second before 429')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='concurrent requests before 503')
+    parser.add_argument('--collections', type=int, default=None, help='serve synthetic collections')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--replay', default=None, help='JSON lines load to replay')
+    parser.add_argument('--target', default=None, help='server to replay against')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay time scale')
+    args = parser.parse_args(argv)
+
+    if args.replay and args.target:
+        print(json.dumps(replay(args.replay, args.target, args.speed), indent=4))
+        return
+
+    data = StubData.synthetic(args.collections) if args.collections else StubData()
+    server = StubServer(
+        args.host, args.port, data,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        max_rps=args.max_rps, max_in_flight=args.max_in_flight, seed=args.seed
+    ).start()
+    print(f'export WLTS_HOST={server.wlts_url}')
+    print(f'export LCCS_HOST={server.lccs_url}')
+    try:
+        if args.replay:
+            print(json.dumps(replay(args.replay, server.url, args.speed), indent=4))
+        else:
+            server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats, indent=4, default=dict))
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# coding=utf-8
+"""Timing spans test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import json
+import os
+import tempfile
+import unittest
+
+from wlts_plugin.controller.tracing import Tracer
+
+
+class TracerTest(unittest.TestCase):
+    """Test the timing spans record and export."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.tracer = Tracer(capacity=3)
+
+    def test_span_records_duration_and_args(self):
+        """Test a span is kept with its details."""
+        with self.tracer.span('getTrajectory', points=1):
+            pass
+        span = self.tracer.recent()[0]
+        self.assertEqual(span['name'], 'getTrajectory')
+        self.assertEqual(span['args'], {'points': '1'})
+        self.assertGreaterEqual(span['duration'], 0)
+        self.assertIsNone(span['error'])
+
+    def test_span_records_error(self):
+        """Test a failing span is kept and the error is raised."""
+        with self.assertRaises(ValueError):
+            with self.tracer.span('plotTrajectory'):
+                raise ValueError('no data')
+        self.assertEqual(self.tracer.recent()[0]['error'], 'ValueError: no data')
+
+    def test_capacity_and_listeners(self):
+        """Test only the last spans are kept and listeners are notified once."""
+        received = []
+        self.tracer.subscribe(received.append)
+        self.tracer.subscribe(received.append)
+        traced = self.tracer.traced('operation')(lambda value: value)
+        for value in range(5):
+            self.assertEqual(traced(value), value)
+        self.assertEqual(len(received), 5)
+        self.assertEqual(len(self.tracer.recent()), 3)
+
+    def test_export_chrome_trace(self):
+        """Test the exported file follows the trace event format."""
+        with self.tracer.span('description', collection='prodes'):
+            pass
+        file_name = os.path.join(tempfile.mkdtemp(), 'trace.json')
+        self.tracer.exportChromeTrace(file_name)
+        with open(file_name) as trace:
+            event = json.load(trace)['traceEvents'][0]
+        self.assertEqual(event['ph'], 'X')
+        self.assertEqual(event['name'], 'description')
+        self.assertEqual(event['args'], {'collection': 'prodes'})
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TracerTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
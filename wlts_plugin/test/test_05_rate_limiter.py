@@ -0,0 +1,172 @@
+# coding=utf-8
+"""Rate limiter test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from wlts_plugin.controller.rate_limiter import (RateLimiter, currentPriority,
+                                                 priority, retryAfter)
+
+
+def http_error(status, headers=None):
+    """Build an error like the ones raised by the HTTP client."""
+    error = Exception(f'HTTP {status}')
+    error.response = SimpleNamespace(status_code=status, headers=headers or {})
+    return error
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Test the token bucket and the in-flight governor."""
+
+    def test_retry_after_header(self):
+        """Test the Retry-After header is parsed as seconds."""
+        self.assertEqual(retryAfter(http_error(429, {'Retry-After': '2'})), 2.0)
+        self.assertIsNone(retryAfter(http_error(429)))
+        self.assertIsNone(retryAfter(ValueError()))
+
+    def test_throughput_cap(self):
+        """Test the requests do not exceed the maximum rate."""
+        limiter = RateLimiter(max_rps=50, max_in_flight=4)
+        begin = time.monotonic()
+        for _ in range(11):
+            limiter.call(lambda: None)
+        self.assertGreaterEqual(time.monotonic() - begin, 10 / 50 * 0.9)
+
+    def test_max_in_flight(self):
+        """Test the concurrent requests do not exceed the limit."""
+        limiter = RateLimiter(max_rps=1000, max_in_flight=2)
+        lock = threading.Lock()
+        state = {'now': 0, 'peak': 0}
+
+        def request():
+            with lock:
+                state['now'] += 1
+                state['peak'] = max(state['peak'], state['now'])
+            time.sleep(0.02)
+            with lock:
+                state['now'] -= 1
+
+        threads = [threading.Thread(target=limiter.call, args=(request,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(state['peak'], 2)
+
+    def test_throttled_request_is_retried_and_backs_off(self):
+        """Test a 429 answer is retried and reduces the rate."""
+        limiter = RateLimiter(max_rps=100, max_in_flight=4, max_retries=2)
+        answers = [http_error(429, {'Retry-After': '0'}), 'trajectory']
+
+        def request():
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        self.assertEqual(limiter.call(request), 'trajectory')
+        self.assertLess(limiter.rate, 100)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_retries_are_limited(self):
+        """Test the error is raised when the retries are exhausted."""
+        limiter = RateLimiter(max_rps=1000, max_in_flight=1, max_retries=1)
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise http_error(503, {'Retry-After': '0'})
+
+        with self.assertRaises(Exception):
+            limiter.call(request)
+        self.assertEqual(len(calls), 2)
+
+    def test_other_errors_are_not_retried(self):
+        """Test errors other than throttling are raised at once."""
+        limiter = RateLimiter()
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise http_error(404)
+
+        with self.assertRaises(Exception):
+            limiter.call(request)
+        self.assertEqual(len(calls), 1)
+
+    def test_priority_context(self):
+        """Test the priority of the requests of a thread."""
+        self.assertEqual(currentPriority(), (0, None))
+        with priority('batch', 'job'):
+            self.assertEqual(currentPriority(), (2, 'job'))
+            with priority('prefetch'):
+                self.assertEqual(currentPriority(), (1, None))
+            self.assertEqual(currentPriority(), (2, 'job'))
+        self.assertEqual(currentPriority(), (0, None))
+
+    def served(self, limiter, requests):
+        """Queue requests behind a running one and return their serving order.
+
+        :param requests<list>: the (name, priority, flow) of the requests.
+        """
+        order = []
+        release = threading.Event()
+        started = threading.Event()
+
+        def running():
+            started.set()
+            release.wait(5)
+
+        def send(name, priority_, flow):
+            with priority(priority_, flow):
+                limiter.call(order.append, name)
+
+        first = threading.Thread(target=limiter.call, args=(running,))
+        first.start()
+        started.wait(5)
+        threads = []
+        for request in requests:
+            threads.append(threading.Thread(target=send, args=request))
+            threads[-1].start()
+            while len(limiter.waiting) < len(threads):
+                time.sleep(0.001)
+        release.set()
+        for thread in [first] + threads:
+            thread.join()
+        return order
+
+    def test_interactive_before_batch(self):
+        """Test an interactive request is served before the queued batch ones."""
+        limiter = RateLimiter(max_rps=1000, max_in_flight=1)
+        requests = [(f'batch{index}', 'batch', 'job') for index in range(5)]
+        requests += [('prefetch', 'prefetch', None), ('interactive', 'interactive', None)]
+        order = self.served(limiter, requests)
+        self.assertEqual(order[:2], ['interactive', 'prefetch'])
+        self.assertEqual(order[2:], [f'batch{index}' for index in range(5)])
+
+    def test_batch_jobs_in_turns(self):
+        """Test the jobs of the same class share the requests in turns."""
+        limiter = RateLimiter(max_rps=1000, max_in_flight=1)
+        requests = [(f'a{index}', 'batch', 'a') for index in range(3)]
+        requests += [(f'b{index}', 'batch', 'b') for index in range(3)]
+        order = self.served(limiter, requests)
+        self.assertEqual(order, ['a0', 'b0', 'a1', 'b1', 'a2', 'b2'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RateLimiterTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,79 @@
+# coding=utf-8
+"""Resumable batch jobs test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from wlts_plugin.controller.batch_jobs import JobManager
+
+
+class FakeControls:
+    """Answer trajectories locally, failing on the chosen longitudes."""
+
+    def __init__(self, fail=()):
+        self.limiter = SimpleNamespace(max_in_flight=2)
+        self.fail = set(fail)
+        self.requested = []
+
+    def fetchTrajectory(self, lon, lat, collections, start_date, end_date):
+        self.requested.append(lon)
+        if lon in self.fail:
+            raise ConnectionError('network is down')
+        return {'result': {'trajectory': [
+            {'class': 'Floresta', 'collection': collections[0], 'date': '2020'}
+        ]}}
+
+
+class JobManagerTest(unittest.TestCase):
+    """Test the job journal and the resume of interrupted jobs."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.manager = JobManager(tempfile.mkdtemp())
+        self.job = self.manager.create(
+            [(-60.0, -5.0), (-61.0, -5.0), (-62.0, -5.0)],
+            ['prodes_amazonia_legal'], '2000-01-01', '2020-12-31'
+        )
+
+    def test_resume_fetches_only_pending_points(self):
+        """Test a second run skips the points already in the journal."""
+        controls = FakeControls(fail=[-61.0])
+        self.manager.run(self.job, controls)
+        self.assertEqual(self.job.progress(), (2, 3))
+        self.assertEqual(list(self.job.failed()), [2])
+
+        job = self.manager.load(self.job.id)
+        controls = FakeControls()
+        trajectories = self.manager.run(job, controls)
+        self.assertEqual(controls.requested, [-61.0])
+        self.assertEqual(job.progress(), (3, 3))
+        self.assertEqual(job.failed(), {})
+        self.assertEqual(
+            [t['result']['trajectory'][0]['point_id'] for t in trajectories['trajectories']],
+            [1, 2, 3]
+        )
+
+    def test_torn_journal_line_is_ignored(self):
+        """Test a line partially written by a crash does not break the job."""
+        self.job.append(1, [{'class': 'Floresta', 'collection': 'prodes', 'date': '2020'}])
+        with self.job.journal.open('a') as journal:
+            journal.write('{"point_id": 2, "sta')
+        self.assertEqual(self.job.pending(), [2, 3])
+        self.assertEqual(len(self.manager.jobs()), 1)
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(JobManagerTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,63 @@
+# coding=utf-8
+"""Trajectory cache test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import os
+import tempfile
+import unittest
+
+from wlts_plugin.controller.trajectory_cache import TrajectoryCache
+
+
+class TrajectoryCacheTest(unittest.TestCase):
+    """Test the trajectory responses cache."""
+
+    def test_key_ignores_collections_order(self):
+        """Same query with collections in another order has the same key."""
+        self.assertEqual(
+            TrajectoryCache.key(-54.0, -12.0, ['b', 'a'], '2000-01-01', '2020-12-31'),
+            TrajectoryCache.key(-54.0, -12.0, ['a', 'b'], '2000-01-01', '2020-12-31')
+        )
+
+    def test_get_put(self):
+        """A stored response is returned and counted as a hit."""
+        cache = TrajectoryCache()
+        key = TrajectoryCache.key(-54.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'result': {'trajectory': []}})
+        self.assertEqual(cache.get(key), {'result': {'trajectory': []}})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evict_least_recently_used(self):
+        """Entries above the limit are removed, oldest access first."""
+        cache = TrajectoryCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+    def test_persist_file(self):
+        """A cache file is shared between instances."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'cache', 'trajectories.sqlite')
+            TrajectoryCache(path).put('a', [1, 2])
+            self.assertEqual(TrajectoryCache(path).get('a'), [1, 2])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TrajectoryCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,82 @@
+# coding=utf-8
+"""Parallel facets rendering test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from wlts_plugin.controller.facet_renderer import FacetRenderer
+
+PNG_SIGNATURE = b'\x89PNG'
+
+PARAMETERS = {
+    'facet_width': 300, 'facet_height': 200, 'opacity': 0.8,
+    'date': 'Year', 'title_y': 'Number of Points', 'legend_title_text': 'Class'
+}
+
+
+def facets(size):
+    """Return the facets of ``size`` collections."""
+    data = pd.DataFrame({
+        'date': ['2000', '2000', '2001'],
+        'class': ['Floresta', 'Agua', 'Floresta'],
+        'size': [3, 1, 4]
+    })
+    return [(f'collection = c{i}', data) for i in range(size)]
+
+
+class FacetRendererTest(unittest.TestCase):
+    """Test the facets rendering, composition and files."""
+
+    def setUp(self):
+        self.colors = FacetRenderer.colors(['Agua', 'Floresta'])
+
+    def test_render_in_process(self):
+        """One worker renders the facets in the current process."""
+        renderer = FacetRenderer(max_workers=1)
+        images = renderer.render(facets(2), ['2000', '2001'], self.colors, PARAMETERS)
+        self.assertEqual(len(images), 2)
+        self.assertTrue(all(image.startswith(PNG_SIGNATURE) for image in images))
+        self.assertIsNone(renderer.executor)
+
+    def test_render_in_processes(self):
+        """Worker processes return the facets in order."""
+        renderer = FacetRenderer(max_workers=2)
+        try:
+            images = renderer.render(facets(3), ['2000', '2001'], self.colors, PARAMETERS)
+        finally:
+            renderer.shutdown()
+        self.assertEqual(len(images), 3)
+        self.assertTrue(all(image.startswith(PNG_SIGNATURE) for image in images))
+
+    def test_compose_and_save(self):
+        """The images are tiled in rows of three and saved by name."""
+        renderer = FacetRenderer(max_workers=1)
+        images = renderer.render(facets(4), ['2000', '2001'], self.colors, PARAMETERS)
+        figure = Figure()
+        renderer.compose(figure, images, self.colors, PARAMETERS)
+        self.assertEqual(len([ax for ax in figure.axes if ax.get_visible()]), 4)
+        self.assertEqual(len(figure.axes), 6)
+        with tempfile.TemporaryDirectory() as folder:
+            files = renderer.save(folder, ['a', 'b', 'c', 'd'], images)
+            self.assertEqual([Path(f).name for f in files], ['a.png', 'b.png', 'c.png', 'd.png'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(FacetRendererTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
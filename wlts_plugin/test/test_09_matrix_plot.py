@@ -0,0 +1,80 @@
+# coding=utf-8
+"""Aggregated bar plots test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+from unittest import mock
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from wlts_plugin.controller import matrix_plot
+
+
+def trajectory():
+    """Return a trajectory frame with categorical columns."""
+    df = pd.DataFrame({
+        'date': ['2000', '2000', '2000', '2001', '2002'],
+        'class': ['Floresta', 'Floresta', 'Agua', 'Agua', 'Floresta'],
+        'point_id': [1, 2, 3, 1, 2]
+    })
+    for column in ('date', 'class'):
+        df[column] = df[column].astype('category')
+    return df
+
+
+class MatrixPlotTest(unittest.TestCase):
+    """Test the dates x classes aggregation and its drawing."""
+
+    def test_class_matrix(self):
+        """The matrix has the groupby counts and every category."""
+        matrix = matrix_plot.classMatrix(trajectory())
+        self.assertEqual(list(matrix.index), ['2000', '2001', '2002'])
+        self.assertEqual(list(matrix.columns), ['Agua', 'Floresta'])
+        self.assertEqual(matrix.to_numpy().tolist(), [[1, 2], [1, 0], [0, 1]])
+
+    def test_count_matrix(self):
+        """The counts of a facet are reshaped in the given order."""
+        counts = pd.DataFrame({'date': ['2001'], 'class': ['Agua'], 'size': [4]})
+        matrix = matrix_plot.countMatrix(counts, ['2000', '2001'], ['Agua', 'Floresta'])
+        self.assertEqual(matrix.to_numpy().tolist(), [[0, 0], [4, 0]])
+
+    def test_lod_style(self):
+        """Large results are drawn as stacked bars, long series as heatmaps."""
+        with mock.patch.object(matrix_plot.Config, 'PLOT_LOD_ROWS', 10), \
+                mock.patch.object(matrix_plot.Config, 'PLOT_LOD_DATES', 5):
+            self.assertEqual(matrix_plot.lodStyle(10, 5), 'seaborn')
+            self.assertEqual(matrix_plot.lodStyle(11, 5), 'stacked')
+            self.assertEqual(matrix_plot.lodStyle(11, 6), 'heatmap')
+
+    def test_draw_stacked_bars(self):
+        """One bar container per drawn class, stacked on the previous."""
+        matrix = matrix_plot.classMatrix(trajectory())
+        ax = Figure().add_subplot(111)
+        matrix_plot.drawStackedBars(ax, matrix, matrix_plot.classColors(list(matrix.columns)))
+        agua, floresta = ax.containers
+        self.assertEqual([bar.get_y() for bar in floresta], [1, 1, 0])
+        self.assertEqual([bar.get_height() for bar in floresta], [2, 0, 1])
+
+    def test_draw_heatmap(self):
+        """The heatmap has a row per class and a column per date."""
+        matrix = matrix_plot.classMatrix(trajectory())
+        ax = Figure().add_subplot(111)
+        image = matrix_plot.drawHeatmap(ax, matrix)
+        self.assertEqual(image.get_array().shape, (2, 3))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MatrixPlotTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
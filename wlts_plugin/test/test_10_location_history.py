@@ -0,0 +1,105 @@
+# coding=utf-8
+"""Locations history test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import os
+import tempfile
+import unittest
+
+from wlts_plugin.controller.location_history import LocationHistory
+
+
+class LocationHistoryTest(unittest.TestCase):
+    """Test the locations grid index and the clicks snapping."""
+
+    def setUp(self):
+        self.history = LocationHistory(tolerance=0.001)
+
+    def test_add(self):
+        """Distant clicks are saved as new locations."""
+        self.assertEqual(self.history.add(-54.0, -12.0), (0, True))
+        self.assertEqual(self.history.add(-54.01, -12.0), (1, True))
+        self.assertEqual(len(self.history), 2)
+        self.assertEqual(self.history[1]['label'], '[-54.0100000, -12.0000000]')
+
+    def test_snap_near_location(self):
+        """A click within the tolerance returns the saved location."""
+        self.history.add(-54.0, -12.0)
+        self.history.setCacheKey(self.history[0], 'key')
+        self.assertEqual(self.history.add(-54.0004, -11.9996), (0, False))
+        self.assertEqual(self.history[0]['long'], -54.0)
+        self.assertEqual(self.history[0]['cache_key'], 'key')
+
+    def test_snap_across_cells(self):
+        """Locations in the neighbor grid cells are found."""
+        self.history.add(-54.0001, -12.0001)
+        self.assertEqual(self.history.nearest(-53.9995, -11.9995), 0)
+        self.assertIsNone(self.history.nearest(-53.998, -12.0001))
+
+    def test_same_pixel_key(self):
+        """Clicks with a pixel key match only the location with the same key."""
+        self.history.add(-54.0, -12.0, pixel_key='pixel')
+        self.assertEqual(self.history.add(-54.002, -12.0, pixel_key='pixel'), (0, False))
+        # Close to it, but in another pixel
+        self.assertEqual(self.history.add(-54.0001, -12.0, pixel_key='other'), (1, True))
+        self.assertEqual(self.history.nearest(-54.00002, -12.0), 0)
+
+    def test_nearest_location(self):
+        """The closest of the locations near a click is returned."""
+        self.history.add(-54.0, -12.0)
+        self.history.add(-54.0015, -12.0)
+        self.assertEqual(self.history.nearest(-54.0009, -12.0), 1)
+
+
+    def test_persist_file(self):
+        """Locations and cache keys are kept when the history is opened again."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'history.sqlite')
+            history = LocationHistory(path, tolerance=0.001)
+            history.add(-54.0, -12.0, 'layer')
+            history.setCacheKey(history[0], 'key')
+            history.connection.close()
+            history = LocationHistory(path, tolerance=0.001)
+            self.assertEqual(len(history), 1)
+            self.assertEqual(history[0]['layer_name'], 'layer')
+            self.assertEqual(history[0]['cache_key'], 'key')
+            self.assertEqual(history.add(-54.0001, -12.0), (0, False))
+            history.connection.close()
+
+    def test_reindex_on_tolerance_change(self):
+        """The grid cells are computed again for a new tolerance."""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'history.sqlite')
+            history = LocationHistory(path, tolerance=0.001)
+            history.add(-54.0, -12.0)
+            history.connection.close()
+            history = LocationHistory(path, tolerance=0.01)
+            self.assertEqual(history.nearest(-54.005, -12.0), 0)
+            history.connection.close()
+
+    def test_pages(self):
+        """Rows are read a page at a time, including new rows."""
+        history = LocationHistory(tolerance=0.001, page_size=2)
+        for i in range(5):
+            history.add(i, 0)
+        self.assertEqual([history[i]['long'] for i in range(5)], [0, 1, 2, 3, 4])
+        history.add(5, 0)
+        self.assertEqual(history[5]['long'], 5)
+        with self.assertRaises(IndexError):
+            history[6]
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(LocationHistoryTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
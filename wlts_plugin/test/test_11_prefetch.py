@@ -0,0 +1,133 @@
+# coding=utf-8
+"""Trajectory prefetch test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import json
+import threading
+import unittest
+
+from wlts_plugin.controller.prefetch import Prefetcher
+from wlts_plugin.controller.rate_limiter import RateLimiter
+from wlts_plugin.controller.trajectory_cache import TrajectoryCache
+
+
+class FakeControls:
+    """Save trajectories in the cache once the test releases them."""
+
+    def __init__(self):
+        self.cache = TrajectoryCache()
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.requested = []
+
+    queryKey = staticmethod(TrajectoryCache.key)
+
+    def fetchTrajectory(self, lon, lat, collections, start_date, end_date):
+        self.requested.append(lon)
+        self.started.set()
+        self.release.wait(5)
+        key = TrajectoryCache.key(lon, lat, collections, start_date, end_date)
+        self.cache.put(key, {'result': {'trajectory': []}})
+
+
+class LimitedControls(FakeControls):
+    """Send the requests under a rate limiter of one request at a time."""
+
+    def __init__(self):
+        super().__init__()
+        self.limiter = RateLimiter(max_rps=1000, max_in_flight=1)
+
+    def fetchTrajectory(self, lon, lat, collections, start_date, end_date):
+        key = TrajectoryCache.key(lon, lat, collections, start_date, end_date)
+        self.limiter.call(self.requested.append, lon)
+        self.cache.put(key, {'result': {'trajectory': []}})
+
+
+class PrefetcherTest(unittest.TestCase):
+    """Test the background fetch of the selected point."""
+
+    def setUp(self):
+        self.controls = FakeControls()
+        self.prefetcher = Prefetcher(self.controls, max_workers=1)
+
+    def tearDown(self):
+        self.controls.release.set()
+        self.prefetcher.shutdown()
+
+    def test_prefetch_into_cache(self):
+        """The search waits for the prefetch and finds the cached trajectory."""
+        key = self.prefetcher.prefetch(-54.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        self.controls.release.set()
+        self.prefetcher.wait(key, timeout=5)
+        self.assertTrue(self.controls.cache.contains(key))
+
+    def test_wait_timeout(self):
+        """The search stops waiting for a slow prefetch after the timeout."""
+        key = self.prefetcher.prefetch(-54.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        self.controls.started.wait(5)
+        self.assertFalse(self.prefetcher.wait(key, timeout=0.05))
+        self.controls.release.set()
+        self.assertTrue(self.prefetcher.wait(key, timeout=5))
+        self.assertTrue(self.prefetcher.wait('other'))
+
+    def test_same_query_once(self):
+        """A query being prefetched or cached is not requested again."""
+        key = self.prefetcher.prefetch(-54.0, -12.0, ['a', 'b'], '2000-01-01', '2020-12-31')
+        self.prefetcher.prefetch(-54.0, -12.0, ['b', 'a'], '2000-01-01', '2020-12-31')
+        self.controls.release.set()
+        self.prefetcher.wait(key, timeout=5)
+        self.prefetcher.prefetch(-54.0, -12.0, ['a', 'b'], '2000-01-01', '2020-12-31')
+        self.assertEqual(self.controls.requested, [-54.0])
+
+    def test_cancel_when_moving_on(self):
+        """Selecting other points cancels the prefetches not started."""
+        self.prefetcher.prefetch(-54.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        self.controls.started.wait(5)
+        self.prefetcher.prefetch(-55.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        key = self.prefetcher.prefetch(-56.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        self.controls.release.set()
+        self.prefetcher.wait(key, timeout=5)
+        self.assertEqual(self.controls.requested, [-54.0, -56.0])
+
+    def test_cancel_waiting_request(self):
+        """A prefetch waiting for a request slot gives it up when it is superseded."""
+        controls = LimitedControls()
+        prefetcher = Prefetcher(controls, max_workers=2)
+        self.addCleanup(prefetcher.shutdown)
+        with controls.limiter.slot():
+            prefetcher.prefetch(-54.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+            while not controls.limiter.waiting:
+                threading.Event().wait(0.01)
+            key = prefetcher.prefetch(-55.0, -12.0, ['a'], '2000-01-01', '2020-12-31')
+        prefetcher.wait(key, timeout=5)
+        self.assertEqual(controls.requested, [-55.0])
+
+    def test_composite_key_in_cache(self):
+        """A query whose pixels are all cached, or with local collections only, is not fetched."""
+        parts = [
+            TrajectoryCache.key(-54.0, -12.0, ['a'], '2000-01-01', '2020-12-31'),
+            TrajectoryCache.key(-54.1, -12.1, ['b'], '2000-01-01', '2020-12-31')
+        ]
+        for part in parts:
+            self.controls.cache.put(part, {'result': {'trajectory': []}})
+        for key in (json.dumps(sorted(parts)), json.dumps([])):
+            self.controls.queryKey = lambda *query, key=key: key
+            self.prefetcher.prefetch(-54.0, -12.0, ['a', 'b'], '2000-01-01', '2020-12-31')
+        self.assertEqual(self.controls.requested, [])
+        self.assertEqual(self.prefetcher.futures, {})
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(PrefetcherTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
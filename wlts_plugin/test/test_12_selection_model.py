@@ -0,0 +1,63 @@
+# coding=utf-8
+"""Debounced selection model test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+
+from qgis.PyQt.QtTest import QSignalSpy
+
+from wlts_plugin.helpers.selection_model import SelectionModel
+from wlts_plugin.test.utilities import get_qgis_app
+
+QGIS_APP, _, _, _ = get_qgis_app()
+
+
+class SelectionModelTest(unittest.TestCase):
+    """Test the incremental selection and the debounced validation."""
+
+    def setUp(self):
+        self.selection = SelectionModel(interval=20)
+        self.selection.setCollections(['c', 'a', 'b'])
+        self.selection.setDates('2000-01-01', '2020-12-31')
+
+    def test_collections_order(self):
+        """Selected collections follow the dialog order."""
+        self.selection.setCollection('b', True)
+        self.selection.setCollection('c', True)
+        self.selection.setCollection('a', True)
+        self.selection.setCollection('a', False)
+        self.assertEqual(self.selection.collections, ['c', 'b'])
+
+    def test_complete_and_key(self):
+        """The key exists only with collections and a location."""
+        self.selection.setCollection('a', True)
+        self.assertIsNone(self.selection.key())
+        self.selection.setLocation(-54, -12)
+        self.assertTrue(self.selection.isComplete())
+        self.assertIn('-54.0000000', self.selection.key())
+
+    def test_debounce(self):
+        """A burst of changes emits a single signal."""
+        spy = QSignalSpy(self.selection.changed)
+        for name in ('a', 'b', 'c'):
+            self.selection.setCollection(name, True)
+        self.selection.setLocation(-54, -12)
+        self.assertTrue(spy.wait(1000))
+        self.assertFalse(spy.wait(100))
+        self.assertEqual(len(spy), 1)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SelectionModelTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,144 @@
+# coding=utf-8
+"""Incremental trajectory refresh test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+from unittest import mock
+
+from wlts_plugin.controller.trajectory_cache import (TrajectoryCache, inWindow,
+                                                     missingIntervals)
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+
+class FakeWLTS:
+    """Answer one yearly class per collection and record the requests."""
+
+    def __init__(self, *args, **kwargs):
+        self.requests = []
+        self.last_year = 9999
+
+    def tj(self, longitude, latitude, collections, start_date, end_date):
+        self.requests.append((collections, start_date, end_date))
+        return {'result': {'trajectory': [
+            {'class': f'{name}-{year}', 'collection': name, 'date': str(year), 'point_id': 1}
+            for name in collections.split(',')
+            for year in range(int(start_date[:4]), min(int(end_date[:4]), self.last_year) + 1)
+        ]}}
+
+
+class IncrementalRefreshTest(unittest.TestCase):
+    """Test only the missing intervals and collections are requested."""
+
+    def setUp(self):
+        """Runs before each test."""
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS', FakeWLTS), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            self.controls = WLTS_Controls(cache=TrajectoryCache(max_age=60))
+        self.server = self.controls.wlts
+
+    def fetch(self, collections, start_date, end_date):
+        trajectory = self.controls.fetchTrajectory(-54.0, -12.0, collections, start_date, end_date)
+        return [(row['collection'], row['date']) for row in trajectory['result']['trajectory']]
+
+    def age(self, seconds):
+        """Make the cached responses and segments older."""
+        connection = self.controls.cache.connection
+        for table in ('trajectories', 'segments'):
+            connection.execute(f'UPDATE {table} SET fetched = fetched - ?', (seconds,))
+        connection.commit()
+
+    def test_missing_intervals(self):
+        """The window parts outside the covered intervals are returned."""
+        self.assertEqual(
+            missingIntervals('2000-01-01', '2020-12-31', [('2005-01-01', '2010-12-31')]),
+            [('2000-01-01', '2004-12-31'), ('2011-01-01', '2020-12-31')]
+        )
+        self.assertEqual(missingIntervals('2006-01-01', '2008-12-31', [('2005-01-01', '2010-12-31')]), [])
+        self.assertTrue(inWindow('2015', '2015-06-01', '2016-12-31'))
+        self.assertFalse(inWindow('2015-05-01', '2015-06-01', '2016-12-31'))
+
+    def test_wider_window_requests_the_new_years(self):
+        """Widening the end date requests only the added interval."""
+        self.fetch(['a', 'b'], '2000-01-01', '2019-12-31')
+        rows = self.fetch(['a', 'b'], '2000-01-01', '2020-12-31')
+        self.assertEqual(self.server.requests[-1], ('a,b', '2020-01-01', '2020-12-31'))
+        self.assertEqual(len(rows), 42)
+        self.assertEqual(rows[20], ('a', '2020'))
+
+    def test_narrower_window_is_local(self):
+        """A window inside the cached one sends no request."""
+        self.fetch(['a'], '2000-01-01', '2020-12-31')
+        rows = self.fetch(['a'], '2005-01-01', '2006-12-31')
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(rows, [('a', '2005'), ('a', '2006')])
+
+    def test_cached_result(self):
+        """A saved query key shows its trajectory without requests."""
+        self.controls.getTrajectory(-54.0, -12.0, ['a', 'b'], '2000-01-01', '2001-12-31')
+        key = self.controls.queryKey(-54.0, -12.0, ['a', 'b'], '2000-01-01', '2001-12-31')
+        result = self.controls.cachedResult(key)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(result.collections, ['a', 'b'])
+        self.assertEqual(result.query['start_date'], '2000-01-01')
+        self.assertEqual(len(result.trajectory['result']['trajectory']), 4)
+        other = self.controls.queryKey(-54.0, -12.0, ['a'], '1990-01-01', '2001-12-31')
+        self.assertIsNone(self.controls.cachedResult(other))
+        self.assertIsNone(self.controls.cachedResult(None))
+
+    def test_cached_result_local_only(self):
+        """A history entry of local collections only has no cached result."""
+        self.controls.local.collections['local'] = {'classes': {}, 'rasters': []}
+        key = self.controls.queryKey(-54.0, -12.0, ['local'], '2000-01-01', '2001-12-31')
+        self.assertEqual(key, '[]')
+        self.assertIsNone(self.controls.cachedResult(key))
+
+    def test_expired_open_segment(self):
+        """An interval without its last year is requested again once expired."""
+        self.server.last_year = 2019
+        self.assertEqual(self.fetch(['a'], '2018-01-01', '2020-12-31'), [('a', '2018'), ('a', '2019')])
+        self.server.last_year = 2020
+        self.fetch(['a'], '2018-01-01', '2020-12-31')
+        self.assertEqual(len(self.server.requests), 1)
+        self.age(120)
+        rows = self.fetch(['a'], '2018-01-01', '2020-12-31')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(rows[-1], ('a', '2020'))
+
+    def test_expired_closed_segment(self):
+        """An interval with data up to its end is kept once expired."""
+        self.fetch(['a'], '2000-01-01', '2010-12-31')
+        self.age(120)
+        rows = self.fetch(['a'], '2000-01-01', '2010-12-31')
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(rows), 11)
+
+    def test_new_collection_only(self):
+        """Checking a new collection requests only that collection."""
+        self.fetch(['a'], '2000-01-01', '2020-12-31')
+        rows = self.fetch(['a', 'b'], '2000-01-01', '2020-12-31')
+        self.assertEqual(self.server.requests[-1], ('b', '2000-01-01', '2020-12-31'))
+        self.assertEqual(len(rows), 42)
+
+    def test_segments_are_merged(self):
+        """Touching windows are kept as a single segment."""
+        self.fetch(['a'], '2000-01-01', '2009-12-31')
+        self.fetch(['a'], '2010-01-01', '2020-12-31')
+        segments = self.controls.cache.segments(-54.0, -12.0, 'a')
+        self.assertEqual([(start, end) for start, end, _ in segments], [('2000-01-01', '2020-12-31')])
+        self.assertEqual(len(segments[0][2]), 21)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(IncrementalRefreshTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
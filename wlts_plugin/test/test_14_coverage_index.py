@@ -0,0 +1,100 @@
+# coding=utf-8
+"""Collections coverage index test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from wlts_plugin.controller.coverage_index import CoverageIndex
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+COLLECTIONS = json.loads(
+    (Path(__file__).parent / 'fixtures' / 'collections.json').read_text()
+)['collections']
+
+#: A point in the Atlantic Forest, outside the Legal Amazon extent
+SOUTH = (-47.0, -23.0)
+
+
+class FakeWLTS:
+    """Describe the fixture collections and record the trajectory requests."""
+
+    def __init__(self, *args, **kwargs):
+        self.requests = []
+
+    def __getitem__(self, name):
+        return next(c for c in COLLECTIONS if c['name'] == name)
+
+    def tj(self, longitude, latitude, collections, start_date, end_date):
+        self.requests.append(collections)
+        return {'result': {'trajectory': []}}
+
+
+class CoverageIndexTest(unittest.TestCase):
+    """Test the collections that can not cover a query are skipped."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.index = CoverageIndex()
+        for collection in COLLECTIONS:
+            self.index.add(collection['name'], collection)
+
+    def test_outside_extent(self):
+        """Collections of the Legal Amazon are skipped in the south."""
+        kept, skipped = self.index.filter(
+            ['prodes_amazonia_legal', 'mapbiomas-v9'], *SOUTH, '2000-01-01', '2020-12-31'
+        )
+        self.assertEqual(kept, ['mapbiomas-v9'])
+        self.assertIn('spatial extent', skipped['prodes_amazonia_legal'])
+
+    def test_outside_period(self):
+        """Collections whose period ends before the dates are skipped."""
+        kept, skipped = self.index.filter(
+            ['deter_amazonia_legal', 'ibge_cobertura_uso_terra'], -60.0, -5.0, '2000-01-01', '2010-12-31'
+        )
+        self.assertEqual(kept, ['ibge_cobertura_uso_terra'])
+        self.assertIn('2016-01-01', skipped['deter_amazonia_legal'])
+
+    def test_any_point_covers(self):
+        """A list of points is covered when one of them is in the extent."""
+        skipped = self.index.reasons(
+            ['prodes_amazonia_legal'], [SOUTH[0], -60.0], [SOUTH[1], -5.0], '2000-01-01', '2020-12-31'
+        )
+        self.assertEqual(skipped, {})
+
+    def test_unknown_collection_is_kept(self):
+        """Collections without description are always requested."""
+        kept, _ = self.index.filter(['other'], *SOUTH, '2000-01-01', '2020-12-31')
+        self.assertEqual(kept, ['other'])
+
+    def test_skipped_collections_are_not_requested(self):
+        """The controls request only the described collections covering the point."""
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS', FakeWLTS), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls()
+        for collection in COLLECTIONS:
+            controls.description(collection['name'])
+        result = controls.getTrajectory(*SOUTH, ['prodes_amazonia_legal', 'mapbiomas-v9'], '2000-01-01', '2020-12-31')
+        self.assertEqual(controls.wlts.requests, ['mapbiomas-v9'])
+        self.assertEqual(list(result.skipped), ['prodes_amazonia_legal'])
+
+        controls.getTrajectory(*SOUTH, ['prodes_amazonia_legal'], '2000-01-01', '2020-12-31')
+        self.assertEqual(len(controls.wlts.requests), 1)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CoverageIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,164 @@
+# coding=utf-8
+"""Local raster trajectory engine test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+from osgeo import gdal, osr
+
+from wlts_plugin.controller.raster_engine import LocalTrajectoryEngine
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+#: Pixel size, in degrees, of the test rasters
+PIXEL = 0.01
+
+
+def write_raster(path, bands, nodata=0):
+    """Write the arrays as the bands of a tiled GeoTIFF in EPSG:4326 at (-60, -5)."""
+    height, width = bands[0].shape
+    dataset = gdal.GetDriverByName('GTiff').Create(
+        path, width, height, len(bands), gdal.GDT_Byte,
+        options=['TILED=YES', 'BLOCKXSIZE=16', 'BLOCKYSIZE=16']
+    )
+    dataset.SetGeoTransform((-60.0, PIXEL, 0, -5.0, 0, -PIXEL))
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    dataset.SetProjection(srs.ExportToWkt())
+    for number, array in enumerate(bands, start=1):
+        band = dataset.GetRasterBand(number)
+        band.SetNoDataValue(nodata)
+        band.WriteArray(array)
+    dataset.FlushCache()
+
+
+def center(column, row):
+    """Return the longitude and latitude of a pixel center."""
+    return -60.0 + (column + 0.5) * PIXEL, -5.0 - (row + 0.5) * PIXEL
+
+
+class LocalTrajectoryEngineTest(unittest.TestCase):
+    """Test the trajectories read from local rasters."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.folder = tempfile.mkdtemp()
+        self.first = np.arange(64 * 48, dtype=np.uint8).reshape(48, 64) % 3 + 1
+        self.second = self.first.copy()
+        self.second[10, 20] = 0
+        self.path = os.path.join(self.folder, 'classes.tif')
+        write_raster(self.path, [self.first, self.second])
+        self.engine = LocalTrajectoryEngine(max_blocks=4)
+        classes = {1: 'Forest', 2: 'Pasture', 3: 'Water'}
+        self.engine.register('local', self.path, '2019', band=1, classes=classes)
+        self.engine.register('local', self.path, '2020', band=2)
+
+    def test_values_at_points(self):
+        """Each point reads the class of its pixel, in every block."""
+        pixels = [(0, 0), (20, 10), (63, 47), (17, 33)]
+        lon, lat = zip(*[center(column, row) for column, row in pixels])
+        rows = self.engine.rows(lon, lat, ['local'], '2000-01-01', '2020-12-31')
+        names = {1: 'Forest', 2: 'Pasture', 3: 'Water'}
+        for point, (column, row) in zip(rows, pixels):
+            self.assertEqual(point[0]['class'], names[self.first[row, column]])
+            self.assertEqual(point[0]['date'], '2019')
+        # The no data pixel has no row in 2020
+        self.assertEqual([r['date'] for r in rows[1]], ['2019'])
+        self.assertEqual([r['point_id'] for r in rows[3]], [4, 4])
+
+    def test_outside_raster_and_dates(self):
+        """Points outside the raster and dates outside the window have no rows."""
+        rows = self.engine.rows([-70.0, center(1, 1)[0]], [0.0, center(1, 1)[1]],
+                                ['local'], '2020-01-01', '2020-12-31')
+        self.assertEqual(rows[0], [])
+        self.assertEqual([r['date'] for r in rows[1]], ['2020'])
+
+    def test_blocks_are_cached(self):
+        """A second read of the same block does not read the file."""
+        lon, lat = center(2, 2)
+        self.engine.rows([lon], [lat], ['local'], '2019-01-01', '2019-12-31')
+        self.engine.rows([lon], [lat], ['local'], '2019-01-01', '2019-12-31')
+        self.assertEqual((self.engine.cache.misses, self.engine.cache.hits), (1, 1))
+
+    def test_load_json(self):
+        """Collections are registered from a JSON file with relative paths."""
+        file_name = os.path.join(self.folder, 'local_rasters.json')
+        with open(file_name, 'w') as f:
+            json.dump({'mapbiomas_local': {
+                'classes': {'1': 'Forest'},
+                'rasters': [{'path': 'classes.tif', 'date': '2021', 'band': 2}]
+            }}, f)
+        engine = LocalTrajectoryEngine()
+        engine.load(file_name)
+        self.assertIn('mapbiomas_local', engine)
+        trajectory = engine.trajectory(*center(0, 0), ['mapbiomas_local'], '2000-01-01', '2021-12-31')
+        self.assertEqual(trajectory['result']['trajectory'][0]['class'], 'Forest')
+
+    def test_save_json(self):
+        """The saved collections are loaded with the same classes and bands."""
+        file_name = os.path.join(self.folder, 'saved', 'local_rasters.json')
+        self.engine.save(file_name)
+        engine = LocalTrajectoryEngine()
+        engine.load(file_name)
+        lon, lat = center(20, 10)
+        rows = engine.rows([lon], [lat], ['local'], '2000-01-01', '2020-12-31')[0]
+        self.assertEqual(rows, self.engine.rows([lon], [lat], ['local'], '2000-01-01', '2020-12-31')[0])
+        self.assertEqual(engine.collections['local']['classes'][3], 'Water')
+
+    def test_register_paletted_layer(self):
+        """A layer is registered with the labels of its palette."""
+        layer = mock.Mock()
+        layer.source.return_value = self.path
+        layer.renderer.return_value.classes.return_value = [
+            mock.Mock(value=1, label='Forest'), mock.Mock(value=2, label='')
+        ]
+        engine = LocalTrajectoryEngine()
+        engine.registerLayer('layer', layer, '2019')
+        self.assertEqual(engine.collections['layer']['classes'], {1: 'Forest'})
+
+    def test_projected_reads_from_threads(self):
+        """Points are read from many threads in a projected raster."""
+        path = os.path.join(self.folder, 'projected.tif')
+        gdal.Warp(path, self.path, dstSRS='EPSG:3857')
+        engine = LocalTrajectoryEngine()
+        engine.register('projected', path, '2019')
+        lon, lat = zip(*[center(column, row) for column in range(5, 60, 5) for row in range(5, 45, 5)])
+        expected = engine.rows(lon, lat, ['projected'], '2000-01-01', '2020-12-31')
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(
+                lambda _: engine.rows(lon, lat, ['projected'], '2000-01-01', '2020-12-31'), range(32)
+            ))
+        self.assertTrue(all(result == expected for result in results))
+
+    def test_controls_read_local_collections(self):
+        """Local collections are not requested to the service."""
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS') as service, \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls()
+        controls.local = self.engine
+        lon, lat = zip(center(0, 0), center(5, 5))
+        df = controls.getTrajectory(list(lon), list(lat), ['local'], '2000-01-01', '2020-12-31').df()
+        service.return_value.tj.assert_not_called()
+        self.assertEqual(sorted(df.columns), ['class', 'collection', 'date', 'point_id'])
+        self.assertEqual(list(df.point_id), [1, 1, 2, 2])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(LocalTrajectoryEngineTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,112 @@
+# coding=utf-8
+"""Offline area package test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from wlts_plugin.controller.area_package import (AreaPackage, decodeRuns,
+                                                 encodeRuns)
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+
+def class_at(lon, lat, year, version=0):
+    """Return a class that changes by cell and every few years."""
+    return f"class-{(int(lon * 100) + int(lat * 100) + year // 4 + version) % 3}"
+
+
+class FakeControls:
+    """Answer the cell centers trajectories and count the points."""
+
+    def __init__(self, version=0):
+        self.version = version
+        self.points = 0
+
+    def getTrajectories(self, lon, lat, collections, start_date, end_date, workers=None):
+        self.points += len(lon)
+        return {'trajectories': [
+            {'result': {'trajectory': [
+                {'class': class_at(x, y, year, self.version), 'collection': collection, 'date': str(year)}
+                for collection in collections for year in range(2000, 2011)
+            ]}}
+            for x, y in zip(lon, lat)
+        ]}
+
+
+class AreaPackageTest(unittest.TestCase):
+    """Test the trajectories answered from the area tiles."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.path = os.path.join(tempfile.mkdtemp(), 'areas', 'area.sqlite')
+        self.area = AreaPackage.create(
+            self.path, (-52.0, -4.0, -51.9, -3.95), 0.01, ['a', 'b'],
+            '2000-01-01', '2010-12-31', tile_size=4
+        )
+
+    def test_runs(self):
+        """Run-length encoding keeps the sequence."""
+        values = [0, 0, 0, 1, -1, -1, 0]
+        self.assertEqual(encodeRuns(values), [0, 3, 1, 1, -1, 2, 0, 1])
+        self.assertEqual(decodeRuns(encodeRuns(values)), values)
+
+    def test_tiles(self):
+        """The area of 10 x 5 cells has 3 x 2 tiles of 4 cells."""
+        self.assertEqual(len(self.area.tiles()), 6)
+        self.assertEqual(len(self.area.cells((2, 1))), 2)
+        self.assertIsNone(self.area.tileOf(-50.0, -4.0))
+
+    def test_rows_of_cell(self):
+        """A point gets the trajectory of its cell center."""
+        self.area.build(FakeControls())
+        lon, lat = -51.9345, -3.9612
+        center = self.area.center(*self.area.cellOf(lon, lat))
+        rows = AreaPackage(self.path).rows(lon, lat, ['b'], '2005-01-01', '2010-12-31')
+        self.assertEqual([row['date'] for row in rows], [str(year) for year in range(2005, 2011)])
+        self.assertEqual([row['class'] for row in rows], [class_at(*center, year) for year in range(2005, 2011)])
+        self.assertIsNone(self.area.rows(lon, lat, ['c'], '2005-01-01', '2010-12-31'))
+        self.assertIsNone(self.area.rows(lon, lat, ['a'], '1990-01-01', '2010-12-31'))
+
+    def test_incremental_build(self):
+        """Only the missing tiles are built, and a tile can be built again."""
+        controls = FakeControls()
+        self.area.build(controls, tiles=[(0, 0)])
+        self.assertEqual(controls.points, 16)
+        self.assertIsNone(self.area.rows(-51.91, -3.96, ['a'], '2000-01-01', '2010-12-31'))
+        self.area.build(controls)
+        self.assertEqual(controls.points, 50)
+        self.assertEqual(self.area.missingTiles(), [])
+
+        self.area.rows(-51.995, -3.995, ['a'], '2000-01-01', '2010-12-31')
+        self.area.build(FakeControls(version=1), tiles=[(0, 0)])
+        rows = self.area.rows(-51.995, -3.995, ['a'], '2000-01-01', '2010-12-31')
+        self.assertEqual(rows[0]['class'], class_at(-51.995, -3.995, 2000, 1))
+
+    def test_controls_answer_from_area(self):
+        """Points inside a built area are not requested to the service."""
+        self.area.build(FakeControls())
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS') as service, \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls()
+        controls.addArea(self.path)
+        result = controls.getTrajectory(-51.95, -3.97, ['a'], '2000-01-01', '2010-12-31')
+        service.return_value.tj.assert_not_called()
+        self.assertEqual(len(result.trajectory['result']['trajectory']), 11)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(AreaPackageTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
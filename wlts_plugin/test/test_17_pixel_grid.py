@@ -0,0 +1,163 @@
+# coding=utf-8
+"""Collections pixel grid test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+from unittest import mock
+
+from osgeo import osr
+
+from wlts_plugin.config import Config
+from wlts_plugin.controller.pixel_grid import PixelGrid
+from wlts_plugin.controller.trajectory_cache import TrajectoryCache
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+EXTENT = {'xmin': -74.0, 'ymin': -34.0, 'xmax': -28.0, 'ymax': 6.0}
+
+#: The BDC Albers equal area projection of the Brazil data cubes
+ALBERS = '+proj=aea +lat_0=-12 +lon_0=-54 +lat_1=-2 +lat_2=-22 +x_0=5000000 +y_0=10000000 +ellps=GRS80 +units=m +no_defs'
+
+DESCRIPTIONS = {
+    'gridded': {
+        'collection_type': 'Image', 'resolution_unit': {'unit': 'degree', 'value': 0.00025},
+        'spatial_extent': EXTENT,
+        'grid': {'crs': 'EPSG:4326', 'origin': [-74.0, 6.0], 'pixel_size': [0.00025, 0.00025]}
+    },
+    'albers': {
+        'collection_type': 'Image', 'resolution_unit': {'unit': 'meter', 'value': 30},
+        'spatial_extent': EXTENT,
+        'grid': {'crs': ALBERS, 'origin': [2800000.0, 11000000.0], 'pixel_size': [30, 30]}
+    },
+    'fine': {'collection_type': 'Image', 'resolution_unit': {'unit': 'meter', 'value': 30}, 'spatial_extent': EXTENT},
+    'coarse': {'collection_type': 'Image', 'resolution_unit': {'unit': 'degree', 'value': 0.01}, 'spatial_extent': EXTENT},
+    'vector': {'collection_type': 'Feature', 'resolution_unit': {'unit': 'meter', 'value': 30}, 'spatial_extent': EXTENT}
+}
+
+
+class FakeWLTS:
+    """Describe the test collections and record the requested points."""
+
+    def __init__(self, *args, **kwargs):
+        self.requests = []
+
+    def __getitem__(self, name):
+        return dict(DESCRIPTIONS[name], name=name)
+
+    def tj(self, longitude, latitude, collections, start_date, end_date):
+        self.requests.append((longitude, latitude, collections))
+        return {'result': {'trajectory': [
+            {'class': 'Forest', 'collection': name, 'date': '2020', 'point_id': 1}
+            for name in collections.split(',')
+        ]}}
+
+
+class PixelGridTest(unittest.TestCase):
+    """Test the points are moved to the pixel centers of the published grids."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.grid = PixelGrid()
+        for name, description in DESCRIPTIONS.items():
+            self.grid.add(name, description)
+
+    def test_published_grid_center(self):
+        """Points in a pixel of a published grid are requested at its center."""
+        size = 0.00025
+        lon, lat = -74.0 + 100000.2 * size, 6.0 - 50000.3 * size
+        center = self.grid.snap('gridded', lon, lat)
+        self.assertEqual(self.grid.snap('gridded', lon + size / 4, lat - size / 4), center)
+        self.assertAlmostEqual(center[0], -74.0 + 100000.5 * size, places=7)
+        self.assertAlmostEqual(center[1], 6.0 - 50000.5 * size, places=7)
+        self.assertNotEqual(self.grid.snap('gridded', lon + size, lat), center)
+
+    def test_projected_grid_center(self):
+        """The pixels of a projected grid are found in its CRS."""
+        albers = osr.SpatialReference()
+        albers.SetFromUserInput(ALBERS)
+        albers.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        wgs84 = osr.SpatialReference()
+        wgs84.ImportFromEPSG(4326)
+        wgs84.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        forward = osr.CoordinateTransformation(wgs84, albers)
+        inverse = osr.CoordinateTransformation(albers, wgs84)
+        column, row = 70000, 40000
+        x, y = 2800000.0 + (column + 0.1) * 30, 11000000.0 - (row + 0.2) * 30
+        for dx, dy in ((0, 0), (20, -20), (25, -15)):
+            point = self.grid.snap('albers', *inverse.TransformPoint(x + dx, y + dy)[:2])
+            # The requested point is the pixel center, in the projected grid
+            px, py = forward.TransformPoint(*point)[:2]
+            self.assertAlmostEqual(px, 2800000.0 + (column + 0.5) * 30, delta=1)
+            self.assertAlmostEqual(py, 11000000.0 - (row + 0.5) * 30, delta=1)
+
+    def test_not_snapped(self):
+        """Collections without a published grid keep the point."""
+        for name in ('fine', 'coarse', 'vector', 'other'):
+            self.assertEqual(self.grid.snap(name, -54.123456789, -12.5), (-54.123456789, -12.5))
+
+    def test_pixel_key(self):
+        """Only points in the same pixels of published grids share a key."""
+        size = 0.00025
+        lon, lat = -54.0 + 0.2 * size, -12.0 - 0.3 * size
+        key = self.grid.key(lon, lat, ['gridded', 'albers'])
+        self.assertEqual(self.grid.key(lon + 1e-6, lat - 1e-6, ['albers', 'gridded']), key)
+        self.assertNotEqual(self.grid.key(lon + size, lat, ['gridded', 'albers']), key)
+        self.assertIsNone(self.grid.key(lon, lat, ['gridded', 'fine']))
+        self.assertIsNone(self.grid.key(lon, lat, []))
+
+    def controls(self):
+        """Return controls with a cache and the described collections."""
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS', FakeWLTS), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls(cache=TrajectoryCache())
+        for name in ('gridded', 'fine'):
+            controls.description(name)
+        return controls
+
+    def test_neighbours_share_request(self):
+        """Two clicks in the same pixel of a published grid send one request, at its center."""
+        clicks = [(-54.00001, -12.00001), (-54.00022, -12.00018)]
+        with mock.patch.object(Config, 'SNAP_TO_PIXEL', True):
+            controls = self.controls()
+        first, second = [controls.queryKey(*click, ['gridded'], '2000-01-01', '2020-12-31') for click in clicks]
+        self.assertEqual(first, second)
+        for click in clicks:
+            controls.getTrajectory(*click, ['gridded'], '2000-01-01', '2020-12-31')
+        self.assertEqual(controls.wlts.requests, [(-54.000125, -12.000125, 'gridded')])
+        self.assertTrue(controls.cache.contains(first))
+        self.assertEqual(controls.pixelKey(*clicks[0], ['gridded']), controls.pixelKey(*clicks[1], ['gridded']))
+
+    def test_without_grid_not_shared(self):
+        """Close clicks are different queries when the pixels are not known."""
+        clicks = [(-54.00001, -12.00001), (-54.00002, -12.00002)]
+        with mock.patch.object(Config, 'SNAP_TO_PIXEL', True):
+            controls = self.controls()
+        for click in clicks:
+            controls.getTrajectory(*click, ['fine'], '2000-01-01', '2020-12-31')
+        self.assertEqual([request[:2] for request in controls.wlts.requests], clicks)
+        self.assertIsNone(controls.pixelKey(*clicks[0], ['gridded', 'fine']))
+
+    def test_disabled_by_default(self):
+        """Without WLTS_SNAP_TO_PIXEL the clicked points are requested and cached."""
+        with mock.patch.object(Config, 'SNAP_TO_PIXEL', False):
+            controls = self.controls()
+        clicks = [(-54.00001, -12.00001), (-54.00002, -12.00002)]
+        for click in clicks:
+            controls.getTrajectory(*click, ['gridded'], '2000-01-01', '2020-12-31')
+        self.assertEqual([request[:2] for request in controls.wlts.requests], clicks)
+        self.assertIsNone(controls.pixelKey(*clicks[0], ['gridded']))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(PixelGridTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
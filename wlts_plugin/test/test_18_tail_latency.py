@@ -0,0 +1,238 @@
+# coding=utf-8
+"""Hedged requests and circuit breakers test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from wlts_plugin.controller.rate_limiter import (Deadline, DeadlineExceeded,
+                                                 RateLimiter, deadline)
+from wlts_plugin.controller.tail_latency import (CircuitBreaker,
+                                                 CircuitOpenError,
+                                                 LatencyHistogram, TailLatency,
+                                                 serviceFailure)
+
+
+def http_error(status):
+    """Build an error like the ones raised by the HTTP client."""
+    error = Exception(f'HTTP {status}')
+    error.response = SimpleNamespace(status_code=status, headers={})
+    return error
+
+
+class TailLatencyTest(unittest.TestCase):
+    """Test the latency histograms, the hedged requests and the circuits."""
+
+    def warm(self, tail, collection, seconds=0.01, count=40):
+        """Record the usual latency of a collection."""
+        for _ in range(count):
+            tail._record([collection], seconds)
+
+    def test_histogram_quantile(self):
+        """Test a quantile is read within the bucket error."""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.quantile(0.95))
+        for index in range(100):
+            histogram.record(0.1 if index < 90 else 2.0)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.1, delta=0.1 * 0.2)
+        self.assertAlmostEqual(histogram.quantile(0.95), 2.0, delta=2.0 * 0.2)
+
+    def test_histogram_window(self):
+        """Test old measures fade out of the histogram."""
+        histogram = LatencyHistogram(window=100)
+        for _ in range(99):
+            histogram.record(5.0)
+        for _ in range(400):
+            histogram.record(0.05)
+        self.assertLess(histogram.quantile(0.95), 0.1)
+
+    def test_slow_request_is_hedged(self):
+        """Test a request slower than the p95 is sent again and the first answer used."""
+        tail = TailLatency(timeout=5)
+        tail.requests = 100
+        self.warm(tail, 'a')
+        calls = []
+
+        def request():
+            calls.append(1)
+            # Only the first request is stuck
+            if len(calls) == 1:
+                time.sleep(2)
+                return 'late'
+            return 'trajectory'
+
+        begin = time.monotonic()
+        self.assertEqual(tail.call(['a'], request), 'trajectory')
+        self.assertLess(time.monotonic() - begin, 1)
+        self.assertEqual(len(calls), 2)
+
+    def test_hedge_budget(self):
+        """Test at most a fraction of the requests are hedged."""
+        tail = TailLatency(timeout=5)
+        self.warm(tail, 'a')
+        calls = []
+
+        def request():
+            calls.append(1)
+            time.sleep(0.05)
+
+        for _ in range(5):
+            tail.call(['a'], request)
+        self.assertEqual(len(calls), 5)
+
+    def test_timeout(self):
+        """Test a request without answer fails after the timeout."""
+        tail = TailLatency(timeout=0.1, hedge=False)
+        release = threading.Event()
+        with self.assertRaises(TimeoutError):
+            tail.call(['a'], release.wait, 5)
+        release.set()
+
+    def test_circuit_opens_and_fails_fast(self):
+        """Test a collection failing repeatedly is refused without requests."""
+        tail = TailLatency(failures=2, cooldown=60)
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise http_error(502)
+
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                tail.call(['a', 'b'], request)
+        with self.assertRaises(CircuitOpenError) as context:
+            tail.call(['b'], request)
+        self.assertEqual(context.exception.collections, ['b'])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(set(tail.reasons(['a', 'b', 'c'])), {'a', 'b'})
+
+    def test_client_errors_do_not_open(self):
+        """Test an answer refusing the query is not a failure of the collection."""
+        tail = TailLatency(failures=1)
+
+        def request():
+            raise http_error(404)
+
+        with self.assertRaises(Exception):
+            tail.call(['a'], request)
+        self.assertEqual(tail.reasons(['a']), {})
+
+    def test_service_failures(self):
+        """Test only transport errors, 5xx and throttling are failures of the server."""
+        self.assertTrue(serviceFailure(http_error(502)))
+        self.assertTrue(serviceFailure(http_error(429)))
+        self.assertTrue(serviceFailure(ConnectionError('reset')))
+        self.assertTrue(serviceFailure(TimeoutError('no answer')))
+        self.assertFalse(serviceFailure(http_error(404)))
+        self.assertFalse(serviceFailure(ValueError('bad date')))
+        self.assertFalse(serviceFailure(DeadlineExceeded('not sent')))
+
+    def test_client_errors_do_not_open_circuit(self):
+        """Test an error raised before the request is sent does not open the circuit."""
+        tail = TailLatency(failures=1)
+
+        def request():
+            raise ValueError('bad query')
+
+        with self.assertRaises(ValueError):
+            tail.call(['a'], request)
+        self.assertEqual(tail.reasons(['a']), {})
+
+    def test_bounded_threads(self):
+        """Test the requests run in a bounded pool of threads."""
+        tail = TailLatency(hedge=False, workers=2)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        threads = [threading.Thread(target=tail.call, args=(['a'], request)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(peak), 6)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_timed_out_attempt_releases_slot(self):
+        """Test an attempt waiting for a limiter slot gives it up at the deadline."""
+        limiter = RateLimiter(max_rps=100, max_in_flight=1)
+        tail = TailLatency(timeout=0.2, hedge=False, failures=1)
+        release = threading.Event()
+        busy = threading.Thread(target=limiter.call, args=(release.wait, 5))
+        busy.start()
+        time.sleep(0.05)
+        calls = []
+        with self.assertRaises(DeadlineExceeded):
+            tail.call(['a'], limiter.call, calls.append, 1)
+        # The queued request is not sent once the slot is free
+        release.set()
+        busy.join()
+        time.sleep(0.1)
+        self.assertEqual(calls, [])
+        self.assertEqual(limiter.waiting, [])
+        self.assertEqual(tail.reasons(['a']), {})
+
+    def test_cancelled_caller(self):
+        """Test an attempt of a cancelled caller is not sent and is not a failure."""
+        limiter = RateLimiter(max_rps=100, max_in_flight=1)
+        tail = TailLatency(timeout=5, hedge=False, failures=1)
+        caller = Deadline(5)
+        errors, calls = [], []
+
+        def request():
+            with deadline(caller):
+                try:
+                    tail.call(['a'], limiter.call, calls.append, 1)
+                except DeadlineExceeded as error:
+                    errors.append(error)
+
+        with limiter.slot():
+            thread = threading.Thread(target=request)
+            thread.start()
+            while not limiter.waiting:
+                time.sleep(0.01)
+            caller.cancel()
+        thread.join(5)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(calls, [])
+        self.assertEqual(tail.reasons(['a']), {})
+
+    def test_circuit_trial(self):
+        """Test an open circuit lets a single trial through after the cooldown."""
+        breaker = CircuitBreaker(failures=1, cooldown=10)
+        breaker.failure(now=100)
+        self.assertFalse(breaker.allow(now=105))
+        self.assertTrue(breaker.allow(now=111))
+        self.assertFalse(breaker.allow(now=112))
+        breaker.failure(now=112)
+        self.assertTrue(breaker.isOpen(now=121))
+        self.assertTrue(breaker.allow(now=123))
+        breaker.success()
+        self.assertTrue(breaker.allow(now=123))
+        self.assertFalse(breaker.isOpen(now=123))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TailLatencyTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
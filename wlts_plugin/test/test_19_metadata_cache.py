@@ -0,0 +1,136 @@
+# coding=utf-8
+"""Metadata revalidation test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from wlts_plugin.config import Config
+from wlts_plugin.controller.metadata_cache import MetadataCache
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+from wlts_plugin.test.stub_server import StubServer
+
+
+class MetadataCacheTest(unittest.TestCase):
+    """Test the documents are downloaded again only when they change."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.folder.name) / 'metadata.sqlite')
+        self.server = StubServer().start()
+        self.url = f'{self.server.wlts_url}describe_collection'
+
+    def tearDown(self):
+        self.server.stop()
+        self.folder.cleanup()
+
+    def test_not_modified_is_a_hit(self):
+        """Test a revalidated document is answered with 304 and kept."""
+        cache = MetadataCache(self.path, max_age=0)
+        first = cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'})
+        second = cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'})
+        self.assertEqual(first, second)
+        self.assertEqual((cache.downloads, cache.revalidated), (1, 1))
+        self.assertEqual(self.server.stats['status'][304], 1)
+
+    def test_fresh_document_is_not_requested(self):
+        """Test a document is used without requests during its max age."""
+        cache = MetadataCache(self.path, max_age=60)
+        cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'})
+        cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'})
+        self.assertEqual(self.server.stats['requests'], 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_changed_document_is_downloaded(self):
+        """Test a document changed in the server replaces the saved one."""
+        cache = MetadataCache(self.path, max_age=0)
+        cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'})
+        self.server.httpd.data.collections['mapbiomas-v9'] = dict(
+            self.server.httpd.data.collections['mapbiomas-v9'], title='MapBiomas v10'
+        )
+        document = cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'})
+        self.assertEqual(document['title'], 'MapBiomas v10')
+        self.assertEqual(cache.downloads, 2)
+
+    def test_saved_across_sessions(self):
+        """Test a new session revalidates the documents saved by the previous one."""
+        MetadataCache(self.path, max_age=0).fetch(f'{self.server.wlts_url}list_collections')
+        cache = MetadataCache(self.path, max_age=0)
+        collections = cache.fetch(f'{self.server.wlts_url}list_collections')
+        self.assertIn('mapbiomas-v9', collections['collections'])
+        self.assertEqual(cache.downloads, 0)
+
+    def test_built_value(self):
+        """Test a value built from a document is built again only when it changes."""
+        cache = MetadataCache(self.path, max_age=0)
+        built = []
+
+        def build(document):
+            built.append(document['name'])
+            return {'name': document['name']}
+
+        for _ in range(3):
+            value = cache.fetch(self.url, {'collection_id': 'mapbiomas-v9'}, build=build)
+        self.assertEqual(value, {'name': 'mapbiomas-v9'})
+        self.assertEqual(built, ['mapbiomas-v9'])
+
+    def test_controls_descriptions(self):
+        """Test the controls read the collections and descriptions through the cache."""
+        with mock.patch.object(Config, 'WLTS_HOST', self.server.wlts_url), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS'), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls(metadata=MetadataCache(self.path, max_age=0))
+            names = controls.listCollections()
+            for name in names:
+                controls.description(name)
+            self.server.httpd.reset_stats()
+            for name in controls.listCollections():
+                controls.description(name)
+        self.assertEqual(self.server.stats['status'][304], len(names) + 1)
+        self.assertEqual(self.server.stats['status'][200], 0)
+
+    def test_controls_palette(self):
+        """Test the colors are built from the revalidated styled classes."""
+        with mock.patch.object(Config, 'WLTS_HOST', self.server.wlts_url), \
+                mock.patch.object(Config, 'LCCS_HOST', self.server.lccs_url), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS'), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls(metadata=MetadataCache(self.path, max_age=0))
+            controls.lccs_service = SimpleNamespace(_access_token='secret', _language=None)
+            system_id = controls.description('mapbiomas-v9')['classification_system']['id']
+            classes = self.server.httpd.data.system(str(system_id))['classes']
+            with mock.patch.object(controls.metadata.session, 'get',
+                                   wraps=controls.metadata.session.get) as get:
+                palette = controls.palette(['mapbiomas-v9'])
+            self.assertEqual(palette, {cv['title']: cv['color'] for cv in classes})
+            self.assertEqual(
+                [call.kwargs['headers'].get('x-api-key') for call in get.call_args_list
+                 if call.args[0].startswith(self.server.lccs_url)],
+                ['secret', 'secret']
+            )
+            self.server.httpd.reset_stats()
+            controls.palette(['mapbiomas-v9'])
+            self.assertEqual(self.server.stats['status'][200], 0)
+            classes[0] = dict(classes[0], color='#000000')
+            palette = controls.palette(['mapbiomas-v9'])
+        self.assertEqual(palette[classes[0]['title']], '#000000')
+        self.assertEqual(self.server.stats['status'][200], 1)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MetadataCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
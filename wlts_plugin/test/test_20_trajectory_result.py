@@ -0,0 +1,95 @@
+# coding=utf-8
+"""Trajectory result test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+
+from wlts_plugin.controller.trajectory_result import TrajectoryResult
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+
+class FakeTrajectory(dict):
+    """A trajectory response counting its dataframe builds."""
+
+    builds = 0
+
+    def df(self):
+        FakeTrajectory.builds += 1
+        return pd.DataFrame(self['result']['trajectory'])
+
+
+class FakeWLTS:
+    """Answer a trajectory with the requested longitude as class, slowly."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def tj(self, longitude, latitude, collections, start_date, end_date):
+        time.sleep(0.01)
+        return FakeTrajectory({'result': {'trajectory': [
+            {'class': str(longitude), 'collection': collections, 'date': '2000', 'point_id': 1}
+        ]}})
+
+
+class TrajectoryResultTest(unittest.TestCase):
+    """Test the results of the queries are independent and read-only."""
+
+    def setUp(self):
+        self.trajectory = FakeTrajectory({'result': {'trajectory': [
+            {'class': 'Forest', 'collection': 'a', 'date': '2000', 'point_id': 1}
+        ]}})
+        FakeTrajectory.builds = 0
+
+    def test_read_only(self):
+        """Test a result can not be changed."""
+        result = TrajectoryResult(self.trajectory, {'collections': ('a', 'b')}, {'b': 'outside'})
+        with self.assertRaises(AttributeError):
+            result.trajectory = None
+        with self.assertRaises(TypeError):
+            result.skipped['a'] = 'outside'
+        self.assertEqual(result.collections, ['a'])
+        self.assertFalse(result.empty)
+
+    def test_dataframe_copies(self):
+        """Test the dataframe is built once and each caller gets a copy."""
+        result = TrajectoryResult(self.trajectory)
+        result.df()['class'] = 'Pasture'
+        self.assertEqual(list(result.df()['class']), ['Forest'])
+        self.assertEqual(FakeTrajectory.builds, 1)
+
+    def test_concurrent_queries(self):
+        """Test the controls answer queries of many threads with their own results."""
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS', FakeWLTS), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            controls = WLTS_Controls()
+        points = [-50.0 - index for index in range(8)]
+
+        def query(lon):
+            return lon, controls.getTrajectory(lon, -10.0, ['a'], '2000-01-01', '2000-12-31')
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(query, points))
+        for lon, result in results:
+            self.assertEqual(result.query['longitude'], lon)
+            self.assertEqual(list(result.df()['class']), [str(lon)])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TrajectoryResultTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
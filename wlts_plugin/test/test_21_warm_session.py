@@ -0,0 +1,120 @@
+# coding=utf-8
+"""Warm session test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from wlts_plugin.config import Config
+from wlts_plugin.controller.coverage_index import CoverageIndex
+from wlts_plugin.controller.raster_engine import LocalTrajectoryEngine
+from wlts_plugin.controller.trajectory_cache import TrajectoryCache
+from wlts_plugin.test.utilities import get_qgis_app
+from wlts_plugin.wlts_qgis import WLTSQgis
+
+QGIS_APP, _, IFACE, _ = get_qgis_app()
+
+
+class FakeControls:
+    """List the collections of the test and count the descriptions."""
+
+    collections = ['mapbiomas-v9', 'prodes_amazonia_legal']
+    built = 0
+
+    def __init__(self, cache=None, metadata=None):
+        FakeControls.built += 1
+        self.cache = cache
+        self.described = []
+        self.local = LocalTrajectoryEngine()
+        self.coverage = CoverageIndex()
+        self.areas = []
+        self.renderer = mock.Mock()
+        self.renderer.nbytes.return_value = 0
+
+    queryKey = staticmethod(TrajectoryCache.key)
+
+    def listCollections(self):
+        return list(FakeControls.collections)
+
+    def description(self, name):
+        self.described.append(name)
+        return {'name': name, 'title': name.upper()}
+
+
+class WarmSessionTest(unittest.TestCase):
+    """Test the dialog is kept and refreshed when the plugin is opened again."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        folder = Path(self.folder.name)
+        FakeControls.collections = ['mapbiomas-v9', 'prodes_amazonia_legal']
+        FakeControls.built = 0
+        self.patches = [
+            mock.patch.object(Config, 'CACHE_FILE', str(folder / 'trajectories.sqlite')),
+            mock.patch.object(Config, 'METADATA_FILE', str(folder / 'metadata.sqlite')),
+            mock.patch.object(Config, 'HISTORY_FILE', str(folder / 'history.sqlite')),
+            mock.patch('wlts_plugin.wlts_qgis.WLTS_Controls', FakeControls)
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.plugin = WLTSQgis(IFACE)
+
+    def tearDown(self):
+        if self.plugin.dlg is not None:
+            self.plugin.prefetcher.shutdown()
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.folder.cleanup()
+
+    def reopen(self):
+        """Close the dialog and run the plugin again."""
+        self.plugin.dlg.close()
+        self.plugin.run()
+
+    def test_dialog_is_kept(self):
+        """Test the dialog, its controls and its selection are reused."""
+        self.plugin.run()
+        dialog = self.plugin.dlg
+        self.plugin.checks['prodes_amazonia_legal'].setChecked(False)
+        self.reopen()
+        self.assertIs(self.plugin.dlg, dialog)
+        self.assertEqual(FakeControls.built, 1)
+        self.assertFalse(self.plugin.checks['prodes_amazonia_legal'].isChecked())
+        self.assertEqual(self.plugin.wlts_controls.described, FakeControls.collections)
+
+    def test_collections_are_refreshed(self):
+        """Test only the new collections are described when reopening."""
+        self.plugin.run()
+        FakeControls.collections = ['ibge_cobertura_uso_terra', 'mapbiomas-v9']
+        self.reopen()
+        self.assertEqual(list(self.plugin.checks), ['mapbiomas-v9', 'ibge_cobertura_uso_terra'])
+        self.assertEqual(self.plugin.wlts_controls.described[-1], 'ibge_cobertura_uso_terra')
+        self.assertEqual(self.plugin.vbox.itemAt(0).widget(), self.plugin.checks['ibge_cobertura_uso_terra'])
+        self.assertEqual(self.plugin.selection.collections, ['ibge_cobertura_uso_terra', 'mapbiomas-v9'])
+
+    def test_cold_session(self):
+        """Test the dialog is built again when the warm session is disabled."""
+        with mock.patch.object(Config, 'WARM_SESSION', False):
+            self.plugin.run()
+            dialog = self.plugin.dlg
+            self.reopen()
+        self.assertIsNot(self.plugin.dlg, dialog)
+        self.assertEqual(FakeControls.built, 2)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(WarmSessionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,113 @@
+# coding=utf-8
+"""Session memory budget test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+
+import numpy as np
+
+from wlts_plugin.controller.raster_engine import BlockCache
+from wlts_plugin.controller.session_resources import (SessionResources,
+                                                      formatBytes)
+
+
+class Resource:
+    """A resource of a given size, empty once released."""
+
+    def __init__(self, size):
+        self.size = size
+        self.released = 0
+
+    def nbytes(self):
+        return self.size
+
+    def release(self):
+        self.size = 0
+        self.released += 1
+
+
+class SessionResourcesTest(unittest.TestCase):
+    """Test the resources are released by least recent use above the budget."""
+
+    def setUp(self):
+        self.resources = SessionResources(budget=100)
+        self.tracked = {}
+        for name in ('chart', 'blocks', 'layers'):
+            self.tracked[name] = Resource(40)
+            self.resources.add(name, self.tracked[name].nbytes, self.tracked[name].release)
+
+    def test_usage(self):
+        """Test the usage lists the most recently used resource first."""
+        self.resources.budget = 200
+        self.resources.touch('chart')
+        self.assertEqual(
+            self.resources.usage(),
+            [('chart', 40), ('layers', 40), ('blocks', 40)]
+        )
+        self.assertEqual(self.resources.total(), 120)
+
+    def test_least_recently_used_is_released(self):
+        """Test only the oldest resource is released to fit the budget."""
+        released = self.resources.touch('chart')
+        self.assertEqual(released, ['blocks'])
+        self.assertEqual(self.tracked['blocks'].released, 1)
+        self.assertEqual(self.tracked['layers'].released, 0)
+        self.assertEqual(self.resources.total(), 80)
+
+    def test_used_resources_are_kept(self):
+        """Test a resource being used is not released, even when it is the oldest."""
+        self.tracked['chart'].size = 150
+        released = self.resources.touch('blocks', 'chart')
+        self.assertEqual(self.tracked['chart'].released, 0)
+        self.assertEqual(released, ['layers'])
+
+    def test_in_budget(self):
+        """Test nothing is released within the budget."""
+        self.resources.budget = 120
+        self.assertEqual(self.resources.touch('blocks'), [])
+        self.assertEqual(self.resources.total(), 120)
+
+    def test_release_all(self):
+        """Test every resource is released, and stays tracked."""
+        self.resources.releaseAll()
+        self.assertEqual(self.resources.total(), 0)
+        self.assertTrue(all(resource.released == 1 for resource in self.tracked.values()))
+        self.assertEqual(len(self.resources.usage()), 3)
+
+    def test_remove(self):
+        """Test a removed resource is not released."""
+        self.resources.remove('chart')
+        self.resources.releaseAll()
+        self.assertEqual(self.tracked['chart'].released, 0)
+
+    def test_block_cache_bytes(self):
+        """Test the raster blocks memory is the size of their arrays."""
+        cache = BlockCache()
+        cache.get('a', lambda: np.zeros((16, 16), dtype=np.uint8))
+        cache.get('b', lambda: np.zeros((16, 16), dtype=np.int32))
+        self.assertEqual(cache.nbytes(), 16 * 16 * 5)
+        cache.clear()
+        self.assertEqual(cache.nbytes(), 0)
+
+    def test_format_bytes(self):
+        """Test the sizes are shown with their unit."""
+        self.assertEqual(formatBytes(512), '512 B')
+        self.assertEqual(formatBytes(1536), '1.5 KB')
+        self.assertEqual(formatBytes(512 * 2 ** 20), '512.0 MB')
+        self.assertEqual(formatBytes(3 * 2 ** 30), '3.0 GB')
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SessionResourcesTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
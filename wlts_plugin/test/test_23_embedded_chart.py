@@ -0,0 +1,75 @@
+# coding=utf-8
+"""Trajectory chart drawn on a reused figure test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+from unittest import mock
+
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from wlts_plugin.controller.trajectory_result import TrajectoryResult
+from wlts_plugin.controller.wlts_qgis_controller import WLTS_Controls
+
+
+class FakeTrajectory(dict):
+    """A trajectory response with its dataframe."""
+
+    def df(self):
+        return pd.DataFrame(self['result']['trajectory'])
+
+
+def result(classes):
+    """Return the result of a point with a class for each year."""
+    return TrajectoryResult(FakeTrajectory({'result': {'trajectory': [
+        {'class': name, 'collection': 'mapbiomas-v9', 'date': str(2000 + year), 'point_id': 1}
+        for year, name in enumerate(classes)
+    ]}}), {'collections': ('mapbiomas-v9',)})
+
+
+class EmbeddedChartTest(unittest.TestCase):
+    """Test the trajectories are drawn in place on an offscreen canvas."""
+
+    def setUp(self):
+        with mock.patch('wlts_plugin.controller.wlts_qgis_controller.WLTS'), \
+                mock.patch('wlts_plugin.controller.wlts_qgis_controller.lccs'):
+            self.controls = WLTS_Controls()
+        self.controls.palette = mock.Mock(return_value={'Forest': '#1f8d49', 'Pasture': '#edde8e'})
+        self.figure = Figure(figsize=(6, 3), dpi=50)
+        self.canvas = FigureCanvasAgg(self.figure)
+
+    def test_draw_on_figure(self):
+        """Test the given figure is drawn and returned."""
+        figure = self.controls.plotTrajectory(result(['Forest', 'Pasture']), figure=self.figure)
+        self.assertIs(figure, self.figure)
+        self.assertEqual(len(figure.axes), 1)
+        self.canvas.draw()
+        width, height = self.canvas.get_width_height()
+        self.assertEqual((width, height), (300, 150))
+        self.assertEqual(len(self.canvas.buffer_rgba()), height)
+
+    def test_redraw_in_place(self):
+        """Test a new search replaces the previous chart on the same figure."""
+        self.controls.plotTrajectory(result(['Forest', 'Pasture']), figure=self.figure)
+        self.controls.plotTrajectory(result(['Pasture'] * 3), figure=self.figure)
+        self.canvas.draw()
+        self.assertEqual(len(self.figure.axes), 1)
+        labels = [label.get_text() for label in self.figure.axes[0].get_xticklabels()]
+        self.assertEqual(labels, ['2000', '2001', '2002'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(EmbeddedChartTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
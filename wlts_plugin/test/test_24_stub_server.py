@@ -0,0 +1,110 @@
+# coding=utf-8
+"""Stub WLTS server behaviour test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import json
+import tempfile
+import time
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from wlts_plugin.test.stub_server import StubServer, replay
+
+TRAJECTORY = (
+    '/wlts/trajectory?longitude=-54.0&latitude=-12.0&collections=mapbiomas-v9'
+    '&start_date=2000-01-01&end_date=2002-12-31'
+)
+
+
+def get(server, path):
+    """Send a request to the stub and return its status and headers."""
+    try:
+        with urlopen(server.url + path) as response:
+            response.read()
+            return response.status, response.headers
+    except HTTPError as error:
+        return error.code, error.headers
+
+
+class StubServerTest(unittest.TestCase):
+    """Test the stub answers with the configured latency, errors and caps."""
+
+    def test_trajectory(self):
+        """Test a trajectory has a class for each year of the interval."""
+        with StubServer() as server:
+            with urlopen(server.url + TRAJECTORY) as response:
+                trajectory = json.load(response)['result']['trajectory']
+        self.assertEqual([row['date'] for row in trajectory], ['2000', '2001', '2002'])
+
+    def test_throughput_cap(self):
+        """Test the requests above the rate are answered with 429 and Retry-After."""
+        with StubServer(max_rps=2) as server:
+            answers = [get(server, '/wlts/list_collections') for _ in range(5)]
+            stats = server.stats
+        statuses = [status for status, _ in answers]
+        self.assertEqual(statuses[:2], [200, 200])
+        self.assertIn(429, statuses)
+        throttled = next(headers for status, headers in answers if status == 429)
+        self.assertGreaterEqual(int(throttled['Retry-After']), 1)
+        self.assertEqual(stats['status'][429], statuses.count(429))
+
+    def test_in_flight_cap(self):
+        """Test the concurrent requests above the cap are answered with 503."""
+        with StubServer(max_in_flight=1, latency=0.3) as server:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                statuses = list(executor.map(lambda _: get(server, TRAJECTORY)[0], range(3)))
+            stats = server.stats
+        self.assertEqual(Counter(statuses), {200: 1, 503: 2})
+        self.assertEqual(stats['peak_in_flight'], 1)
+
+    def test_error_rate(self):
+        """Test the fraction of failed requests follows the error rate."""
+        with StubServer(error_rate=1.0) as server:
+            self.assertEqual({get(server, TRAJECTORY)[0] for _ in range(5)}, {503})
+        with StubServer(error_rate=0.5, seed=1) as server:
+            statuses = Counter(get(server, TRAJECTORY)[0] for _ in range(40))
+        self.assertEqual(set(statuses), {200, 503})
+        self.assertTrue(10 <= statuses[503] <= 30)
+
+    def test_latency(self):
+        """Test every response waits for the latency."""
+        with StubServer(latency=0.2) as server:
+            begin = time.perf_counter()
+            get(server, '/wlts/list_collections')
+            self.assertGreaterEqual(time.perf_counter() - begin, 0.2)
+
+    def test_replay(self):
+        """Test a recorded load is sent with its pacing and summarized."""
+        with tempfile.TemporaryDirectory() as folder:
+            log_file = Path(folder) / 'load.jsonl'
+            log_file.write_text('\n'.join(json.dumps(entry) for entry in [
+                {'t': 0.0, 'path': '/wlts/list_collections'},
+                {'t': 0.4, 'path': TRAJECTORY},
+                {'t': 0.8, 'path': '/wlts/unknown'}
+            ]))
+            with StubServer() as server:
+                summary = replay(str(log_file), server.url, speed=2.0)
+        self.assertEqual(summary['requests'], 3)
+        self.assertEqual(summary['status'], {200: 2, 404: 1})
+        self.assertGreaterEqual(summary['elapsed'], 0.4)
+        self.assertLessEqual(summary['p50'], summary['p99'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(StubServerTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,151 @@
+# coding=utf-8
+"""Batch trajectories command line test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from wlts_plugin import cli
+from wlts_plugin.config import Config
+from wlts_plugin.controller.batch_jobs import JobManager
+from wlts_plugin.controller.rate_limiter import RateLimiter
+from wlts_plugin.test.stub_server import StubServer
+
+POINTS = [(-54.1, -12.1), (-54.2, -12.2), (-54.3, -12.3)]
+
+
+class CliTest(unittest.TestCase):
+    """Test the batch command line against the stub server."""
+
+    def setUp(self):
+        self.server = StubServer().start()
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name)
+        self.patches = [
+            mock.patch.object(Config, 'WLTS_HOST', self.server.wlts_url),
+            mock.patch.object(Config, 'LCCS_HOST', self.server.lccs_url),
+            mock.patch.object(Config, 'JOBS_DIR', str(self.path / 'jobs')),
+            mock.patch.object(Config, 'CACHE_FILE', str(self.path / 'trajectories.sqlite')),
+            mock.patch.object(Config, 'METADATA_FILE', str(self.path / 'metadata.sqlite')),
+            mock.patch.object(Config, 'AREAS_DIR', str(self.path / 'areas'))
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.points = self.path / 'points.csv'
+        self.points.write_text('id;lon;lat\n' + ''.join(
+            f'{index};{lon};{lat}\n' for index, (lon, lat) in enumerate(POINTS, start=1)
+        ))
+        self.output = self.path / 'trajectories.csv'
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.server.stop()
+        self.folder.cleanup()
+
+    def main(self, *argv):
+        """Run the command line, returning its exit code and messages."""
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            try:
+                code = cli.main([str(arg) for arg in argv])
+            except SystemExit as error:
+                code = error.code
+        return code, stderr.getvalue()
+
+    def trajectory_requests(self):
+        return self.server.stats['operations']['wlts/trajectory']
+
+    def test_new_job(self):
+        """Test the trajectories of every point are written with their coordinates."""
+        code, messages = self.main(
+            self.points, self.output, '--collections', 'mapbiomas-v9',
+            '--start-date', '2010-01-01', '--end-date', '2012-12-31', '--no-cache'
+        )
+        self.assertEqual(code, 0, messages)
+        df = pd.read_csv(self.output, sep=';')
+        self.assertEqual(sorted(df['point_id'].unique()), [1, 2, 3])
+        self.assertEqual(len(df), 9)
+        self.assertIn('3/3 points', messages)
+
+    def test_resume_job(self):
+        """Test a resumed job only requests its missing points."""
+        manager = JobManager()
+        job = manager.create(POINTS, ['mapbiomas-v9'], '2010-01-01', '2012-12-31')
+        job.append(1, [{'class': 'Forest', 'collection': 'mapbiomas-v9', 'date': '2010'}])
+        job.append(2, error='HTTPError: 503')
+        code, messages = self.main(self.output, '--resume', job.id, '--no-cache')
+        self.assertEqual(code, 0, messages)
+        self.assertEqual(self.trajectory_requests(), 2)
+        self.assertEqual(manager.load(job.id).progress(), (3, 3))
+        df = pd.read_csv(self.output, sep=';')
+        self.assertEqual(sorted(df['point_id'].unique()), [1, 2, 3])
+        self.assertEqual(list(df[df['point_id'] == 1]['class']), ['Forest'])
+
+    def test_failed_points(self):
+        """Test the failed points are reported with the job id to resume."""
+        arguments = [self.points, self.output, '--collections', 'mapbiomas-v9', '--no-cache']
+        with mock.patch.object(Config, 'WLTS_MAX_RETRIES', 0):
+            self.assertEqual(self.main(*arguments)[0], 0)
+            # The collection description is kept in the metadata cache
+            self.server.httpd.error_rate = 1.0
+            code, messages = self.main(*arguments)
+        self.assertEqual(code, 1)
+        job = next(job for job in JobManager().jobs() if job.failed())
+        self.assertEqual(job.progress(), (0, 3))
+        self.assertIn(f'--resume {job.id}', messages)
+
+    def test_concurrency_limits_the_job(self):
+        """Test the concurrency limits the job workers, not the shared limiter."""
+        limiter = RateLimiter.forHost(self.server.wlts_url)
+        max_in_flight = limiter.max_in_flight
+        with mock.patch.object(JobManager, 'run', autospec=True, side_effect=JobManager.run) as run:
+            code, messages = self.main(
+                self.points, self.output, '--collections', 'mapbiomas-v9',
+                '--concurrency', Config.WLTS_MAX_IN_FLIGHT + 10, '--no-cache'
+            )
+        self.assertEqual(code, 0, messages)
+        self.assertEqual(run.call_args.kwargs['workers'], Config.WLTS_MAX_IN_FLIGHT)
+        self.assertEqual(limiter.max_in_flight, max_in_flight)
+        self.assertEqual(cli.job_workers(1), 1)
+        self.assertEqual(cli.job_workers(None), Config.WLTS_MAX_IN_FLIGHT)
+
+    def test_bad_input_file(self):
+        """Test a points file without coordinates is refused without requests."""
+        bad = self.path / 'bad.csv'
+        bad.write_text('id;name\n1;a\n')
+        code, messages = self.main(bad, self.output, '--collections', 'mapbiomas-v9')
+        self.assertEqual(code, 2)
+        self.assertIn('No longitude and latitude columns', messages)
+        code, messages = self.main(self.path / 'missing.csv', self.output, '--collections', 'mapbiomas-v9')
+        self.assertEqual(code, 2)
+        self.assertEqual(self.trajectory_requests(), 0)
+        self.assertEqual(JobManager().jobs(), [])
+
+    def test_missing_collections(self):
+        """Test a new job needs the collections."""
+        code, messages = self.main(self.points, self.output)
+        self.assertEqual(code, 2)
+        self.assertIn('--collections', messages)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CliTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,70 @@
+# coding=utf-8
+"""Warm session state test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 3 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'bdc.team@inpe.br'
+__date__ = '2026-10-19'
+__copyright__ = 'Copyright 2026, INPE'
+
+import unittest
+from unittest import mock
+
+from wlts_plugin.config import Config
+from wlts_plugin.controller.warm_session import WarmSession
+
+
+class WarmSessionStateTest(unittest.TestCase):
+    """Test when the dialog is reopened, without a QGIS project."""
+
+    def test_reopen_after_first_run(self):
+        """Test only a fully built dialog is reopened."""
+        session = WarmSession(warm=True)
+        self.assertFalse(session.reopen())
+        session.opened()
+        self.assertTrue(session.close())
+        self.assertTrue(session.reopen())
+
+    def test_failed_run_is_built_again(self):
+        """Test a dialog that failed to build is not reopened."""
+        session = WarmSession(warm=True)
+        session.opened()
+        session.failed()
+        self.assertFalse(session.reopen())
+
+    def test_cold_session(self):
+        """Test a closed dialog is not kept without the warm session."""
+        session = WarmSession()
+        with mock.patch.object(Config, 'WARM_SESSION', False):
+            session.opened()
+            self.assertFalse(session.close())
+        self.assertFalse(session.reopen())
+
+    def test_unload(self):
+        """Test the dialog released with the plugin is not reopened."""
+        session = WarmSession(warm=True)
+        session.opened()
+        session.unload()
+        self.assertFalse(session.reopen())
+
+    def test_collections_refresh(self):
+        """Test only the new collections are added, in the service order, and local ones last."""
+        names, removed, added = WarmSession.collections(
+            ['mapbiomas-v9', 'prodes_amazonia_legal', 'old_local'],
+            ['ibge_cobertura_uso_terra', 'mapbiomas-v9'],
+            ['mapbiomas-v9', 'new_local']
+        )
+        self.assertEqual(names, ['ibge_cobertura_uso_terra', 'mapbiomas-v9', 'new_local'])
+        self.assertEqual(removed, ['prodes_amazonia_legal', 'old_local'])
+        self.assertEqual(added, [(0, 'ibge_cobertura_uso_terra'), (2, 'new_local')])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(WarmSessionStateTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -18,15 +18,16 @@
 
 import json
 import os.path
-import time
+import re
 from datetime import datetime
 from pathlib import Path
 
 import qgis.utils
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from qgis.core import (QgsCoordinateReferenceSystem, QgsFeature, QgsPoint,
+from qgis.core import (Qgis, QgsApplication, QgsCoordinateReferenceSystem,
+                       QgsFeature, QgsMapLayerType, QgsMessageLog, QgsPoint,
                        QgsProject, QgsRasterMarkerSymbolLayer, QgsRectangle,
                        QgsSingleSymbolRenderer, QgsSymbol, QgsVectorLayer,
                        QgsWkbTypes)
@@ -36,10 +37,23 @@ from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction
 
 from .config import Config
+from .controller.location_history import LocationHistory
+from .controller.metadata_cache import MetadataCache
+from .controller.prefetch import Prefetcher
+from .controller.raster_engine import LocalTrajectoryEngine
+from .controller.session_resources import (FEATURE_BYTES, SessionResources,
+                                           formatBytes)
+# Import the timing spans of the plugin
+from .controller.tracing import tracer
+from .controller.trajectory_cache import TrajectoryCache
+from .controller.warm_session import WarmSession
 # Import the controls for the plugin
 from .controller.wlts_qgis_controller import Controls, WLTS_Controls
 # Import files exporting controls
 from .helpers.files_export_helper import FilesExport
+from .helpers.history_model import HistoryModel
+from .helpers.selection_model import SelectionModel
+from .processing_provider import WltsProcessingProvider
 # Initialize Qt resources from file resources.py
 from .resources import *
 # Import the code for the dialog
@@ -81,6 +95,17 @@ class WLTSQgis:
         # Must be set in initGui() to survive plugin reloads
         self.first_start = None
 
+        # The dialog and controls, kept for the session after the first run
+        self.dlg = None
+        self.session = WarmSession()
+
+        # Selected locations and their trajectories, opened on the first run
+        self.history = None
+        self.trajectory_cache = None
+        self.metadata_cache = None
+        # The result of the last search, drawn on the chart and exported
+        self.result = None
+
     # noinspection PyMethodMayBeStatic
     def tr(self, message):
         """Get the translation for a string using Qt translation API.
@@ -178,9 +203,72 @@ class WLTSQgis:
             callback=self.run,
             parent=self.iface.mainWindow())
 
+        self.initProcessing()
+        self.initLocalRasters()
+
         # will be set False in run()
         self.first_start = True
 
+    def initProcessing(self):
+        """Add the WLTS algorithms to the Processing toolbox."""
+        self.provider = WltsProcessingProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
+    def initLocalRasters(self):
+        """Add the local collection action to the raster layers menu of the layers panel."""
+        self.local_action = QAction(self.tr(u'Use as WLTS local collection'), self.iface.mainWindow())
+        self.local_action.triggered.connect(self.addLocalRaster)
+        self.iface.addCustomActionForLayerType(
+            self.local_action, self.tr(u'WLTS'), QgsMapLayerType.RasterLayer, True
+        )
+
+    def addLocalRaster(self):
+        """Register the active raster layer as a date of a local collection.
+
+        The collection name, date and band are asked to the user, the class
+        names are the labels of a paletted layer. The collections are saved
+        in ``Config.LOCAL_RASTERS`` and listed in the dialog.
+        """
+        layer = self.iface.activeLayer()
+        if layer is None or layer.type() != QgsMapLayerType.RasterLayer:
+            return
+        parent = self.iface.mainWindow()
+        title = self.tr(u'WLTS local collection')
+        collection, ok = QInputDialog.getText(parent, title, self.tr(u'Collection name:'), text=layer.name())
+        if not ok or not collection:
+            return
+        year = re.search(r'(19|20)\d{2}', layer.name())
+        date, ok = QInputDialog.getText(
+            parent, title, self.tr(u'Date of the layer, e.g. 2020 or 2020-08-01:'),
+            text=year.group(0) if year else ''
+        )
+        if not ok:
+            return
+        if not re.fullmatch(r'\d{4}(-\d{2}){0,2}', date):
+            Controls().alert("warning", "ValueError", f"Invalid date {date!r}!")
+            return
+        band = 1
+        if layer.bandCount() > 1:
+            band, ok = QInputDialog.getInt(parent, title, self.tr(u'Band of the date:'), 1, 1, layer.bandCount())
+            if not ok:
+                return
+        # The dialog engine lists the collection at once, otherwise the
+        # saved collections are kept and the next run reads them
+        if self.dlg is not None:
+            engine = self.wlts_controls.local
+        else:
+            engine = LocalTrajectoryEngine()
+            if os.path.exists(Config.LOCAL_RASTERS):
+                engine.load(Config.LOCAL_RASTERS)
+        try:
+            engine.registerLayer(collection, layer, date, band)
+            engine.save(Config.LOCAL_RASTERS)
+        except (OSError, RuntimeError) as error:
+            Controls().alert("error", type(error).__name__, str(error))
+            return
+        if self.dlg is not None:
+            self.refreshCheckBox()
+
     def unload(self):
         """Remove the plugin menu item and icon from QGIS GUI."""
         for action in self.actions:
@@ -188,6 +276,16 @@ class WLTSQgis:
                 self.tr(u'&WLTS'),
                 action)
             self.iface.removeToolBarIcon(action)
+        QgsApplication.processingRegistry().removeProvider(self.provider)
+        self.iface.removeCustomActionForLayerType(self.local_action)
+        # Release the dialog kept for the session
+        if self.dlg is not None:
+            tracer.unsubscribe(self.logSpan)
+            self.prefetcher.shutdown()
+            self.resources.releaseAll()
+            self.dlg.deleteLater()
+            self.dlg = None
+        self.session.unload()
 
     def showHelp(self):
         """Open html doc on default browser."""
@@ -223,12 +321,26 @@ class WLTSQgis:
         self.dlg.setWindowFlag(Qt.WindowMaximizeButtonHint, False)
         self.dlg.setFixedSize(self.dlg.size().width(), self.dlg.size().height())
         self.basic_controls = Controls()
-        self.wlts_controls = WLTS_Controls()
+        if self.trajectory_cache is None:
+            self.trajectory_cache = TrajectoryCache(Config.CACHE_FILE, max_age=Config.CACHE_MAX_AGE)
+        if self.metadata_cache is None:
+            self.metadata_cache = MetadataCache(Config.METADATA_FILE, max_age=Config.METADATA_MAX_AGE)
+        self.wlts_controls = WLTS_Controls(cache=self.trajectory_cache, metadata=self.metadata_cache)
+        self.prefetcher = Prefetcher(self.wlts_controls)
         self.files_controls = FilesExport()
         self.enabled_click = True
         self.addCanvasControlPoint(self.enabled_click)
-        self.dlg.input_longitude.valueChanged.connect(self.checkFilters)
-        self.dlg.input_latitude.valueChanged.connect(self.checkFilters)
+        self.pending_extent = None
+        self.zoom_timer = QTimer(self.dlg)
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(0)
+        self.zoom_timer.timeout.connect(self.apply_zoom)
+        self.selection = SelectionModel(parent=self.dlg)
+        self.selection.changed.connect(self.checkFilters)
+        self.dlg.input_longitude.valueChanged.connect(self.selection.schedule)
+        self.dlg.input_latitude.valueChanged.connect(self.selection.schedule)
+        self.dlg.start_date.dateChanged.connect(self.updateDates)
+        self.dlg.end_date.dateChanged.connect(self.updateDates)
         self.getDate()
 
     def initButtons(self):
@@ -240,30 +352,149 @@ class WLTSQgis:
         self.initExportOptions()
         self.enabledSearchButtons(False)
 
+    def initDiagnostics(self):
+        """Init the timing spans log and the diagnostics tab."""
+        tracer.subscribe(self.logSpan)
+        self.dlg.refresh_diagnostics.clicked.connect(self.showDiagnostics)
+        self.dlg.export_trace.clicked.connect(self.exportTrace)
+        self.dlg.main_tabs.currentChanged.connect(self.showDiagnostics)
+
+    def initResources(self):
+        """Track the memory held in the session under ``Config.SESSION_MEMORY_MB``.
+
+        Each resource is released when it is the least recently used and
+        the total is above the budget, and every one when the dialog closes.
+        """
+        controls = self.wlts_controls
+        self.resources = SessionResources(Config.SESSION_MEMORY_MB * 2 ** 20)
+        self.resources.add('Trajectory chart', self.chartBytes, self.releaseChart)
+        self.resources.add('Chart processes', controls.renderer.nbytes, controls.renderer.shutdown)
+        self.resources.add('Raster blocks', controls.local.cache.nbytes, controls.local.cache.clear)
+        for area in controls.areas:
+            self.resources.add(f'Area {Path(area.path).stem}', area.nbytes, area.clearDecoded)
+        self.resources.add('Map layers', self.layersBytes, self.releaseLayers)
+
+    def chartBytes(self):
+        """Return the memory of the last result and its chart."""
+        result_bytes = self.result.nbytes() if self.result is not None else 0
+        return result_bytes + self.dlg.chart.nbytes()
+
+    def releaseChart(self):
+        """Release the last result and clear its chart."""
+        self.result = None
+        self.dlg.chart.close()
+
+    def temporaryLayers(self):
+        """Return the map layers added by the plugin."""
+        return [
+            layer for layer in QgsProject.instance().mapLayers().values()
+            if layer.name() == "wlts_coordinates_history" or "Geojson_WLTS_response_" in layer.name()
+        ]
+
+    def layersBytes(self):
+        """Return an estimate of the memory of the map layers added by the plugin."""
+        return sum(layer.featureCount() for layer in self.temporaryLayers()) * FEATURE_BYTES
+
+    def releaseLayers(self):
+        """Remove the map layers added by the plugin, the point is drawn again on the next click."""
+        for layer in self.temporaryLayers():
+            QgsProject.instance().removeMapLayer(layer.id())
+        self.points_layer_data_provider = None
+
+    def useResources(self, *names):
+        """Mark resources as used, releasing the older ones above the budget."""
+        for name in self.resources.touch(*names):
+            QgsMessageLog.logMessage(f"{name} was released to keep the memory budget", 'WLTS', Qgis.Info)
+        self.showMemoryUsage()
+
+    def showMemoryUsage(self):
+        """Show the memory held in the session in the diagnostics tab."""
+        usage = self.resources.usage()
+        total = sum(size for _, size in usage)
+        self.dlg.memory_usage.setText(
+            f"Memory: {formatBytes(total)} of {formatBytes(self.resources.budget)}"
+        )
+        self.dlg.memory_usage.setToolTip(
+            "\n".join(f"{name}: {formatBytes(size)}" for name, size in usage)
+        )
+
+    def logSpan(self, span):
+        """Write a finished timing span in the QGIS message log."""
+        details = ", ".join(f"{key}={value}" for key, value in span['args'].items())
+        message = f"{span['name']} took {span['duration'] * 1000:,.1f} ms"
+        if details:
+            message += f" ({details})"
+        if span['error']:
+            message += f" failed with {span['error']}"
+        QgsMessageLog.logMessage(
+            message, 'WLTS',
+            Qgis.Warning if span['error'] else Qgis.Info
+        )
+
+    def showDiagnostics(self):
+        """Show the last timing spans in the diagnostics tab."""
+        if self.dlg.main_tabs.currentWidget() != self.dlg.diagnostics_tab:
+            return
+        self.showMemoryUsage()
+        spans = tracer.recent()
+        self.dlg.diagnostics_table.setRowCount(len(spans))
+        for row, span in enumerate(spans):
+            details = ", ".join(f"{key}={value}" for key, value in span['args'].items())
+            if span['error']:
+                details = f"{details} {span['error']}".strip()
+            values = [
+                datetime.fromtimestamp(span['start']).strftime('%H:%M:%S.%f')[:-3],
+                span['name'],
+                f"{span['duration'] * 1000:,.1f}",
+                details
+            ]
+            for column, value in enumerate(values):
+                self.dlg.diagnostics_table.setItem(row, column, QTableWidgetItem(value))
+        self.dlg.diagnostics_table.resizeColumnsToContents()
+
+    def exportTrace(self):
+        """Export the timing spans as a Chrome trace file."""
+        name = QFileDialog.getSaveFileName(
+            parent=self.dlg,
+            caption='Save trace',
+            directory=('wlts_trace.json'),
+            filter='*.json'
+        )
+        if name[0]:
+            tracer.exportChromeTrace(name[0])
+
     def initExportOptions(self):
         """Init the combo box select option to export"""
         self.dlg.export_result_as_type.addItems(self.files_controls.getExportOptions())
 
     def initHistory(self):
-        """Init and update location history."""
-        self.dlg.history_list.clear()
+        """Init the location history list."""
         self.selected_location = None
-        try:
-            self.dlg.history_list.addItems(list(self.locations.keys()))
-        except AttributeError:
-            self.locations = {}
-        self.dlg.history_list.itemClicked.connect(self.getFromHistory)
+        if self.history is None:
+            self.history = LocationHistory(Config.HISTORY_FILE)
+        self.history_model = HistoryModel(self.history, self.dlg)
+        self.dlg.history_list.setModel(self.history_model)
+        self.dlg.history_list.clicked.connect(self.getFromHistory)
         self.getLayers()
 
-    def getFromHistory(self, item):
+    def getFromHistory(self, index):
         """Select location from history storage as selected location."""
-        self.selected_location = self.locations.get(item.text(), {})
+        self.selected_location = self.history_model.location(index)
         self.dlg.input_longitude.setValue(self.selected_location.get('long'))
         self.dlg.input_latitude.setValue(self.selected_location.get('lat'))
         self.draw_point(
             self.selected_location.get('long'),
             self.selected_location.get('lat')
         )
+        self.selection.setLocation(
+            self.selected_location.get('long'),
+            self.selected_location.get('lat')
+        )
+        # The trajectory plotted last at the location is shown from the cache
+        result = self.wlts_controls.cachedResult(self.selected_location.get('cache_key'))
+        if result is not None:
+            self.restoreQuery(result.query)
+            self.showResult(result)
 
     def getLayers(self):
         """Storage the layers in QGIS project."""
@@ -278,37 +509,67 @@ class WLTSQgis:
         end_year = int(date_string[:4]) - years_interval
         self.dlg.start_date.setDate(self.basic_controls.formatForQDate(f"{end_year}-01-01"))
         self.dlg.end_date.setDate(self.basic_controls.formatForQDate(date_string))
+        self.updateDates()
+
+    def updateDates(self):
+        """Save the dates of the widgets in the selection."""
+        self.selection.setDates(
+            str(self.dlg.start_date.date().toString('yyyy-MM-dd')),
+            str(self.dlg.end_date.date().toString('yyyy-MM-dd'))
+        )
 
     def initCheckBox(self):
         """Start the checkbox with the collections that are active in the service."""
         self.widget = QWidget()
         self.vbox = QVBoxLayout()
-        collections = self.wlts_controls.listCollections()
         self.checks = {}
-        for collection in collections:
-            description = self.wlts_controls.description(collection)
-            self.checks[collection] = QCheckBox(str(description["title"]))
-            if any([c in str(description['name']).lower() for c in ['ibge', 'mapbiomas', 'prodes']]):
-                self.checks[collection].setChecked(True)
-            self.checks[collection].stateChanged.connect(self.checkFilters)
-            self.vbox.addWidget(self.checks.get(collection))
         self.widget.setLayout(self.vbox)
         self.dlg.bands_scroll.setWidgetResizable(True)
         self.dlg.bands_scroll.setWidget(self.widget)
+        self.refreshCheckBox()
+
+    def refreshCheckBox(self):
+        """Add the checkboxes of the new collections and remove the ones of removed collections.
+
+        The other checkboxes are kept as they are, so a reopened dialog keeps
+        its selection and only the new collections are described.
+        """
+        collections = self.wlts_controls.listCollections()
+        # Collections read from the local rasters, after the service ones
+        names, removed, added = self.session.collections(
+            list(self.checks), collections, self.wlts_controls.local.collections
+        )
+        for collection in removed:
+            check = self.checks.pop(collection)
+            self.vbox.removeWidget(check)
+            check.deleteLater()
+        self.selection.setCollections(names)
+        for position, collection in added:
+            if collection not in collections:
+                check = QCheckBox(f"{collection} (local)")
+            else:
+                description = self.wlts_controls.description(collection)
+                check = QCheckBox(str(description["title"]))
+                if any([c in str(description['name']).lower() for c in ['ibge', 'mapbiomas', 'prodes']]):
+                    check.setChecked(True)
+                    self.selection.setCollection(collection, True)
+            check.stateChanged.connect(
+                lambda state, name=collection: self.selection.setCollection(name, state == Qt.Checked)
+            )
+            self.checks[collection] = check
+            self.vbox.insertWidget(position, check)
 
     def setCRS(self):
         """Set the CRS in project instance."""
         QgsProject.instance().setCrs(QgsCoordinateReferenceSystem(int("4326")))
 
     def getSelected(self):
-        """Get the collections that have been selected."""
-        self.selected_collections = []
-        for key in list(self.checks.keys()):
-            if self.checks.get(key).isChecked():
-                self.selected_collections.append(key)
-        self.start_date = str(self.dlg.start_date.date().toString('yyyy-MM-dd'))
-        self.end_date = str(self.dlg.end_date.date().toString('yyyy-MM-dd'))
+        """Get the collections and dates that have been selected."""
+        self.selected_collections = self.selection.collections
+        self.start_date = self.selection.start_date
+        self.end_date = self.selection.end_date
 
+    @tracer.traced()
     def changeDateValue(self, value):
         """Date slider control data on layers QGIS."""
         vector = self.geojson.get("features", [])[value]
@@ -328,6 +589,7 @@ class WLTSQgis:
             if "Geojson_WLTS_response_" in layer.name():
                 QgsProject.instance().removeMapLayer(layer.layerId())
         QgsProject.instance().addMapLayer(vlayer)
+        self.useResources('Map layers')
 
     def exportPython(self):
         """Export as python code."""
@@ -359,8 +621,7 @@ class WLTSQgis:
                 directory=('wlts_trajectory_download.csv'),
                 filter='*.csv'
             )
-            trajectory = self.tj
-            self.files_controls.generateCSV(name[0], trajectory)
+            self.files_controls.generateCSV(name[0], self.result.trajectory)
         except AttributeError as error:
             self.basic_controls.alert("warning", "AttributeError", str(error))
 
@@ -373,33 +634,91 @@ class WLTSQgis:
                 directory=('wlts_trajectory_download.json'),
                 filter='*.json'
             )
-            self.files_controls.generateJSON(name[0], self.tj)
+            self.files_controls.generateJSON(name[0], self.result.trajectory)
         except AttributeError as error:
             self.basic_controls.alert("warning", "AttributeError", str(error))
 
     def plotTrajectory(self):
         """Plot trajectory with files controls."""
         self.getSelected()
-        self.tj = self.wlts_controls.getTrajectory(
-            lon=float(self.selected_location.get("long")),
-            lat=float(self.selected_location.get("lat")),
+        lon, lat = self.selection.location
+        key = self.selection.key(self.wlts_controls.queryKey)
+        # Use the trajectory being prefetched when it is about to arrive, a slow
+        # prefetch does not freeze the dialog and the query is sent at once
+        self.prefetcher.wait(key, timeout=Config.PREFETCH_WAIT_MS / 1000)
+        result = self.wlts_controls.getTrajectory(
+            lon=lon,
+            lat=lat,
             collections=self.selected_collections,
             start_date=self.start_date,
             end_date=self.end_date
         )
-        self.files_controls.generatePlotFig(self.wlts_controls)
+        for collection, reason in result.skipped.items():
+            QgsMessageLog.logMessage(f"{collection} was not requested: {reason}", 'WLTS', Qgis.Info)
+        if result.empty:
+            self.basic_controls.alert(
+                "warning", "No trajectory",
+                "None of the selected collections can be requested for the location and dates:\n" + "\n".join(
+                    f"{collection}: {reason}" for collection, reason in result.skipped.items()
+                )
+            )
+            return
+        self.history.setCacheKey(self.selected_location, key)
+        self.showResult(result)
 
-    def plotlyBrowser(self):
-        """Redirects user to browser plotly."""
-        self.getSelected()
-        self.tj = self.wlts_controls.getTrajectory(
-            lon=float(self.selected_location.get("long")),
-            lat=float(self.selected_location.get("lat")),
-            collections=self.selected_collections,
-            start_date=self.start_date,
-            end_date=self.end_date
+    def showResult(self, result):
+        """Draw a trajectory result on the chart of the dialog.
+
+        :param result<TrajectoryResult>: the result of a query.
+        """
+        query = result.query
+        self.result = result
+        self.files_controls.generatePlotFig(self.wlts_controls, self.dlg.chart, result)
+        self.dlg.main_tabs.setCurrentWidget(self.dlg.chart_tab)
+        used = ['Trajectory chart', 'Chart processes']
+        if self.wlts_controls.local.filter(result.collections):
+            used.append('Raster blocks')
+        used.extend(
+            f'Area {Path(area.path).stem}' for area in self.wlts_controls.areas
+            if area.covers(query['longitude'], query['latitude'], query['collections'],
+                           query['start_date'], query['end_date'])
         )
-        self.files_controls.generatePlotlyFig(self.wlts_controls)
+        self.useResources(*used)
+
+    def restoreQuery(self, query):
+        """Select the collections and dates of a query in the dialog.
+
+        :param query<dict>: the query of a ``TrajectoryResult``.
+        """
+        for name, check in self.checks.items():
+            check.setChecked(name in query['collections'])
+        self.dlg.start_date.setDate(self.basic_controls.formatForQDate(query['start_date']))
+        self.dlg.end_date.setDate(self.basic_controls.formatForQDate(query['end_date']))
+
+    def exportPlotly(self):
+        """Export to file system trajectory plot as Plotly HTML."""
+        try:
+            name = QFileDialog.getSaveFileName(
+                parent=self.dlg,
+                caption='Save as Plotly HTML',
+                directory=('wlts_trajectory_download.html'),
+                filter='*.html'
+            )
+            self.files_controls.generatePlotlyFig(name[0], self.wlts_controls, self.result)
+        except AttributeError as error:
+            self.basic_controls.alert("warning", "AttributeError", str(error))
+
+    def exportFacets(self):
+        """Export to file system the plot of each collection as PNG files."""
+        try:
+            folder = QFileDialog.getExistingDirectory(
+                parent=self.dlg,
+                caption='Save the collections plots as PNG'
+            )
+            if folder:
+                self.files_controls.generateFacets(folder, self.wlts_controls, self.result)
+        except AttributeError as error:
+            self.basic_controls.alert("warning", "AttributeError", str(error))
 
     def exportAsType(self):
         """Export result based on combo box selection."""
@@ -411,7 +730,9 @@ class WLTSQgis:
         elif ext == "Python":
             self.exportPython()
         elif ext == "Plotly":
-            self.plotlyBrowser()
+            self.exportPlotly()
+        elif ext == "PNG":
+            self.exportFacets()
 
     def remove_layer_by_name(self, layer_name):
         """Remove a layer using name."""
@@ -421,11 +742,10 @@ class WLTSQgis:
 
     def zoom_to_point(self, longitude, latitude, scale = None):
         """Zoom in to selected location using longitude and latitude."""
-        time.sleep(0.30)
         canvas = self.iface.mapCanvas()
         if not scale:
             scale = 200 * (1 / canvas.scale())
-        canvas.setExtent(
+        self.zoom_to_rectangle(
             QgsRectangle(
                 float(longitude) - scale,
                 float(latitude) - scale,
@@ -433,6 +753,39 @@ class WLTSQgis:
                 float(latitude) + scale
             )
         )
+
+    def zoom_to_extent(self, points, margin = 0.1, min_size = 0.01):
+        """Zoom to fit all the points in a single canvas update.
+
+        :param points<list>: the (longitude, latitude) pairs.
+        :param margin<float>: the space around the points, as a fraction of the extent.
+        :param min_size<float>: the extent size, in degrees, for a single point.
+        """
+        longitudes = [float(point[0]) for point in points]
+        latitudes = [float(point[1]) for point in points]
+        if not longitudes:
+            return
+        extent = QgsRectangle(min(longitudes), min(latitudes), max(longitudes), max(latitudes))
+        extent.grow(max(extent.width(), extent.height()) * margin or min_size / 2)
+        self.zoom_to_rectangle(extent)
+
+    def zoom_to_rectangle(self, extent):
+        """Set the canvas extent when the control returns to the event loop.
+
+        The map layers added before the zoom are rendered with it, and many
+        requests in the same event are merged in the last one.
+        """
+        self.pending_extent = extent
+        if not self.zoom_timer.isActive():
+            self.zoom_timer.start()
+
+    def apply_zoom(self):
+        """Set the pending canvas extent and render the map once."""
+        if self.pending_extent is None:
+            return
+        canvas = self.iface.mapCanvas()
+        canvas.setExtent(self.pending_extent)
+        self.pending_extent = None
         canvas.refresh()
 
     def zoom_to_selected_point(self):
@@ -478,6 +831,7 @@ class WLTSQgis:
                 QgsProject.instance().addMapLayer(self.points_layer)
                 self.points_layer_data_provider = self.points_layer.dataProvider()
                 self.set_draw_point(longitude, latitude)
+            self.useResources('Map layers')
 
     def save_on_history(self, x, y):
         """Get lng/lat coordinates and save on history list."""
@@ -485,21 +839,11 @@ class WLTSQgis:
         layer_name = '<none>'
         if self.layer:
             layer_name = str(self.layer.name())
-        self.selected_location = {
-            'long' : x,
-            'lat' : y,
-            'layer_name' : layer_name,
-            'crs' : 'epsg:4326'
-        }
-        history_key = str(("[{long:,.7f}, {lat:,.7f}]").format(
-            long = self.selected_location.get('long'),
-            lat = self.selected_location.get('lat')
-        ))
-        self.locations[history_key] = self.selected_location
-        locations_keys = list(self.locations.keys())
-        self.dlg.history_list.clear()
-        self.dlg.history_list.addItems(locations_keys)
-        self.dlg.history_list.setCurrentRow(len(locations_keys) - 1)
+        # Clicks in the same pixels of the collections grids are one location
+        pixel_key = self.wlts_controls.pixelKey(x, y, self.selection.collections)
+        index = self.history_model.addLocation(x, y, layer_name, 'epsg:4326', pixel_key)
+        self.selected_location = self.history_model.location(index)
+        self.dlg.history_list.setCurrentIndex(index)
 
     def display_point(self, pointTool):
         """Get the mouse possition and storage as selected location."""
@@ -515,7 +859,14 @@ class WLTSQgis:
             self.dlg.input_latitude.setValue(y)
         try:
             self.save_on_history(x, y)
+            # Clicks near a saved location are snapped to it
+            x = self.selected_location['long']
+            y = self.selected_location['lat']
+            if pointTool is not None:
+                self.dlg.input_longitude.setValue(x)
+                self.dlg.input_latitude.setValue(y)
             self.draw_point(x, y)
+            self.selection.setLocation(x, y)
         except AttributeError:
             pass
 
@@ -544,24 +895,58 @@ class WLTSQgis:
         self.dlg.export_result.setEnabled(enable)
 
     def checkFilters(self):
-        """Check if lat lng are selected."""
+        """Check if lat lng are selected, once after a burst of changes."""
         self.getSelected()
         try:
-            if (len(self.selected_collections) > 0 and
+            if (self.selection.isComplete() and
                 self.dlg.input_longitude.value() != 0 and
                     self.dlg.input_latitude.value() != 0):
                 self.enabledSearchButtons(True)
+                self.updateCoverage()
+                self.prefetchTrajectory()
             else:
                 self.enabledSearchButtons(False)
         except:
             self.enabledSearchButtons(False)
 
+    def updateCoverage(self):
+        """Grey out the collections that can not cover the selected query."""
+        if not Config.COVERAGE_CHECKS:
+            return
+        skipped = self.wlts_controls.coverage.reasons(
+            list(self.checks), *self.selection.location,
+            self.selection.start_date, self.selection.end_date
+        )
+        for collection, check in self.checks.items():
+            check.setEnabled(collection not in skipped)
+            check.setToolTip(f"Not requested: {skipped[collection]}" if collection in skipped else "")
+
+    def prefetchTrajectory(self):
+        """Fetch the trajectory of the selected location in background."""
+        if self.selection.isComplete():
+            self.prefetcher.prefetch(
+                *self.selection.location, self.selection.collections,
+                self.selection.start_date, self.selection.end_date
+            )
+
     def finish_session(self):
         """Methods to finish when dialog close"""
         #
         # Remove mouse click
         self.addCanvasControlPoint(False)
         #
+        # Release the memory held in the session: the chart, the rendering
+        # processes, the raster blocks, the area tiles and the map layers
+        self.resources.releaseAll()
+        #
+        # Cancel the background requests, a warm session keeps the dialog
+        # and its controls to be reopened
+        if self.session.close():
+            self.prefetcher.cancel()
+        else:
+            self.prefetcher.shutdown()
+            tracer.unsubscribe(self.logSpan)
+        #
         # Restore sys.path
         if Config.PYTHONPATH_WLTS_PLUGIN:
             try:
@@ -579,8 +964,32 @@ class WLTSQgis:
         else:
             self.dlg.show()
 
+    def reopen(self):
+        """Show the dialog kept from the previous run.
+
+        Only what may have changed while it was closed is refreshed: the
+        collections list, revalidated with the metadata cache, and the
+        layers of the project.
+        """
+        with tracer.span('WLTSQgis.reopen'):
+            self.addCanvasControlPoint(self.enabled_click)
+            self.refreshCheckBox()
+            self.getLayers()
+            self.dialogShow()
+
     def run(self):
-        """Run method that performs all the real work."""
+        """Run method that performs all the real work.
+
+        With ``Config.WARM_SESSION`` the dialog and the controls built on the
+        first run are kept for the QGIS session, and are reopened at once.
+        """
+        if self.session.reopen():
+            try:
+                self.reopen()
+            except Exception as e:
+                controls = Controls()
+                controls.alert("error", "Error while starting plugin!", str(e))
+            return
         self.dlg = WltsQgisDialog()
         try:
             # Init Controls
@@ -589,6 +998,10 @@ class WLTSQgis:
             self.initIcons()
             # Add functions to buttons
             self.initButtons()
+            # Timing spans
+            self.initDiagnostics()
+            # Memory budget
+            self.initResources()
             # History
             self.initHistory()
             # Get collections
@@ -597,6 +1010,10 @@ class WLTSQgis:
             self.dialogShow()
             # Methods to finish session
             self.dlg.finished.connect(self.finish_session)
+            self.session.opened()
         except Exception as e:
+            # A dialog not fully built is not reopened, the next run builds it again
+            self.dlg = None
+            self.session.failed()
             controls = Controls()
             controls.alert("error", "Error while starting plugin!", str(e))
@@ -20,6 +20,8 @@ import os
 
 from qgis.PyQt import QtWidgets, uic
 
+from .helpers.chart_helper import TrajectoryChart
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'wlts_qgis_dialog_base.ui'))
 
@@ -37,3 +39,5 @@ class WltsQgisDialog(QtWidgets.QDialog, FORM_CLASS):
         """
         super(WltsQgisDialog, self).__init__(parent)
         self.setupUi(self)
+        self.chart = TrajectoryChart(self.chart_tab)
+        self.chart.attach(self.chart_layout)